@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0002_activity_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activity',
+            name='edited_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -11,6 +11,15 @@ class Activity(models.Model):
     date = models.DateField()
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     created_at = models.DateTimeField(auto_now_add=True)
+    edited_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # List default & keyset pagination, filter status / date (core.filters)
+            models.Index(fields=['created_at', 'id'], name='activity_created_idx'),
+            models.Index(fields=['status', 'created_at'], name='activity_status_created_idx'),
+            models.Index(fields=['date'], name='activity_date_idx'),
+        ]
 
     def __str__(self):
         return self.title
\ No newline at end of file
@@ -0,0 +1,21 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.cache import invalidate_on_change
+from core.realtime import broadcast
+
+from .models import Activity
+
+# Response cache (core/cache.py) di-invalidasi setiap Activity disimpan / dihapus
+invalidate_on_change(Activity)
+
+
+# Event real-time topic 'activities' (format sama dengan leads/realtime.py)
+@receiver(post_save, sender=Activity)
+def broadcast_activity(sender, instance, **kwargs):
+    broadcast('activities', {'type': 'activity.saved', 'id': instance.pk, 'kind': 'activity', 'lead': None})
+
+
+@receiver(post_delete, sender=Activity)
+def broadcast_activity_delete(sender, instance, **kwargs):
+    broadcast('activities', {'type': 'activity.deleted', 'id': instance.pk, 'kind': 'activity', 'lead': None})
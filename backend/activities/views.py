@@ -1,9 +1,25 @@
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
+from core.cache import CachedResponseMixin
+from core.conditional import ConditionalMixin
+from core.export import ExportMixin
 from .models import Activity
 from .serializers import ActivitySerializer
 
-class ActivityViewSet(viewsets.ModelViewSet):
-    queryset = Activity.objects.all().order_by('-created_at')
+class ActivityViewSet(CachedResponseMixin, ConditionalMixin, ExportMixin, viewsets.ModelViewSet):
+    queryset = Activity.objects.all().order_by('-created_at', '-id')
     serializer_class = ActivitySerializer
-    permission_classes = [IsAuthenticated] # Wajib login untuk akses
\ No newline at end of file
+    permission_classes = [IsAuthenticated] # Wajib login untuk akses
+
+    filter_fields = {
+        'status': ['exact', 'in'],
+        'date': ['exact', 'gte', 'lte'],
+        'created_at': ['gte', 'lte'],
+    }
+    ordering_fields = ['created_at', 'date']
+
+    export_filename = 'activities'
+    export_fields = [
+        ('ID', 'id'), ('Title', 'title'), ('Description', 'description'),
+        ('Date', 'date'), ('Status', 'status'), ('Created At', 'created_at'),
+    ]
@@ -5,6 +5,14 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+HTTP diteruskan ke Django, WebSocket ke core.realtime (update real-time
+kanban / deals / aktivitas). Jalankan dengan server ASGI, misal:
+    uvicorn core.asgi:application --workers 4
+
+Mode ini menyalakan ASYNC_API: list / retrieve lead & deal dilayani handler
+async (core/async_views.py). Pasangkan dengan DB_POOL=1 (pool psycopg 3)
+atau DB_CONN_MAX_AGE supaya thread pool tidak membuka koneksi baru per request.
 """
 
 import os
@@ -12,5 +20,14 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+os.environ.setdefault('ASYNC_API', '1')
+
+django_application = get_asgi_application()
+
+from core.realtime import websocket_application  # noqa: E402  (butuh settings yang sudah siap)
+
 
-application = get_asgi_application()
+async def application(scope, receive, send):
+    if scope['type'] == 'websocket':
+        return await websocket_application(scope, receive, send)
+    return await django_application(scope, receive, send)
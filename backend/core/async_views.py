@@ -0,0 +1,82 @@
+"""
+Handler async untuk read path ViewSet (mode ASGI, lihat core/asgi.py).
+
+DRF belum punya view async, dan ORM async Django 5.2 (aget, async for)
+hanya membungkus query sync dengan sync_to_async(thread_sensitive=True):
+semua query dari semua request antre di SATU thread yang sama. View sync
+biasa di bawah ASGI juga dijalankan di thread itu, jadi server ASGI tanpa
+view async malah memproses request satu per satu.
+
+AsyncReadMixin membuat view list / retrieve menjadi coroutine yang
+menjalankan pipeline DRF yang sudah ada (auth, permission, filter, cache,
+conditional, pagination, render) di thread pool biasa
+(thread_sensitive=False), sehingga request baca berjalan paralel dan event
+loop tetap bebas untuk request lain / WebSocket. Setiap thread memegang
+koneksi database sendiri yang diambil dari pool psycopg (DB_POOL=1) atau
+dipakai ulang lewat CONN_MAX_AGE.
+
+Request tulis (POST / PUT / PATCH / DELETE) tetap lewat thread_sensitive=True
+seperti view sync Django lainnya.
+
+Hanya aktif kalau settings.ASYNC_API = True (di-set oleh core/asgi.py); di
+bawah WSGI view tetap sync karena view async di server WSGI justru
+menambah overhead event loop per request.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+ASYNC_ACTIONS = ('list', 'retrieve')
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def run_read(view, request, *args, **kwargs):
+    """Jalankan view sync di worker thread, termasuk render response-nya."""
+    # Sinyal request_started / request_finished berjalan di thread handler,
+    # bukan di worker ini: koneksi thread ini dirapikan sendiri (dikembalikan
+    # ke pool / ditutup kalau melewati CONN_MAX_AGE atau error)
+    close_old_connections()
+    try:
+        response = view(request, *args, **kwargs)
+        # Render di sini supaya serialisasi JSON tidak ikut antre di thread
+        # sync bersama milik handler ASGI
+        if callable(getattr(response, 'render', None)) and not response.is_rendered:
+            response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+class AsyncReadMixin:
+    """
+    Tambahkan sebagai mixin paling kiri di ViewSet:
+
+        class LeadViewSet(AsyncReadMixin, CachedResponseMixin, ..., viewsets.ModelViewSet)
+    """
+    async_actions = ASYNC_ACTIONS
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        if not getattr(settings, 'ASYNC_API', False) or not actions:
+            return view
+        if actions.get('get') not in cls.async_actions:
+            return view
+
+        read_view = sync_to_async(functools.partial(run_read, view), thread_sensitive=False)
+        write_view = sync_to_async(view)
+
+        async def async_view(request, *args, **kwargs):
+            if request.method in READ_METHODS:
+                return await read_view(request, *args, **kwargs)
+            return await write_view(request, *args, **kwargs)
+
+        # Atribut yang dibaca router / schema generator / csrf
+        functools.update_wrapper(async_view, view)
+        async_view.cls = view.cls
+        async_view.initkwargs = view.initkwargs
+        async_view.actions = view.actions
+        async_view.csrf_exempt = True
+        return async_view
@@ -0,0 +1,87 @@
+"""
+Autentikasi JWT dengan user di-cache.
+
+JWTAuthentication bawaan SimpleJWT mengambil baris auth_user dari database
+di setiap request. CachedJWTAuthentication menyimpan kolom user di cache
+(alias yang sama dengan response cache, core/cache.py) selama
+AUTH_USER_CACHE_TIMEOUT detik, jadi request berikutnya dengan token user
+yang sama tidak butuh query.
+
+Yang di-cache hanya CACHED_USER_FIELDS + hash untuk cek token dicabut
+(md5 dari hash password, sama dengan claim SimpleJWT) - hash password sendiri
+tidak pernah masuk cache. Kolom lain di-defer dan baru di-query kalau dipakai.
+
+Cache dihapus saat user diubah lewat UserSerializer.update (termasuk ganti
+password) atau dihapus lewat UserViewSet (invalidate_user). Perubahan dari
+jalur lain (Django admin, manage.py changepassword) baru terlihat setelah
+TTL habis, karena itu TTL-nya dibuat pendek.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import router, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .cache import get_cache
+
+
+CACHED_USER_FIELDS = ('id', 'username', 'is_active', 'is_staff')
+REVOKE_HASH = 'revoke_hash'
+
+
+def user_cache_key(user_id):
+    return f'auth-user:{user_id}'
+
+
+def invalidate_user(user_id):
+    """Hapus user dari cache sekarang dan sekali lagi setelah commit."""
+    key = user_cache_key(user_id)
+    get_cache().delete(key)
+    # Request lain bisa mengisi ulang cache dengan data lama sebelum commit
+    transaction.on_commit(lambda: get_cache().delete(key))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as exc:
+            raise InvalidToken(_('Token contained no recognizable user identification')) from exc
+
+        cache = get_cache()
+        key = user_cache_key(user_id)
+        fields = cache.get(key)
+        # Entri format lama (seluruh baris user) dianggap miss
+        if fields is None or REVOKE_HASH not in fields:
+            # Miss: validasi penuh bawaan SimpleJWT (user ada, aktif, token belum dicabut)
+            user = super().get_user(validated_token)
+            cache.set(key, self.dump(user), getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 60))
+            return user
+
+        user = self.load(fields)
+        # Cek yang sama dengan SimpleJWT, pakai data dari cache
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        if api_settings.CHECK_REVOKE_TOKEN and (
+            validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != fields[REVOKE_HASH]
+        ):
+            raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+        return user
+
+    @staticmethod
+    def dump(user):
+        fields = {name: getattr(user, name) for name in CACHED_USER_FIELDS}
+        fields[REVOKE_HASH] = get_md5_hash_password(user.password)
+        return fields
+
+    @staticmethod
+    def load(fields):
+        # from_db: instance dianggap sudah tersimpan (save() jadi UPDATE, bukan INSERT),
+        # kolom yang tidak di-cache jadi deferred
+        model = get_user_model()
+        # from_db butuh nilai dalam urutan kolom model
+        names = [field.attname for field in model._meta.concrete_fields if field.attname in CACHED_USER_FIELDS]
+        return model.from_db(router.db_for_read(model), names, [fields[name] for name in names])
@@ -0,0 +1,171 @@
+"""
+Cache response list / retrieve dengan invalidasi per model (generation counter).
+
+Setiap model punya counter `api-gen:<app_label.Model>` di cache. Key response
+memuat counter semua model yang datanya ikut di response (`cache_models`),
+jadi save / delete satu model cukup menaikkan counter-nya - response lama
+otomatis tidak terpakai lagi dan habis sendiri lewat timeout.
+
+Backend mengikuti CACHES di settings (LocMem untuk development / test,
+Redis atau Memcached di production).
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from rest_framework.response import Response
+
+STATS_KEY = 'api-cache:stats:{}:{}'
+
+
+def get_cache():
+    return caches[getattr(settings, 'API_CACHE_ALIAS', 'default')]
+
+
+def generation_key(model):
+    return f'api-gen:{model._meta.label}'
+
+
+def get_generations(models):
+    cache = get_cache()
+    keys = [generation_key(model) for model in models]
+    values = cache.get_many(keys)
+    for key in keys:
+        if key not in values:
+            # Mulai dari timestamp, bukan 1: kalau counter ter-evict, nilai baru
+            # tidak akan sama dengan generation lama yang masih ada di cache
+            cache.add(key, time.time_ns(), timeout=None)
+            values[key] = cache.get(key)
+    return [values[key] for key in keys]
+
+
+def _bump(models):
+    cache = get_cache()
+    for model in models:
+        key = generation_key(model)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=None)
+
+
+def bump_generation(*models):
+    """
+    Invalidasi response yang memuat data `models`. Dinaikkan sekarang (read di
+    transaksi yang sama langsung segar) dan sekali lagi setelah commit (response
+    yang di-cache request lain selama transaksi berjalan ikut dibuang).
+    """
+    _bump(models)
+    transaction.on_commit(lambda: _bump(models))
+
+
+def _invalidate(sender, **kwargs):
+    bump_generation(sender)
+
+
+def invalidate_on_change(*models):
+    """Hubungkan post_save / post_delete model ke bump_generation."""
+    for model in models:
+        uid = f'api-cache:{model._meta.label}'
+        post_save.connect(_invalidate, sender=model, dispatch_uid=uid)
+        post_delete.connect(_invalidate, sender=model, dispatch_uid=uid)
+
+
+# ==========================================
+# HIT / MISS COUNTER
+# ==========================================
+
+def record(name, result):
+    cache = get_cache()
+    key = STATS_KEY.format(name, result)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def get_stats(names):
+    cache = get_cache()
+    keys = {(name, result): STATS_KEY.format(name, result) for name in names for result in ('hit', 'miss')}
+    values = cache.get_many(keys.values())
+    stats = {}
+    for name in names:
+        hits = values.get(keys[(name, 'hit')], 0)
+        misses = values.get(keys[(name, 'miss')], 0)
+        total = hits + misses
+        stats[name] = {'hits': hits, 'misses': misses, 'hit_rate': round(hits / total, 4) if total else None}
+    return stats
+
+
+# ==========================================
+# VIEWSET MIXIN
+# ==========================================
+
+class CachedResponseMixin:
+    """
+    Cache hasil list / retrieve (data + ETag / Last-Modified) per URL lengkap
+    (host ikut, karena link next / previous pagination berupa URL absolut).
+
+    ViewSet mengisi `cache_models` = semua model yang isinya muncul di response
+    (termasuk nested, misal LeadPIC di LeadSerializer). Taruh sebelum
+    ConditionalMixin di MRO: cache hit dengan If-None-Match yang cocok langsung
+    304 tanpa query database sama sekali.
+    """
+    cache_models = None
+    cache_timeout = None
+
+    def get_cache_name(self):
+        return self.basename
+
+    def get_response_cache_key(self, request):
+        generations = get_generations(self.get_cache_models())
+        raw = '|'.join([request.build_absolute_uri(), request.accepted_renderer.media_type, *map(str, generations)])
+        return f'api-cache:{self.get_cache_name()}:{self.action}:{hashlib.md5(raw.encode()).hexdigest()}'
+
+    def get_cache_models(self):
+        return self.cache_models or [self.get_queryset().model]
+
+    def cached_response(self, request, handler, *args, **kwargs):
+        if not getattr(settings, 'API_CACHE_ENABLED', True):
+            return handler(request, *args, **kwargs)
+
+        cache = get_cache()
+        key = self.get_response_cache_key(request)
+        entry = cache.get(key)
+        if entry is not None:
+            record(self.get_cache_name(), 'hit')
+            data, headers = entry
+            response = get_conditional_response(
+                request, etag=headers.get('ETag'),
+                last_modified=parse_http_date_safe(headers.get('Last-Modified', '')),
+            )
+            if response is None:
+                response = Response(data)
+            for name, value in headers.items():
+                response[name] = value
+            response['X-Cache'] = 'HIT'
+            return response
+
+        record(self.get_cache_name(), 'miss')
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200 and isinstance(response, Response):
+            headers = {
+                name: response[name]
+                for name in ('ETag', 'Last-Modified', 'Cache-Control') if response.has_header(name)
+            }
+            timeout = self.cache_timeout or getattr(settings, 'API_CACHE_TIMEOUT', 300)
+            cache.set(key, (response.data, headers), timeout)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(request, super().retrieve, *args, **kwargs)
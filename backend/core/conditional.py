@@ -0,0 +1,119 @@
+import hashlib
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .cache import get_generations
+
+
+class ConditionalMixin:
+    """
+    Conditional request untuk list / retrieve / update / destroy ViewSet.
+
+    Validator dihitung tanpa serialisasi:
+    - list   : dengan cache bersama (API_CACHE_SHARED), generation counter
+               (core/cache.py) semua model di response (`cache_models`) + URL
+               lengkap, tanpa query database dan tanpa Last-Modified. Dengan
+               LocMem (per proses) counter worker lain tidak terlihat, jadi
+               dipakai COUNT + MAX(edited_at) dari queryset yang sudah difilter.
+    - detail : edited_at baris itu sendiri (+ relasi di `conditional_fields`)
+
+    GET dengan If-None-Match / If-Modified-Since yang masih cocok dijawab
+    304 Not Modified. PUT / PATCH / DELETE dengan If-Match (atau
+    If-Unmodified-Since) yang sudah basi dijawab 412 Precondition Failed.
+
+    `conditional_fields` berisi kolom timestamp yang ikut menentukan isi
+    response, termasuk relasi yang ikut diserialisasi (misal 'details__edited_at').
+    """
+    conditional_fields = ['edited_at']
+
+    def get_validators(self, queryset):
+        """Return (count, last_modified) untuk queryset."""
+        distinct = any('__' in field for field in self.conditional_fields)
+        aggregates = {f'last_{i}': Max(field) for i, field in enumerate(self.conditional_fields)}
+        row = queryset.order_by().aggregate(count=Count('pk', distinct=distinct), **aggregates)
+        timestamps = [row[key] for key in aggregates if row[key] is not None]
+        return row['count'], max(timestamps) if timestamps else None
+
+    def get_list_validators(self, request):
+        """Return (etag, last_modified) untuk list."""
+        if not getattr(settings, 'API_CACHE_SHARED', False):
+            count, last_modified = self.get_validators(self.filter_queryset(self.get_queryset()))
+            return self.make_etag(request.get_full_path(), count, last_modified), last_modified
+        models = self.get_cache_models() if hasattr(self, 'get_cache_models') else [self.get_queryset().model]
+        raw = '|'.join([request.get_full_path(), *map(str, get_generations(models))])
+        return quote_etag(hashlib.md5(raw.encode()).hexdigest()), None
+
+    def make_etag(self, key, count, last_modified):
+        stamp = last_modified.isoformat() if last_modified else ''
+        return quote_etag(hashlib.md5(f'{key}|{count}|{stamp}'.encode()).hexdigest())
+
+    def get_object_validators(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        value = self.kwargs[lookup_url_kwarg]
+        queryset = self.get_queryset().filter(**{self.lookup_field: value})
+        count, last_modified = self.get_validators(queryset)
+        if not count:
+            return None, None
+        # Detail: ETag tidak tergantung query string, supaya If-Match dari GET cocok untuk PUT
+        return self.make_etag(f'{queryset.model._meta.label}:{value}', count, last_modified), last_modified
+
+    def check_preconditions(self, request, etag, last_modified):
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        return get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+    def set_validator_headers(self, response, etag, last_modified):
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        # Browser selalu revalidasi (If-None-Match), response 304 tanpa body
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        etag, last_modified = self.get_list_validators(request)
+        response = self.check_preconditions(request, etag, last_modified)
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+        return self.set_validator_headers(response, etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        etag, last_modified = self.get_object_validators()
+        if etag is None:
+            return super().retrieve(request, *args, **kwargs)  # 404
+        response = self.check_preconditions(request, etag, last_modified)
+        if response is None:
+            response = super().retrieve(request, *args, **kwargs)
+        return self.set_validator_headers(response, etag, last_modified)
+
+    def conditional_write(self, request, write, *args, **kwargs):
+        if not any(header in request.META for header in ('HTTP_IF_MATCH', 'HTTP_IF_UNMODIFIED_SINCE')):
+            return write(request, *args, **kwargs)
+
+        with transaction.atomic():
+            # Kunci baris dulu supaya tidak ada write lain di antara cek dan simpan
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            list(
+                self.get_queryset().model.objects.select_for_update()
+                .filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]}).values_list('pk')
+            )
+            etag, last_modified = self.get_object_validators()
+            if etag is not None:
+                response = self.check_preconditions(request, etag, last_modified)
+                if response is not None:
+                    return response
+            return write(request, *args, **kwargs)
+
+    def update(self, request, *args, **kwargs):
+        response = self.conditional_write(request, super().update, *args, **kwargs)
+        if response.status_code == 200:
+            etag, last_modified = self.get_object_validators()
+            if etag is not None:
+                self.set_validator_headers(response, etag, last_modified)
+        return response
+
+    def destroy(self, request, *args, **kwargs):
+        return self.conditional_write(request, super().destroy, *args, **kwargs)
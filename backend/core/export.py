@@ -0,0 +1,111 @@
+import csv
+import tempfile
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+
+EXPORT_CHUNK_SIZE = 2000
+# Jumlah potongan (baris CSV / blok file) per lompatan thread di mode ASGI
+ASYNC_STREAM_BATCH = 256
+
+
+class Echo:
+    """Pseudo-buffer untuk csv.writer: writerow() langsung return string baris."""
+
+    def write(self, value):
+        return value
+
+
+async def iterate_async(iterator, batch_size=ASYNC_STREAM_BATCH):
+    """
+    Iterator sync -> async iterator. Handler ASGI Django membaca konten sync
+    StreamingHttpResponse dengan sync_to_async(list), jadi seluruh export masuk
+    memori. Di sini iterator (cursor DB / file) dibaca per batch di thread
+    request (thread_sensitive) dan dikirim satu batch per chunk.
+    """
+    iterator = iter(iterator)
+    next_batch = sync_to_async(lambda: list(islice(iterator, batch_size)), thread_sensitive=True)
+    while batch := await next_batch():
+        yield b''.join(batch)
+
+
+class ExportMixin:
+    """
+    Tambah endpoint <list>/export/?export_format=csv|xlsx ke ViewSet.
+
+    Data dibaca dengan values_list().iterator() (server-side cursor di
+    PostgreSQL) dan CSV langsung di-stream ke client, jadi memori tetap datar
+    berapapun jumlah barisnya; di bawah ASGI konten dikirim sebagai async
+    iterator (iterate_async). XLSX tidak di-stream: workbook ditulis dulu ke
+    file sementara di disk, baru dikirim setelah semua baris selesai. Filter
+    list view (get_queryset / filter_queryset) ikut berlaku.
+
+    ViewSet mengisi `export_fields` = [(header, lookup), ...]. Lookup ke relasi
+    reverse (misal 'pics__pic_name') menghasilkan satu baris per child.
+    """
+    export_fields = []
+    export_filename = 'export'
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        export_format = request.query_params.get('export_format', 'csv')
+        if export_format not in ('csv', 'xlsx'):
+            raise ValidationError({'export_format': 'Pilih csv atau xlsx'})
+
+        queryset = self.filter_queryset(self.get_queryset())
+        # prefetch/select_related tidak dipakai oleh values_list
+        queryset = queryset.prefetch_related(None).select_related(None)
+        rows = queryset.values_list(*[lookup for _, lookup in self.export_fields])
+        rows = rows.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        headers = [header for header, _ in self.export_fields]
+
+        filename = f"{self.export_filename}-{timezone.now():%Y%m%d-%H%M%S}.{export_format}"
+        if export_format == 'xlsx':
+            return self.export_xlsx(headers, rows, filename)
+        return self.export_csv(headers, rows, filename)
+
+    def export_csv(self, headers, rows, filename):
+        writer = csv.writer(Echo())
+
+        def stream():
+            yield writer.writerow(headers)
+            for row in rows:
+                yield writer.writerow(row)
+
+        response = StreamingHttpResponse(stream(), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return self.stream_response(response)
+
+    def export_xlsx(self, headers, rows, filename):
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            raise ValidationError({'export_format': 'openpyxl belum terinstall, gunakan csv'})
+
+        # write_only: baris langsung ditulis ke file sementara, tidak ditahan di memori
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append(headers)
+        for row in rows:
+            sheet.append([
+                value.replace(tzinfo=None) if hasattr(value, 'tzinfo') and value.tzinfo else value
+                for value in row
+            ])
+
+        output = tempfile.TemporaryFile()
+        workbook.save(output)
+        output.seek(0)
+        return self.stream_response(FileResponse(
+            output, as_attachment=True, filename=filename,
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        ))
+
+    def stream_response(self, response):
+        if isinstance(self.request._request, ASGIRequest):
+            response.streaming_content = iterate_async(response.streaming_content)
+        return response
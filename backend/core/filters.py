@@ -0,0 +1,163 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import BooleanField, Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+RANGE_LOOKUPS = ('gt', 'gte', 'lt', 'lte')
+
+
+class IndexedFilterBackend(BaseFilterBackend):
+    """
+    Filter & ordering deklaratif lewat query param, hanya untuk field yang ter-index.
+
+    ViewSet mendefinisikan:
+        filter_fields = {'source': ['exact', 'in'], 'date_in': ['gte', 'lte'], ...}
+        ordering_fields = ['created_at', 'date_in']
+        filter_aliases = {'date_from': 'date__gte'}   # opsional, nama param lama
+
+    Contoh: ?status_kanban=follow_up&gp_pic__in=EKA,WIRA&ordering=-date_in
+
+    Param yang merujuk field model tapi tidak ada di whitelist ditolak (400).
+    Kombinasi filter + ordering juga dicek terhadap index model (Meta.indexes,
+    FK, unique): kalau tidak ada index yang bisa dipakai untuk seek / urutan,
+    request ditolak supaya tidak memicu full table scan.
+    """
+    ordering_param = 'ordering'
+    max_in_values = 100
+
+    def filter_queryset(self, request, queryset, view):
+        filter_fields = getattr(view, 'filter_fields', None)
+        if filter_fields is None:
+            return queryset
+
+        model = queryset.model
+        filters = self.parse_filters(request, view, model, filter_fields)
+        ordering = self.get_ordering(request, queryset, view)
+
+        if not self.is_index_supported(model, filters, ordering):
+            raise ValidationError({
+                'detail': 'Kombinasi filter / ordering ini tidak didukung index, tambahkan filter yang lebih spesifik.',
+            })
+
+        for name, lookup, value in filters:
+            queryset = queryset.filter(**{name if lookup == 'exact' else f'{name}__{lookup}': value})
+        if self.ordering_param in request.query_params:
+            queryset = queryset.order_by(*ordering)
+        return queryset
+
+    # ------------------------------------------------------------------
+    # Parsing
+    # ------------------------------------------------------------------
+
+    def parse_filters(self, request, view, model, filter_fields):
+        aliases = getattr(view, 'filter_aliases', {})
+        model_fields = {field.name for field in model._meta.get_fields()}
+        filters = []
+        errors = {}
+
+        for param, raw in request.query_params.items():
+            key = aliases.get(param, param)
+            name, _, lookup = key.partition('__')
+            lookup = lookup or 'exact'
+
+            if name not in filter_fields:
+                if name in model_fields:
+                    errors[param] = 'Filter tidak didukung (field tidak ter-index)'
+                continue
+            if lookup not in filter_fields[name]:
+                errors[param] = f"Lookup '{lookup}' tidak didukung untuk {name}"
+                continue
+
+            field = model._meta.get_field(name)
+            if isinstance(field, BooleanField):
+                # ?is_paid=true / false (BooleanField.to_python hanya kenal True / False / 1 / 0)
+                raw = {'true': 'True', 'false': 'False'}.get(raw.lower(), raw)
+            try:
+                if lookup == 'in':
+                    values = [value for value in raw.split(',') if value]
+                    if not values or len(values) > self.max_in_values:
+                        errors[param] = f'Isi 1 - {self.max_in_values} nilai dipisah koma'
+                        continue
+                    value = [field.to_python(value) for value in values]
+                else:
+                    value = field.to_python(raw)
+            except DjangoValidationError as exc:
+                errors[param] = exc.messages
+                continue
+            filters.append((name, lookup, value))
+
+        if errors:
+            raise ValidationError(errors)
+        return filters
+
+    def get_ordering(self, request, queryset, view):
+        raw = request.query_params.get(self.ordering_param)
+        if not raw:
+            return [o for o in queryset.query.order_by if isinstance(o, str)]
+
+        name = raw.lstrip('-')
+        if name not in getattr(view, 'ordering_fields', []):
+            raise ValidationError({self.ordering_param: f"Ordering '{raw}' tidak didukung"})
+        # pk sebagai tie-breaker (dipakai juga oleh keyset pagination)
+        return [raw, '-pk' if raw.startswith('-') else 'pk']
+
+    # ------------------------------------------------------------------
+    # Index check
+    # ------------------------------------------------------------------
+
+    def get_index_paths(self, model):
+        """List (kolom index, kondisi partial index {field: value})."""
+        paths = []
+        for index in model._meta.indexes:
+            condition = self.parse_condition(index.condition)
+            if condition is None:
+                continue
+            paths.append(([name.lstrip('-') for name in index.fields], condition))
+        for field in model._meta.concrete_fields:
+            if field.primary_key or field.unique or field.db_index:
+                paths.append(([field.name], {}))
+        return paths
+
+    def parse_condition(self, condition):
+        # Hanya partial index dengan kondisi AND field=value yang dikenali
+        if condition is None:
+            return {}
+        if not isinstance(condition, Q) or condition.connector != Q.AND or condition.negated:
+            return None
+        result = {}
+        for child in condition.children:
+            if not isinstance(child, tuple) or '__' in child[0]:
+                return None
+            result[child[0]] = child[1]
+        return result
+
+    def is_index_supported(self, model, filters, ordering):
+        equal = {name: value for name, lookup, value in filters if lookup == 'exact'}
+        multi = {name for name, lookup, _ in filters if lookup == 'in'}
+        ranges = {name for name, lookup, _ in filters if lookup in RANGE_LOOKUPS}
+        # Kolom ordering yang nilainya sudah tetap karena filter "=" tidak perlu diurutkan
+        order_field = None
+        for name in ordering:
+            name = name.lstrip('-')
+            name = model._meta.pk.name if name == 'pk' else name
+            if name not in equal:
+                order_field = name
+                break
+
+        for columns, condition in self.get_index_paths(model):
+            if any(name not in equal or equal[name] != value for name, value in condition.items()):
+                continue
+
+            # Kolom depan index yang sudah di-filter "=" bisa dipakai untuk seek
+            prefix = 0
+            while prefix < len(columns) and columns[prefix] in equal:
+                prefix += 1
+            if prefix == len(columns):
+                return True
+
+            next_column = columns[prefix]
+            if next_column in ranges or next_column in multi:
+                return True
+            if not ranges and next_column == order_field:
+                return True
+        return False
@@ -0,0 +1,76 @@
+"""
+ID string k-sortable (gaya ULID) untuk primary key berprefix: L-, D-, DD-.
+
+    D-01JA8ZK3QH7T2M9X
+      |---------||----|
+       waktu ms   acak
+      (10 char)  (6 char)
+
+Crockford base32 huruf besar, urutan string = urutan waktu, jadi insert baru
+selalu jatuh di ujung kanan index PK (tidak memecah page di tengah B-tree
+seperti hash / random) dan tetap muat di kolom max_length=20 yang sudah ada.
+
+Dalam satu proses ID dijamin monoton naik (bagian acak di-increment kalau
+milidetiknya sama), antar proses bentrok hanya mungkin kalau milidetik DAN
+30 bit acaknya sama - model yang memakai ID ini mengulang insert dengan ID
+baru kalau itu terjadi (leads.models.GeneratedIdMixin).
+"""
+import secrets
+import threading
+import time
+
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+TIME_CHARS = 10
+RANDOM_CHARS = 6
+RANDOM_BITS = RANDOM_CHARS * 5
+
+_lock = threading.Lock()
+_last = [0, 0]  # (milidetik, bagian acak) ID terakhir di proses ini
+
+
+def _encode(value, length):
+    chars = []
+    for _ in range(length):
+        chars.append(ALPHABET[value & 31])
+        value >>= 5
+    return ''.join(reversed(chars))
+
+
+def _reserve(count):
+    """Return (milidetik, bagian acak awal) untuk `count` ID berurutan."""
+    with _lock:
+        now = int(time.time() * 1000)
+        if now > _last[0]:
+            # Sisakan ruang supaya count ID berikutnya tidak overflow
+            start = secrets.randbelow(max(2 ** RANDOM_BITS - count, 1))
+            ms = now
+        else:
+            ms, start = _last[0], _last[1] + 1
+            if start + count > 2 ** RANDOM_BITS:
+                ms, start = ms + 1, secrets.randbelow(max(2 ** RANDOM_BITS - count, 1))
+        _last[0], _last[1] = ms, start + count - 1
+        return ms, start
+
+
+def new_id(prefix=''):
+    return new_ids(prefix, 1)[0]
+
+
+def new_ids(prefix, count):
+    """Alokasikan `count` ID sekaligus (bulk_create / import), terurut naik."""
+    if count <= 0:
+        return []
+    ms, start = _reserve(count)
+    head = prefix + _encode(ms, TIME_CHARS)
+    return [head + _encode(start + i, RANDOM_CHARS) for i in range(count)]
+
+
+def id_timestamp(value):
+    """Waktu pembuatan (detik epoch) dari ID k-sortable; None untuk ID format lama."""
+    body = value.rsplit('-', 1)[-1]
+    if len(body) != TIME_CHARS + RANDOM_CHARS or any(char not in ALPHABET for char in body):
+        return None
+    ms = 0
+    for char in body[:TIME_CHARS]:
+        ms = ms * 32 + ALPHABET.index(char)
+    return ms / 1000
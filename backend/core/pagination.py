@@ -0,0 +1,240 @@
+import base64
+import datetime
+import json
+from collections import OrderedDict
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination dengan cursor opaque.
+
+    Posisi halaman disimpan sebagai nilai kolom ordering dari baris terakhir,
+    contoh (created_at, lead_id) untuk Lead, sehingga query berikutnya cukup
+    "WHERE (created_at, lead_id) < (...)" tanpa OFFSET. Baris baru yang masuk
+    di tengah-tengah tidak menggeser isi halaman yang sudah diambil client.
+    Kolom ordering yang nullable (misal Deal.paid_date) selalu diurutkan
+    NULLS LAST di kedua arah, dan filter keyset-nya memakai IS NULL.
+
+    Kalau request tidak mengirim `cursor` / `page_size` dan setting
+    API_UNPAGINATED_COMPAT aktif, response tetap berupa list biasa seperti
+    sebelumnya (mode kompatibilitas untuk client lama).
+    """
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE or 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.is_unpaginated(request):
+            return None
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset, view)
+        self.model = queryset.model
+
+        position, reverse = self.decode_cursor(request)
+
+        queryset = queryset.order_by(*self.get_order_by())
+        if position is not None:
+            queryset = queryset.filter(self.get_keyset_filter(position, reverse))
+        if reverse:
+            queryset = queryset.reverse()
+
+        # Ambil 1 baris ekstra untuk tahu masih ada halaman berikutnya atau tidak
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        if reverse:
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    # ------------------------------------------------------------------
+    # Konfigurasi
+    # ------------------------------------------------------------------
+
+    def is_unpaginated(self, request):
+        if self.cursor_query_param in request.query_params:
+            return False
+        if self.page_size_query_param in request.query_params:
+            return False
+        return getattr(settings, 'API_UNPAGINATED_COMPAT', False)
+
+    def get_page_size(self, request):
+        page_size = self.page_size
+        raw = request.query_params.get(self.page_size_query_param)
+        if raw:
+            # Input client yang salah: 400, bukan 404
+            try:
+                page_size = int(raw)
+            except ValueError:
+                raise ValidationError({self.page_size_query_param: 'Harus bilangan bulat positif'})
+            if page_size <= 0:
+                raise ValidationError({self.page_size_query_param: 'Harus bilangan bulat positif'})
+        return min(page_size, self.max_page_size)
+
+    def get_ordering(self, queryset, view):
+        """
+        Urutan diambil dari order_by queryset (hasil filter/ordering view),
+        fallback ke `keyset_ordering` milik view. Primary key selalu ditambah
+        di akhir sebagai tie-breaker supaya posisi cursor unik.
+        """
+        ordering = [o for o in queryset.query.order_by if isinstance(o, str)]
+        if not ordering:
+            ordering = list(getattr(view, 'keyset_ordering', None) or ['-pk'])
+
+        pk_names = {'pk', queryset.model._meta.pk.name}
+        if not any(o.lstrip('-') in pk_names for o in ordering):
+            desc = ordering[-1].startswith('-')
+            ordering.append('-pk' if desc else 'pk')
+        return tuple(ordering)
+
+    # ------------------------------------------------------------------
+    # Keyset
+    # ------------------------------------------------------------------
+
+    def get_field(self, name):
+        opts = self.model._meta
+        return opts.pk if name == 'pk' else opts.get_field(name)
+
+    def get_order_by(self):
+        # NULL di akhir untuk ASC maupun DESC (default PostgreSQL & SQLite berbeda);
+        # queryset.reverse() membaliknya jadi NULLS FIRST untuk halaman sebelumnya
+        order_by = []
+        for name in self.ordering:
+            field = name.lstrip('-')
+            if not self.get_field(field).null:
+                order_by.append(name)
+            elif name.startswith('-'):
+                order_by.append(F(field).desc(nulls_last=True))
+            else:
+                order_by.append(F(field).asc(nulls_last=True))
+        return order_by
+
+    def get_keyset_filter(self, position, reverse):
+        """
+        (a, b) < (x, y)  ==>  a < x OR (a = x AND b < y)
+        Arah perbandingan per kolom mengikuti tanda '-' di ordering; kolom
+        nullable mengikuti urutan NULLS LAST (lihat get_order_by).
+        """
+        condition = Q()
+        equal = Q()
+        for name, value in zip(self.ordering, position):
+            field = name.lstrip('-')
+            descending = name.startswith('-')
+            lookup = 'lt' if descending != reverse else 'gt'
+            if value is None:
+                # NULL ada di akhir: sesudahnya hanya NULL lain (tie-breaker kolom
+                # berikutnya), sebelumnya semua baris non-NULL
+                if reverse:
+                    condition |= equal & Q(**{f'{field}__isnull': False})
+                equal &= Q(**{f'{field}__isnull': True})
+                continue
+            beyond = Q(**{f'{field}__{lookup}': value})
+            if not reverse and self.get_field(field).null:
+                beyond |= Q(**{f'{field}__isnull': True})
+            condition |= equal & beyond
+            equal &= Q(**{field: value})
+        return condition
+
+    def get_position(self, instance):
+        # instance model, atau dict dari .values() (core/values.py)
+        position = []
+        for name in self.ordering:
+            field = self.get_field(name.lstrip('-'))
+            if isinstance(instance, dict):
+                position.append(instance[field.attname])
+            else:
+                position.append(getattr(instance, field.attname))
+        return position
+
+    # ------------------------------------------------------------------
+    # Cursor encode / decode
+    # ------------------------------------------------------------------
+
+    def encode_cursor(self, position, reverse):
+        values = []
+        for value in position:
+            if isinstance(value, (datetime.date, datetime.time)):
+                value = value.isoformat()
+            elif isinstance(value, Decimal):
+                value = str(value)
+            values.append(value)
+
+        payload = {'o': list(self.ordering), 'p': values}
+        if reverse:
+            payload['r'] = 1
+        raw = json.dumps(payload, separators=(',', ':')).encode()
+        encoded = base64.urlsafe_b64encode(raw).decode().rstrip('=')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if payload['o'] != list(self.ordering) or len(payload['p']) != len(self.ordering):
+                raise ValueError
+            position = [
+                self.get_field(name.lstrip('-')).to_python(value)
+                for name, value in zip(self.ordering, payload['p'])
+            ]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+        return position, bool(payload.get('r'))
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.get_position(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.get_position(self.page[0]), reverse=True)
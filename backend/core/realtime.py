@@ -0,0 +1,257 @@
+"""
+Update real-time lewat WebSocket (ASGI murni, tanpa Django Channels).
+
+    ws://<host>/ws/updates/?token=<access token JWT>&topics=leads,deals
+
+Client berlangganan topic (`leads`, `deals`, `activities`) dan menerima event
+ringkas (id + field yang relevan) setiap kali data berubah, jadi tidak perlu
+polling / refetch penuh. Event baru dikirim setelah transaksi commit
+(rollback tidak pernah ter-broadcast).
+
+Channel layer mengikuti settings REALTIME_CHANNEL_LAYER:
+- InMemoryChannelLayer : satu proses (development & test)
+- RedisChannelLayer    : banyak node / worker, lewat Redis pub/sub
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, transaction
+from django.utils.module_loading import import_string
+
+TOPICS = ('leads', 'deals', 'activities')
+
+# Close code (4000-4999 bebas dipakai aplikasi)
+CLOSE_UNAUTHORIZED = 4401
+CLOSE_NOT_FOUND = 4404
+
+_layer = None
+
+
+# ==========================================
+# CHANNEL LAYER
+# ==========================================
+
+class InMemoryChannelLayer:
+    """Fan-out ke queue subscriber di proses ini. publish() aman dipanggil dari thread mana pun."""
+
+    def __init__(self, **options):
+        self.groups = defaultdict(set)
+        self.lock = threading.Lock()
+
+    async def add(self, group, queue):
+        with self.lock:
+            self.groups[group].add((asyncio.get_running_loop(), queue))
+
+    async def discard(self, group, queue):
+        with self.lock:
+            self.groups[group] = {entry for entry in self.groups[group] if entry[1] is not queue}
+
+    def publish(self, group, message):
+        with self.lock:
+            subscribers = list(self.groups.get(group, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, message)
+            except RuntimeError:
+                pass  # loop koneksi sudah ditutup
+
+
+class RedisChannelLayer(InMemoryChannelLayer):
+    """
+    publish() lewat Redis PUBLISH, setiap proses punya satu listener
+    (PSUBSCRIBE) yang meneruskan pesan ke subscriber lokal.
+    """
+
+    def __init__(self, location=None, prefix='realtime:', **options):
+        super().__init__(**options)
+        try:
+            import redis
+        except ImportError as exc:
+            raise ImproperlyConfigured('RedisChannelLayer membutuhkan package "redis".') from exc
+        self.location = location
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(location)
+        self.listener = None
+
+    async def add(self, group, queue):
+        await super().add(group, queue)
+        if self.listener is None or self.listener.done():
+            self.listener = asyncio.get_running_loop().create_task(self.listen())
+
+    def publish(self, group, message):
+        self.client.publish(self.prefix + group, json.dumps(message, cls=DjangoJSONEncoder))
+
+    async def listen(self):
+        import redis.asyncio as aioredis
+
+        while True:
+            try:
+                client = aioredis.Redis.from_url(self.location)
+                pubsub = client.pubsub()
+                await pubsub.psubscribe(self.prefix + '*')
+                async for message in pubsub.listen():
+                    if message['type'] != 'pmessage':
+                        continue
+                    group = message['channel'].decode()[len(self.prefix):]
+                    super().publish(group, json.loads(message['data']))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                await asyncio.sleep(1)  # Redis putus, coba sambung lagi
+
+
+def get_channel_layer():
+    global _layer
+    if _layer is None:
+        config = dict(getattr(settings, 'REALTIME_CHANNEL_LAYER', {}))
+        backend = config.pop('BACKEND', 'core.realtime.InMemoryChannelLayer')
+        _layer = import_string(backend)(**{key.lower(): value for key, value in config.items()})
+    return _layer
+
+
+# ==========================================
+# BROADCAST
+# ==========================================
+
+def broadcast(topic, event):
+    """
+    Kirim event ke subscriber topic setelah transaksi commit (langsung kalau
+    di luar transaksi). Kalau transaksi rollback, event ikut dibuang.
+    """
+    message = {'topic': topic, **event}
+    transaction.on_commit(lambda: get_channel_layer().publish(topic, message))
+
+
+# ==========================================
+# WEBSOCKET APPLICATION
+# ==========================================
+
+def _authenticate(raw_token):
+    from core.authentication import CachedJWTAuthentication
+    from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+    close_old_connections()
+    try:
+        authentication = CachedJWTAuthentication()
+        token = authentication.get_validated_token(raw_token)
+        return authentication.get_user(token), token
+    except (InvalidToken, AuthenticationFailed):
+        return None, None
+    finally:
+        close_old_connections()
+
+
+def _get_token(scope, query):
+    if query.get('token'):
+        return query['token'][0]
+    # Client non-browser boleh kirim header Authorization: Bearer <token>
+    for name, value in scope.get('headers', []):
+        if name == b'authorization':
+            parts = value.decode().split()
+            if len(parts) == 2 and parts[0] in settings.SIMPLE_JWT.get('AUTH_HEADER_TYPES', ('Bearer',)):
+                return parts[1]
+    return None
+
+
+def _parse_topics(values):
+    if isinstance(values, str):
+        values = [values]
+    topics = [topic for value in values if isinstance(value, str) for topic in value.split(',')]
+    return [topic for topic in topics if topic in TOPICS]
+
+
+async def websocket_application(scope, receive, send):
+    """
+    Protokol (JSON):
+      client -> {"action": "subscribe" | "unsubscribe", "topics": [...]}, {"action": "ping"}
+      server -> {"type": "subscribed", "topics": [...]}, {"type": "pong"}, event per topic
+    Koneksi ditutup dengan code 4401 saat access token kedaluwarsa
+    (client sambung ulang dengan token hasil refresh).
+    """
+    message = await receive()
+    if message['type'] != 'websocket.connect':
+        return
+
+    if scope.get('path') != getattr(settings, 'REALTIME_PATH', '/ws/updates/'):
+        await send({'type': 'websocket.close', 'code': CLOSE_NOT_FOUND})
+        return
+
+    query = parse_qs(scope.get('query_string', b'').decode())
+    raw_token = _get_token(scope, query)
+    user, token = await sync_to_async(_authenticate)(raw_token) if raw_token else (None, None)
+    if user is None or not user.is_active:
+        # Close sebelum accept = handshake ditolak (HTTP 403)
+        await send({'type': 'websocket.close', 'code': CLOSE_UNAUTHORIZED})
+        return
+
+    await send({'type': 'websocket.accept'})
+
+    layer = get_channel_layer()
+    queue = asyncio.Queue()
+    subscribed = set()
+
+    async def send_json(data):
+        await send({'type': 'websocket.send', 'text': json.dumps(data, cls=DjangoJSONEncoder)})
+
+    async def subscribe(topics):
+        for topic in topics:
+            if topic not in subscribed:
+                await layer.add(topic, queue)
+                subscribed.add(topic)
+        await send_json({'type': 'subscribed', 'topics': sorted(subscribed)})
+
+    async def unsubscribe(topics):
+        for topic in topics:
+            if topic in subscribed:
+                await layer.discard(topic, queue)
+                subscribed.discard(topic)
+        await send_json({'type': 'subscribed', 'topics': sorted(subscribed)})
+
+    await subscribe(_parse_topics(query.get('topics', [])) if 'topics' in query else TOPICS)
+
+    receiver = asyncio.ensure_future(receive())
+    getter = asyncio.ensure_future(queue.get())
+    try:
+        while True:
+            timeout = max(token['exp'] - time.time(), 0)
+            done, _ = await asyncio.wait({receiver, getter}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                await send({'type': 'websocket.close', 'code': CLOSE_UNAUTHORIZED})
+                break
+
+            if getter in done:
+                await send_json(getter.result())
+                getter = asyncio.ensure_future(queue.get())
+
+            if receiver in done:
+                message = receiver.result()
+                if message['type'] == 'websocket.disconnect':
+                    break
+                receiver = asyncio.ensure_future(receive())
+                try:
+                    data = json.loads(message.get('text') or '{}')
+                except ValueError:
+                    continue
+                if not isinstance(data, dict):
+                    continue
+                action = data.get('action')
+                topics = _parse_topics(data.get('topics') or [])
+                if action == 'subscribe':
+                    await subscribe(topics)
+                elif action == 'unsubscribe':
+                    await unsubscribe(topics)
+                elif action == 'ping':
+                    await send_json({'type': 'pong'})
+    finally:
+        receiver.cancel()
+        getter.cancel()
+        for topic in subscribed:
+            await layer.discard(topic, queue)
@@ -0,0 +1,57 @@
+"""
+JSONRenderer berbasis orjson dengan output byte-identik dengan JSONRenderer DRF
+(compact, UTF-8 tanpa escape, \\u2028 / \\u2029 di-escape).
+
+Tipe yang tidak dikenal orjson (Decimal, lazy string, datetime, ...) diubah
+dengan JSONEncoder DRF yang sama. Kasus yang formatnya beda antara orjson dan
+json stdlib dialihkan ke JSONRenderer biasa:
+- float dengan eksponen (orjson '1e16', stdlib '1e+16'), dideteksi kasar
+  lewat pola <digit>e<digit / -> di output (string yang kebetulan cocok
+  hanya membuat response itu dirender ulang dengan json stdlib);
+- key dict non-string, integer > 64 bit;
+- indent (?format=json; indent=4, browsable API).
+Satu-satunya beda: float NaN / Infinity ditulis null, sedangkan JSONRenderer
+(STRICT_JSON) gagal dengan error 500.
+
+orjson opsional: tanpa paket itu renderer ini sama dengan JSONRenderer.
+"""
+import re
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# Diawali literal 'e' supaya regex memakai pencarian cepat, digit sebelumnya dicek manual
+_EXPONENT_RE = re.compile(rb'e[0-9-]')
+_DIGITS = frozenset(b'0123456789')
+
+
+class ORJSONRenderer(JSONRenderer):
+    encoder = JSONEncoder()
+
+    def default(self, obj):
+        return self.encoder.default(obj)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+        except (orjson.JSONEncodeError, TypeError):
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.has_exponent(ret):
+            return super().render(data, accepted_media_type, renderer_context)
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+    @staticmethod
+    def has_exponent(ret):
+        return any(match.start() and ret[match.start() - 1] in _DIGITS for match in _EXPONENT_RE.finditer(ret))
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 
+from .authentication import invalidate_user
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -24,4 +26,6 @@ class UserSerializer(serializers.ModelSerializer):
             instance.set_password(password)
         
         instance.save()
+        # User lama (password / status lama) jangan dipakai lagi oleh CachedJWTAuthentication
+        invalidate_user(instance.pk)
         return instance
\ No newline at end of file
@@ -10,9 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 from datetime import timedelta
 
+from corsheaders.defaults import default_headers
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -74,6 +77,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'core.wsgi.application'
+ASGI_APPLICATION = 'core.asgi.application'
 
 
 # Database
@@ -90,6 +94,34 @@ DATABASES = {
     }
 }
 
+# DB_ENGINE=sqlite -> pakai SQLite lokal (development / benchmark tanpa PostgreSQL)
+if os.environ.get('DB_ENGINE') == 'sqlite':
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+    }
+
+# Pemakaian ulang koneksi database (tanpa ini setiap request membuka koneksi baru):
+# - DB_POOL=1 : pool psycopg 3 (butuh paket psycopg[pool]), koneksi dikembalikan
+#   ke pool di akhir request. Django tidak mengizinkan pool bersama koneksi
+#   persisten, jadi CONN_MAX_AGE dipaksa 0.
+# - selain itu: koneksi persisten per thread selama DB_CONN_MAX_AGE detik
+#   (0 = tutup tiap request seperti dulu, kosong = tanpa batas).
+# Health check memastikan koneksi yang sudah putus (restart DB, idle timeout)
+# diganti sebelum dipakai.
+DB_POOL = os.environ.get('DB_POOL') == '1' and DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql'
+if DB_POOL:
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS'] = {'pool': {
+        'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+        'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 20)),
+        'timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+    }}
+else:
+    max_age = os.environ.get('DB_CONN_MAX_AGE', '60')
+    DATABASES['default']['CONN_MAX_AGE'] = int(max_age) if max_age else None
+DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -135,13 +167,79 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173", # Port default Vite
 ]
+# Conditional request (core/conditional.py): frontend boleh baca ETag & kirim If-Match
+CORS_EXPOSE_HEADERS = ['ETag', 'Last-Modified']
+CORS_ALLOW_HEADERS = (*default_headers, 'if-match', 'if-none-match', 'if-modified-since')
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+        # JWTAuthentication SimpleJWT + user di-cache (core/authentication.py)
+        'core.authentication.CachedJWTAuthentication',
+    ),
+    # orjson, output sama dengan JSONRenderer bawaan (core/renderers.py)
+    'DEFAULT_RENDERER_CLASSES': (
+        'core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    # Keyset pagination (?page_size=50 / ?cursor=...) untuk semua list endpoint
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.KeysetPagination',
+    'PAGE_SIZE': 50,
+    # Filter & ordering deklaratif (filter_fields / ordering_fields di ViewSet)
+    'DEFAULT_FILTER_BACKENDS': ['core.filters.IndexedFilterBackend'],
 }
 
+# Cache response API (core/cache.py). REDIS_URL / MEMCACHED_LOCATION untuk production,
+# tanpa itu LocMem (per proses, cukup untuk development & test)
+if os.environ.get('REDIS_URL'):
+    CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['REDIS_URL'],
+    }}
+elif os.environ.get('MEMCACHED_LOCATION'):
+    CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': os.environ['MEMCACHED_LOCATION'],
+    }}
+else:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+# Channel layer WebSocket (core/realtime.py). Redis kalau ada REDIS_URL supaya
+# event dari satu node sampai ke client yang tersambung ke node lain
+if os.environ.get('REDIS_URL'):
+    REALTIME_CHANNEL_LAYER = {
+        'BACKEND': 'core.realtime.RedisChannelLayer',
+        'LOCATION': os.environ['REDIS_URL'],
+    }
+else:
+    REALTIME_CHANNEL_LAYER = {'BACKEND': 'core.realtime.InMemoryChannelLayer'}
+REALTIME_PATH = '/ws/updates/'
+
+# Geocoding backend (leads/geocoding.py). RATE = request upstream per detik,
+# kebijakan Nominatim publik maksimal 1
+GEOCODER = {
+    'BACKEND': 'leads.geocoding.NominatimGeocoder',
+    'URL': os.environ.get('NOMINATIM_URL', 'https://nominatim.openstreetmap.org'),
+    'USER_AGENT': 'guestpro-crm/1.0',
+    'TIMEOUT': 10,
+    'RATE': 1.0,
+}
+
+API_CACHE_ENABLED = os.environ.get('API_CACHE_ENABLED', '1') == '1'
+API_CACHE_TIMEOUT = 300
+# Cache dipakai bersama semua worker / node (Redis / Memcached). Hanya dengan cache
+# bersama ETag list boleh dihitung dari generation counter (core/conditional.py)
+API_CACHE_SHARED = bool(os.environ.get('REDIS_URL') or os.environ.get('MEMCACHED_LOCATION'))
+# Detik user hasil autentikasi JWT di-cache (core/authentication.py)
+AUTH_USER_CACHE_TIMEOUT = 60
+
+# Handler async untuk list / retrieve lead & deal (core/async_views.py).
+# Di-set otomatis oleh core/asgi.py; ASYNC_API=0 untuk mematikannya di ASGI.
+ASYNC_API = os.environ.get('ASYNC_API') == '1'
+
+# True = request tanpa ?cursor / ?page_size tetap dapat list penuh (client lama).
+# Set False setelah semua client sudah pakai cursor.
+API_UNPAGINATED_COMPAT = True
+
 SIMPLE_JWT = {
     # Ubah umur token akses (misal jadi 60 menit atau 1 hari)
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60), 
@@ -4,9 +4,9 @@ from rest_framework.routers import DefaultRouter
 
 # Import ViewSets
 from activities.views import ActivityViewSet
-from leads.views import LeadViewSet, FollowUpViewSet, MeetingViewSet, QuotationViewSet, DealViewSet
+from leads.views import LeadViewSet, FollowUpViewSet, MeetingViewSet, QuotationViewSet, DealViewSet, SyncView
 # Import dari Core
-from core.views import RegisterView, UserViewSet
+from core.views import RegisterView, UserViewSet, CacheStatsView
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 router = DefaultRouter()
@@ -25,6 +25,8 @@ urlpatterns = [
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/register/', RegisterView.as_view(), name='auth_register'),
+    path('api/cache-stats/', CacheStatsView.as_view(), name='cache_stats'),
+    path('api/sync/', SyncView.as_view(), name='sync'),
 
     # API Routes
     path('api/', include(router.urls)),
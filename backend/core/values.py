@@ -0,0 +1,321 @@
+"""
+Serialisasi read-only cepat untuk list besar, dibangun dari .values().
+
+ModelSerializer membuat instance model per baris lalu memanggil
+get_attribute + to_representation per field. ValuesSerializer membaca
+definisi field serializer yang sama satu kali, lalu:
+
+- baris parent diambil dengan satu query .values() (FK ke depan lewat JOIN,
+  misal 'lead.property' -> 'lead__property'), tanpa instance model;
+- child many=True (pics, details) diambil dengan satu query per relasi
+  (WHERE fk IN ...) dan dikelompokkan per parent dalam satu kali iterasi;
+- nilai dikonversi dengan to_representation field DRF aslinya (kecuali
+  str / int / bool / float yang sudah dalam bentuk akhir), jadi hasilnya
+  sama persis dengan serializer.data - termasuk field yang dilewati
+  (SkipField) kalau relasi perantaranya NULL;
+- kolom file (FileField / ImageField) berisi nama file mentah, diubah jadi
+  URL lewat storage field model, absolut kalau context berisi request.
+
+Serializer dengan field yang tidak bisa dipetakan ke kolom (SerializerMethodField,
+source='*', property / method model, nested non-many, M2M) tidak didukung;
+ValuesListMixin lalu kembali ke jalur serializer biasa.
+"""
+from collections import defaultdict
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import fields as drf_fields
+from rest_framework import relations, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+# Field DRF yang to_representation-nya tidak mengubah nilai dari kolom model
+# yang sesuai (CharField -> str, IntegerField -> int, ...)
+PASSTHROUGH_FIELDS = (
+    drf_fields.CharField, drf_fields.EmailField, drf_fields.URLField, drf_fields.SlugField,
+    drf_fields.IntegerField, drf_fields.BooleanField, drf_fields.FloatField,
+)
+_EMPTY = object()
+
+
+def prefetch_ordering(queryset):
+    """{relasi: order_by} dari Prefetch(queryset=...order_by(...)) milik queryset."""
+    return {
+        lookup.prefetch_to: list(lookup.queryset.query.order_by)
+        for lookup in queryset._prefetch_related_lookups
+        if isinstance(lookup, Prefetch) and lookup.queryset is not None and lookup.queryset.query.order_by
+    }
+
+
+class IsoDateTime:
+    """
+    DateTimeField format ISO 8601. to_representation DRF mencari timezone aktif
+    (asgiref Local) untuk setiap nilai; di sini cukup sekali per serialize().
+    """
+
+    def __init__(self, field):
+        self.field = field
+
+    def bind(self, context=None):
+        tz = self.field.default_timezone()
+        fallback = self.field.to_representation
+
+        def convert(value):
+            if tz is None or isinstance(value, str) or value.tzinfo is None:
+                return fallback(value)
+            try:
+                value = value.astimezone(tz).isoformat()
+            except OverflowError:
+                return fallback(value)
+            return value[:-6] + 'Z' if value.endswith('+00:00') else value
+        return convert
+
+
+class FileUrl:
+    """
+    FileField / ImageField dari nama file di kolom, sama dengan
+    FileField.to_representation DRF (yang butuh FieldFile, bukan string).
+    """
+
+    def __init__(self, field, model_field):
+        self.field = field
+        self.storage = model_field.storage
+
+    def bind(self, context=None):
+        if not getattr(self.field, 'use_url', api_settings.UPLOADED_FILES_USE_URL):
+            return lambda name: name or None
+        request = (context or {}).get('request')
+        storage = self.storage
+
+        def convert(name):
+            if not name:
+                return None
+            url = storage.url(name)
+            return request.build_absolute_uri(url) if request is not None else url
+        return convert
+
+
+class Unsupported(Exception):
+    """Serializer tidak bisa dibangun dari .values()."""
+
+
+class ValuesSerializer:
+    _instances = {}
+
+    @classmethod
+    def for_serializer(cls, serializer_class):
+        """Return ValuesSerializer (di-cache per class), atau None kalau tidak didukung."""
+        if serializer_class not in cls._instances:
+            try:
+                cls._instances[serializer_class] = cls(serializer_class)
+            except Unsupported:
+                cls._instances[serializer_class] = None
+        return cls._instances[serializer_class]
+
+    def __init__(self, serializer_class):
+        serializer = serializer_class()
+        self.model = serializer.Meta.model
+        opts = self.model._meta
+        self.pk_name = opts.pk.attname
+        # (nama output, lookup nilai, lookup relasi perantara, konversi, aksi kalau relasi NULL)
+        self.columns = []
+        # (nama output, relasi, ValuesSerializer child, fk attname di child)
+        self.nested = []
+        self.layout = []  # urutan field output: ('column', i) / ('nested', i)
+
+        lookups = {self.pk_name}
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.ListSerializer):
+                self.layout.append(('nested', len(self.nested)))
+                self.nested.append((name, field.source, *self.resolve_nested(field)))
+                continue
+            if isinstance(field, (serializers.BaseSerializer, relations.ManyRelatedField)):
+                raise Unsupported(name)
+
+            lookup, parents = self.resolve_source(field)
+            lookups.update([lookup, *parents])
+            convert = self.get_converter(field)
+            if isinstance(field, drf_fields.FileField):
+                convert = FileUrl(field, self.get_model_field(lookup))
+            self.layout.append(('column', len(self.columns)))
+            self.columns.append((name, lookup, parents, convert, self.get_missing(field)))
+        self.lookups = sorted(lookups)
+
+    # ------------------------------------------------------------------
+    # Pemetaan field serializer -> lookup .values()
+    # ------------------------------------------------------------------
+
+    def resolve_source(self, field):
+        """Return (lookup nilai, [lookup pk relasi perantara])."""
+        if field.source == '*' or isinstance(field, drf_fields.SerializerMethodField):
+            raise Unsupported(field.field_name)
+
+        model, path = self.model, []
+        attrs = field.source_attrs
+        for i, attr in enumerate(attrs):
+            try:
+                model_field = model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                if attr == 'pk' and i == len(attrs) - 1:
+                    return '__'.join([*path, model._meta.pk.name]), self.parent_lookups(path)
+                raise Unsupported(field.field_name)
+            if not model_field.concrete:
+                raise Unsupported(field.field_name)
+            path.append(attr)
+            if i < len(attrs) - 1:
+                if not (model_field.many_to_one or model_field.one_to_one):
+                    raise Unsupported(field.field_name)
+                model = model_field.related_model
+
+        if isinstance(field, relations.RelatedField):
+            # PrimaryKeyRelatedField: nilai FK mentah (PKOnlyObject -> pk)
+            if not isinstance(field, relations.PrimaryKeyRelatedField) or field.pk_field is not None:
+                raise Unsupported(field.field_name)
+        return '__'.join(path), self.parent_lookups(path)
+
+    def get_model_field(self, lookup):
+        model = self.model
+        for attr in lookup.split('__'):
+            model_field = model._meta.get_field(attr)
+            model = model_field.related_model
+        return model_field
+
+    @staticmethod
+    def parent_lookups(path):
+        # 'pic_lead__pic_name' -> ['pic_lead'] (NULL = relasinya kosong)
+        return ['__'.join(path[:i]) for i in range(1, len(path))]
+
+    def resolve_nested(self, field):
+        try:
+            relation = self.model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            raise Unsupported(field.field_name)
+        if not relation.one_to_many:
+            raise Unsupported(field.field_name)
+        child = ValuesSerializer(type(field.child))
+        return child, relation.field.attname
+
+    @staticmethod
+    def get_converter(field):
+        if isinstance(field, relations.RelatedField):
+            return None
+        if type(field) in PASSTHROUGH_FIELDS:
+            return None
+        if type(field) is drf_fields.DateTimeField and not hasattr(field, 'timezone'):
+            output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+            if output_format and output_format.lower() == drf_fields.ISO_8601:
+                return IsoDateTime(field)
+        # Pilihan berupa string: to_representation mengembalikan nilai yang sama
+        if type(field) is drf_fields.ChoiceField and all(
+            type(value) is str for value in field.choice_strings_to_values.values()
+        ):
+            return None
+        return field.to_representation
+
+    @staticmethod
+    def get_missing(field):
+        """Nilai kalau relasi perantara NULL, mengikuti Field.get_attribute (AttributeError)."""
+        if field.default is not drf_fields.empty:
+            return field.get_default()
+        if field.allow_null:
+            return None
+        return _EMPTY  # required=False -> SkipField: key tidak ditulis
+
+    # ------------------------------------------------------------------
+    # Serialisasi
+    # ------------------------------------------------------------------
+
+    def get_queryset(self, queryset, extra=()):
+        """Queryset .values() untuk serialize(); extra = kolom tambahan (misal ordering)."""
+        return queryset.prefetch_related(None).select_related(None).values(*self.lookups, *extra)
+
+    def serialize(self, rows, ordering=None, context=None):
+        """
+        List dict sama dengan serializer(many=True, context=context).data.
+        `ordering` = urutan child per relasi ({'details': ['created_at', 'pk']},
+        lihat prefetch_ordering); default Meta.ordering child, lalu pk.
+        """
+        rows = list(rows)
+        ordering = ordering or {}
+        children = [
+            child.grouped(fk_name, [row[self.pk_name] for row in rows], ordering.get(source), context)
+            for _, source, child, fk_name in self.nested
+        ]
+
+        columns = [
+            (name, lookup, parents, convert.bind(context) if isinstance(convert, (IsoDateTime, FileUrl)) else convert,
+             missing)
+            for name, lookup, parents, convert, missing in self.columns
+        ]
+        data = []
+        for row in rows:
+            item = {}
+            for kind, index in self.layout:
+                if kind == 'nested':
+                    item[self.nested[index][0]] = children[index].get(row[self.pk_name], [])
+                    continue
+                name, lookup, parents, convert, missing = columns[index]
+                if parents and any(row[parent] is None for parent in parents):
+                    if missing is not _EMPTY:
+                        item[name] = missing
+                    continue
+                value = row[lookup]
+                item[name] = value if value is None or convert is None else convert(value)
+            data.append(item)
+        return data
+
+    def grouped(self, fk_name, parent_ids, ordering=None, context=None):
+        """{parent_id: [child, ...]} untuk semua parent sekaligus (1 query, 1 iterasi)."""
+        groups = defaultdict(list)
+        if not parent_ids:
+            return groups
+        ordering = ordering or self.model._meta.ordering or ['pk']
+        rows = list(
+            self.model._default_manager.filter(**{f'{fk_name}__in': parent_ids})
+            .order_by(fk_name, *ordering)
+            .values(fk_name, *self.lookups)
+        )
+        for row, item in zip(rows, self.serialize(rows, context=context)):
+            groups[row[fk_name]].append(item)
+        return groups
+
+
+class ValuesListMixin:
+    """
+    Endpoint list ViewSet memakai ValuesSerializer (serializer_class yang sama).
+    Diletakkan tepat sebelum viewsets.ModelViewSet supaya cache / conditional
+    tetap membungkus list ini. `values_list_enabled = False` untuk mematikan.
+    """
+    values_list_enabled = True
+
+    def get_values_serializer(self):
+        if not self.values_list_enabled:
+            return None
+        return ValuesSerializer.for_serializer(self.get_serializer_class())
+
+    def get_values_queryset(self, reader, queryset):
+        # Kolom ordering ikut diambil: KeysetPagination membaca posisi cursor dari baris
+        ordering = [o.lstrip('-') for o in queryset.query.order_by if isinstance(o, str)]
+        extra = []
+        for name in ordering:
+            try:
+                extra.append(queryset.model._meta.get_field(name).attname)
+            except FieldDoesNotExist:
+                pass
+        return reader.get_queryset(queryset, extra)
+
+    def list(self, request, *args, **kwargs):
+        reader = self.get_values_serializer()
+        if reader is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        ordering = prefetch_ordering(queryset)
+        queryset = self.get_values_queryset(reader, queryset)
+        context = self.get_serializer_context()
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(reader.serialize(page, ordering, context))
+        return Response(reader.serialize(queryset, ordering, context))
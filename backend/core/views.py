@@ -1,6 +1,10 @@
 from rest_framework import viewsets, generics
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from django.contrib.auth.models import User
+from .authentication import invalidate_user
+from .cache import CachedResponseMixin, get_stats
 from .serializers import UserSerializer
 
 # View untuk Register Publik (Dipakai di Login page jika ada sign up)
@@ -13,4 +17,21 @@ class RegisterView(generics.CreateAPIView):
 class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all().order_by('id')
     serializer_class = UserSerializer
-    permission_classes = [IsAuthenticated]
\ No newline at end of file
+    permission_classes = [IsAuthenticated]
+
+    def perform_destroy(self, instance):
+        user_id = instance.pk
+        super().perform_destroy(instance)
+        invalidate_user(user_id)
+
+# Statistik hit / miss cache response per endpoint (core/cache.py)
+class CacheStatsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        from .urls import router
+        names = [
+            basename for prefix, viewset, basename in router.registry
+            if issubclass(viewset, CachedResponseMixin)
+        ]
+        return Response(get_stats(names))
@@ -0,0 +1,280 @@
+"""
+Analytics pipeline & revenue dari summary table.
+
+PipelineSummary / RevenueSummary diperbarui secara incremental: setiap lead /
+deal menyimpan kontribusi terakhirnya di LeadSummaryState / DealSummaryState,
+lalu refresh_leads() / refresh_deals() menghitung selisih (kontribusi baru -
+lama) dan hanya menambah / mengurangi baris summary yang terdampak. Baris
+sumber & state dikunci (SELECT ... FOR UPDATE) selama delta dihitung dan
+diterapkan, jadi refresh paralel untuk lead / deal yang sama berjalan
+bergantian dan tidak menerapkan delta yang sama dua kali.
+
+Refresh dijadwalkan lewat signal (leads/signals.py) setelah transaksi commit.
+Jalur bulk yang tidak memicu signal (bulk_transition, import, generate_dataset)
+memanggil schedule_refresh() / refresh_*() langsung.
+
+Tabel revenue ternormalisasi (MRR / ARR per product, komisi; leads/revenue.py)
+ikut diperbarui dari refresh_leads() / refresh_deals().
+"""
+import threading
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+
+from .models import (
+    Lead, Deal, PipelineSummary, RevenueSummary, LeadSummaryState, DealSummaryState,
+)
+from .revenue import refresh_commissions, refresh_revenue
+
+BATCH_SIZE = 500
+ZERO = Decimal('0')
+
+_pending = threading.local()
+
+
+# ==========================================
+# INCREMENTAL UPDATE
+# ==========================================
+
+def _apply_deltas(model, key_fields, deltas):
+    """Tambahkan delta ke baris summary (UPDATE ... SET x = x + delta, INSERT kalau belum ada)."""
+    for key, values in deltas.items():
+        values = {field: value for field, value in values.items() if value}
+        if not values:
+            continue
+        lookup = dict(zip(key_fields, key))
+        increments = {field: F(field) + value for field, value in values.items()}
+        if model.objects.filter(**lookup).update(**increments):
+            continue
+        try:
+            with transaction.atomic():
+                model.objects.create(**lookup, **values)
+        except IntegrityError:
+            # Baris dibuat transaksi lain di antara UPDATE dan INSERT
+            model.objects.filter(**lookup).update(**increments)
+
+
+def refresh_leads(lead_ids):
+    """
+    Sinkronkan kontribusi lead_ids ke PipelineSummary. Lead yang gp_pic-nya
+    berubah ikut me-refresh deal-nya (revenue per gp_pic).
+    """
+    lead_ids = list(dict.fromkeys(lead_ids))
+    moved = []
+    for start in range(0, len(lead_ids), BATCH_SIZE):
+        batch = lead_ids[start:start + BATCH_SIZE]
+        with transaction.atomic():
+            # Kunci baris lead lalu state-nya sebelum menghitung delta: refresh
+            # paralel untuk lead yang sama menunggu di sini, lalu membaca state
+            # yang sudah diperbarui (delta tidak diterapkan dua kali)
+            current = {
+                lead_id: (status, gp_pic)
+                for lead_id, status, gp_pic in Lead.objects.filter(pk__in=batch)
+                .order_by('pk').select_for_update().values_list('lead_id', 'status_kanban', 'gp_pic')
+            }
+            previous = {
+                lead_id: (status, gp_pic)
+                for lead_id, status, gp_pic in LeadSummaryState.objects.filter(pk__in=batch)
+                .order_by('pk').select_for_update().values_list('lead_id', 'status_kanban', 'gp_pic')
+            }
+
+            deltas = defaultdict(lambda: {'lead_count': 0})
+            changed, removed = [], []
+            for lead_id in batch:
+                old, new = previous.get(lead_id), current.get(lead_id)
+                if old == new:
+                    continue
+                if old:
+                    deltas[old]['lead_count'] -= 1
+                if new:
+                    deltas[new]['lead_count'] += 1
+                    changed.append(LeadSummaryState(lead_id=lead_id, status_kanban=new[0], gp_pic=new[1]))
+                else:
+                    removed.append(lead_id)
+                if old and new and old[1] != new[1]:
+                    moved.append(lead_id)
+
+            _apply_deltas(PipelineSummary, ['status_kanban', 'gp_pic'], deltas)
+            if changed:
+                LeadSummaryState.objects.bulk_create(
+                    changed, update_conflicts=True, unique_fields=['lead_id'],
+                    update_fields=['status_kanban', 'gp_pic'],
+                )
+            if removed:
+                LeadSummaryState.objects.filter(pk__in=removed).delete()
+
+    refresh_commissions(lead_ids)
+    if moved:
+        refresh_deals(Deal.objects.filter(lead_id__in=moved).values_list('pk', flat=True))
+
+
+def refresh_deals(deal_ids):
+    """Sinkronkan kontribusi deal_ids (termasuk total DealDetail-nya) ke RevenueSummary."""
+    deal_ids = list(dict.fromkeys(deal_ids))
+    for start in range(0, len(deal_ids), BATCH_SIZE):
+        batch = deal_ids[start:start + BATCH_SIZE]
+        with transaction.atomic():
+            # Sama dengan refresh_leads: kunci deal & state-nya dulu. Query total di
+            # bawah memakai GROUP BY (tidak bisa FOR UPDATE), jadi dikunci terpisah
+            list(Deal.objects.filter(pk__in=batch).order_by('pk').select_for_update().values_list('pk', flat=True))
+            previous = {
+                row[0]: row[1:]
+                for row in DealSummaryState.objects.filter(pk__in=batch).order_by('pk').select_for_update()
+                .values_list('deal_id', 'month', 'gp_pic', 'deal_type', 'product_amount', 'initiation_amount')
+            }
+            rows = (
+                Deal.objects.filter(pk__in=batch).order_by()
+                .values('deal_id', 'date', 'deal_type', 'lead__gp_pic')
+                .annotate(product=Sum('details__product_amount'), initiation=Sum('details__initiation_amount'))
+            )
+            current = {
+                row['deal_id']: (
+                    row['date'].replace(day=1), row['lead__gp_pic'], row['deal_type'],
+                    row['product'] or ZERO, row['initiation'] or ZERO,
+                )
+                for row in rows
+            }
+
+            deltas = defaultdict(lambda: {'deal_count': 0, 'product_amount': ZERO, 'initiation_amount': ZERO})
+            changed, removed = [], []
+            for deal_id in batch:
+                old, new = previous.get(deal_id), current.get(deal_id)
+                if old == new:
+                    continue
+                if old:
+                    delta = deltas[old[:3]]
+                    delta['deal_count'] -= 1
+                    delta['product_amount'] -= old[3]
+                    delta['initiation_amount'] -= old[4]
+                if new:
+                    delta = deltas[new[:3]]
+                    delta['deal_count'] += 1
+                    delta['product_amount'] += new[3]
+                    delta['initiation_amount'] += new[4]
+                    changed.append(DealSummaryState(
+                        deal_id=deal_id, month=new[0], gp_pic=new[1], deal_type=new[2],
+                        product_amount=new[3], initiation_amount=new[4],
+                    ))
+                else:
+                    removed.append(deal_id)
+
+            _apply_deltas(RevenueSummary, ['month', 'gp_pic', 'deal_type'], deltas)
+            if changed:
+                DealSummaryState.objects.bulk_create(
+                    changed, update_conflicts=True, unique_fields=['deal_id'],
+                    update_fields=['month', 'gp_pic', 'deal_type', 'product_amount', 'initiation_amount'],
+                )
+            if removed:
+                DealSummaryState.objects.filter(pk__in=removed).delete()
+
+    # Ditulis ulang walau total tidak berubah (product / product_amount_by bisa berubah)
+    refresh_revenue(deal_ids)
+
+
+def schedule_refresh(lead_ids=(), deal_ids=()):
+    """Kumpulkan lead / deal yang berubah, refresh sekali setelah transaksi commit."""
+    if not hasattr(_pending, 'leads'):
+        _pending.leads, _pending.deals = set(), set()
+    _pending.leads.update(lead_ids)
+    _pending.deals.update(deal_ids)
+    transaction.on_commit(flush_refresh)
+
+
+def flush_refresh():
+    lead_ids = getattr(_pending, 'leads', None)
+    deal_ids = getattr(_pending, 'deals', None)
+    if lead_ids or deal_ids:
+        _pending.leads, _pending.deals = set(), set()
+        refresh_leads(lead_ids)
+        refresh_deals(deal_ids)
+
+
+def rebuild_summaries(batch_size=BATCH_SIZE):
+    """Kosongkan summary & hitung ulang dari data mentah (backfill)."""
+    with transaction.atomic():
+        for model in [PipelineSummary, RevenueSummary, LeadSummaryState, DealSummaryState]:
+            model.objects.all().delete()
+
+    for model, refresh in [(Lead, refresh_leads), (Deal, refresh_deals)]:
+        batch = []
+        for pk in model.objects.order_by().values_list('pk', flat=True).iterator(chunk_size=batch_size):
+            batch.append(pk)
+            if len(batch) >= batch_size:
+                refresh(batch)
+                batch = []
+        if batch:
+            refresh(batch)
+
+
+# ==========================================
+# QUERY (hanya baca summary table)
+# ==========================================
+
+def get_pipeline_analytics():
+    statuses = Lead.STATUS_KANBAN_CHOICES
+
+    counts = defaultdict(int)
+    by_gp_pic = defaultdict(lambda: {status: 0 for status, _ in statuses})
+    for status, gp_pic, count in PipelineSummary.objects.filter(lead_count__gt=0).values_list(
+        'status_kanban', 'gp_pic', 'lead_count',
+    ):
+        counts[status] += count
+        by_gp_pic[gp_pic][status] = count
+
+    # Lead yang sudah mencapai stage ke-i = lead di stage i atau sesudahnya
+    reached = []
+    total = 0
+    for status, _ in reversed(statuses):
+        total += counts[status]
+        reached.insert(0, total)
+
+    funnel = []
+    for index, (status, label) in enumerate(statuses):
+        next_reached = reached[index + 1] if index + 1 < len(statuses) else None
+        rate = None
+        if next_reached is not None and reached[index]:
+            rate = round(next_reached / reached[index], 4)
+        funnel.append({
+            'status': status, 'label': label, 'count': counts[status],
+            'reached': reached[index], 'conversion_rate': rate,
+        })
+
+    deal_types = defaultdict(int)
+    months = defaultdict(lambda: [0, ZERO, ZERO])
+    revenue_gp_pic = defaultdict(lambda: [0, ZERO, ZERO])
+    for month, gp_pic, deal_type, count, product, initiation in RevenueSummary.objects.values_list(
+        'month', 'gp_pic', 'deal_type', 'deal_count', 'product_amount', 'initiation_amount',
+    ):
+        deal_types[deal_type] += count
+        for bucket in (months[month], revenue_gp_pic[gp_pic]):
+            bucket[0] += count
+            bucket[1] += product
+            bucket[2] += initiation
+
+    def revenue_row(key, name, values):
+        count, product, initiation = values
+        return {
+            key: name, 'deal_count': count, 'product_amount': str(product),
+            'initiation_amount': str(initiation), 'total_amount': str(product + initiation),
+        }
+
+    return {
+        'funnel': funnel,
+        'pipeline_by_gp_pic': [
+            {'gp_pic': gp_pic, **counts_by_status} for gp_pic, counts_by_status in sorted(by_gp_pic.items())
+        ],
+        'deal_types': [
+            {'deal_type': deal_type, 'count': deal_types[deal_type]}
+            for deal_type, _ in Deal.DEAL_TYPES if deal_types[deal_type]
+        ],
+        'revenue_by_month': [
+            revenue_row('month', month.strftime('%Y-%m'), values)
+            for month, values in sorted(months.items()) if values[0]
+        ],
+        'revenue_by_gp_pic': [
+            revenue_row('gp_pic', gp_pic, values)
+            for gp_pic, values in sorted(revenue_gp_pic.items()) if values[0]
+        ],
+    }
@@ -0,0 +1,146 @@
+"""
+Query lokasi (lead / meeting terdekat, isi bounding box peta).
+
+Koordinat string (Lead.coordinates "lat, lng", Meeting.latitude / longitude)
+disalin ke kolom numerik lat / lng + geohash setiap save (GeoLocated di
+models.py). Query memakai index geohash: bounding box ditutup dengan
+beberapa sel geohash (range scan per prefix), lalu disaring lat / lng dan
+diurutkan jarak haversine di database.
+
+Index B-tree biasa, jalan di SQLite maupun PostgreSQL. Untuk data yang jauh
+lebih besar di PostgreSQL, geohash bisa diganti PostGIS (GiST) tanpa
+mengubah endpoint.
+"""
+import math
+import re
+
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 9  # ~5 m
+MAX_CELLS = 32
+# Batas area pencarian (endpoint nearby): area lebih besar hanya bisa ditutup sel
+# geohash yang sangat kasar, praktis sama dengan scan seluruh tabel
+MAX_RADIUS_KM = 200
+MAX_BBOX_DEGREES = 5
+
+_POINT_RE = re.compile(r'(-?\d+(?:\.\d+)?)\s*[,;\s]\s*(-?\d+(?:\.\d+)?)')
+
+
+# ==========================================
+# PARSE & ENCODE
+# ==========================================
+
+def make_point(lat, lng):
+    """Return (lat, lng) float, atau None kalau kosong / di luar jangkauan."""
+    try:
+        lat, lng = float(lat), float(lng)
+    except (TypeError, ValueError):
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180) or math.isnan(lat) or math.isnan(lng):
+        return None
+    return lat, lng
+
+
+def parse_point(text):
+    """'-8.506800, 115.262500' -> (-8.5068, 115.2625)."""
+    match = _POINT_RE.search(text or '')
+    return make_point(*match.groups()) if match else None
+
+
+def encode_geohash(lat, lng, precision=GEOHASH_PRECISION):
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        bounds, coordinate = (lng_range, lng) if even else (lat_range, lat)
+        middle = (bounds[0] + bounds[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            bounds[0] = middle
+        else:
+            bounds[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """Ukuran sel geohash (tinggi, lebar) dalam derajat."""
+    lng_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 // 2
+    return 180 / 2 ** lat_bits, 360 / 2 ** lng_bits
+
+
+def covering_cells(south, west, north, east, max_cells=MAX_CELLS):
+    """
+    Sel geohash dengan presisi setinggi mungkin yang menutup bounding box
+    dalam maksimal `max_cells` sel. Return [] kalau box terlalu besar.
+    """
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        rows = math.floor(north / height) - math.floor(south / height) + 1
+        cols = math.floor(east / width) - math.floor(west / width) + 1
+        if rows * cols > max_cells:
+            continue
+        cells = set()
+        for row in range(rows):
+            lat = min(south + row * height, north)
+            for col in range(cols):
+                lng = min(west + col * width, east)
+                cells.add(encode_geohash(lat, lng, precision))
+        # Titik sudut utara / timur bisa jatuh di sel berikutnya
+        for lat in (south, north):
+            for lng in (west, east):
+                cells.add(encode_geohash(lat, lng, precision))
+        return sorted(cells)
+    return []
+
+
+# ==========================================
+# QUERY
+# ==========================================
+
+def distance_km(lat, lng):
+    """Ekspresi jarak haversine (km) dari kolom lat / lng ke titik (lat, lng)."""
+    lat_r, lng_r = math.radians(lat), math.radians(lng)
+    a = (
+        Power(Sin((Radians(F('lat')) - Value(lat_r)) / 2), 2)
+        + Value(math.cos(lat_r)) * Cos(Radians(F('lat'))) * Power(Sin((Radians(F('lng')) - Value(lng_r)) / 2), 2)
+    )
+    return Value(2 * EARTH_RADIUS_KM) * ASin(Sqrt(a, output_field=FloatField()))
+
+
+def radius_bbox(lat, lng, radius_km):
+    """Bounding box (south, west, north, east) yang memuat lingkaran radius_km."""
+    dlat = radius_km / KM_PER_DEGREE
+    dlng = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01))
+    return max(lat - dlat, -90), max(lng - dlng, -180), min(lat + dlat, 90), min(lng + dlng, 180)
+
+
+def within_bbox(queryset, south, west, north, east, center):
+    """Baris di dalam bounding box, diberi anotasi `distance` (km ke center) & terurut terdekat."""
+    cells = covering_cells(south, west, north, east)
+    if not cells:
+        raise ValueError('Area pencarian terlalu besar')
+    condition = Q()
+    for cell in cells:
+        # '{' = karakter sesudah 'z': range scan semua geohash berawalan `cell`
+        condition |= Q(geohash__gte=cell, geohash__lt=cell + '{')
+    return (
+        queryset.filter(condition, lat__range=(south, north), lng__range=(west, east))
+        .annotate(distance=distance_km(*center))
+        .order_by('distance')
+    )
+
+
+def within_radius(queryset, lat, lng, radius_km):
+    return within_bbox(queryset, *radius_bbox(lat, lng, radius_km), center=(lat, lng)).filter(
+        distance__lte=radius_km,
+    )
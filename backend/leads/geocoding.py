@@ -0,0 +1,260 @@
+"""
+Geocoding lewat backend (menggantikan request langsung browser ke Nominatim).
+
+- Hasil disimpan permanen di GeocodeCache, key = query yang dinormalisasi
+  (huruf kecil, spasi dirapikan; reverse dibulatkan ke 5 desimal ~1 m).
+  Lokasi yang tidak ditemukan ikut di-cache selama GEOCODE_NEGATIVE_TTL.
+- Lookup identik yang berjalan bersamaan di satu proses hanya memanggil
+  upstream sekali (single_flight), sisanya menunggu hasil yang sama.
+- Semua request ke upstream lewat rate limiter bersama (slot per interval di
+  Django cache, jadi berlaku lintas worker kalau cache-nya Redis / Memcached).
+- Provider diatur lewat settings GEOCODER['BACKEND'] (Nominatim di production,
+  stub lokal di test).
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+import unicodedata
+from concurrent.futures import Future
+from datetime import timedelta
+from decimal import Decimal
+from urllib.error import URLError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from core.cache import bump_generation
+from .models import GeocodeCache, Lead
+from .sync import record_changes
+
+GEOCODE_NEGATIVE_TTL = timedelta(days=7)
+INTERACTIVE_WAIT = 5  # detik maksimal menunggu slot rate limit untuk request user
+BATCH_SIZE = 100
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+class GeocoderError(Exception):
+    """Upstream gagal / timeout / rate limit penuh."""
+
+
+# ==========================================
+# PROVIDER
+# ==========================================
+
+class NominatimGeocoder:
+    """https://nominatim.org/release-docs/latest/api/Overview/ (wajib User-Agent, maks 1 request/detik)."""
+
+    def __init__(self, url='https://nominatim.openstreetmap.org', user_agent='guestpro-crm', timeout=10, **options):
+        self.url = url.rstrip('/')
+        self.user_agent = user_agent
+        self.timeout = timeout
+
+    def request(self, path, params):
+        request = Request(
+            f'{self.url}/{path}?{urlencode({**params, "format": "json"})}',
+            headers={'User-Agent': self.user_agent, 'Accept-Language': 'id,en'},
+        )
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read().decode())
+        except (URLError, TimeoutError, ValueError) as exc:
+            raise GeocoderError(str(exc)) from exc
+
+    @staticmethod
+    def parse(place):
+        if not place or 'lat' not in place:
+            return None
+        return {'lat': place['lat'], 'lng': place['lon'], 'display_name': place.get('display_name', '')}
+
+    def search(self, query):
+        results = self.request('search', {'q': query, 'limit': 1})
+        return self.parse(results[0] if results else None)
+
+    def reverse(self, lat, lng):
+        return self.parse(self.request('reverse', {'lat': lat, 'lon': lng}))
+
+
+def get_geocoder():
+    config = dict(getattr(settings, 'GEOCODER', {}))
+    backend = config.pop('BACKEND', 'leads.geocoding.NominatimGeocoder')
+    config.pop('RATE', None)
+    return import_string(backend)(**{key.lower(): value for key, value in config.items()})
+
+
+# ==========================================
+# RATE LIMIT & COALESCING
+# ==========================================
+
+def acquire_slot(timeout=None):
+    """
+    Tunggu slot request upstream (GEOCODER['RATE'] request per detik).
+    Return False kalau slot tidak didapat dalam `timeout` detik.
+    """
+    interval = 1 / getattr(settings, 'GEOCODER', {}).get('RATE', 1.0)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        slot = int(time.time() / interval)
+        if cache.add(f'geocode-rate:{slot}', 1, timeout=int(interval) + 2):
+            return True
+        wait = max((slot + 1) * interval - time.time(), 0.01)
+        if deadline is not None and time.monotonic() + wait > deadline:
+            return False
+        time.sleep(wait)
+
+
+def single_flight(key, func):
+    """Panggil func() sekali untuk key yang sama walaupun diminta beberapa thread bersamaan."""
+    with _inflight_lock:
+        future = _inflight.get(key)
+        owner = future is None
+        if owner:
+            future = _inflight[key] = Future()
+    if not owner:
+        return future.result()
+
+    try:
+        result = func()
+    except Exception as exc:
+        future.set_exception(exc)
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+
+# ==========================================
+# LOOKUP
+# ==========================================
+
+def normalize_query(query):
+    query = unicodedata.normalize('NFKC', query or '').lower()
+    return re.sub(r'\s+', ' ', query).strip(' ,.;')
+
+
+def cache_key(kind, query):
+    return hashlib.sha256(f'{kind}:{query}'.encode()).hexdigest()
+
+
+def is_fresh(entry):
+    return entry.found or entry.fetched_at >= timezone.now() - GEOCODE_NEGATIVE_TTL
+
+
+def as_result(entry, cached):
+    return {
+        'query': entry.query,
+        'found': entry.found,
+        'lat': float(entry.latitude) if entry.found else None,
+        'lng': float(entry.longitude) if entry.found else None,
+        'display_name': entry.display_name,
+        'cached': cached,
+    }
+
+
+def _resolve(kind, query, call, wait):
+    key = cache_key(kind, query)
+    entry = GeocodeCache.objects.filter(pk=key).first()
+    if entry is not None and is_fresh(entry):
+        return as_result(entry, cached=True)
+
+    def fetch():
+        # Proses / thread lain mungkin sudah mengisi cache selama kita menunggu
+        entry = GeocodeCache.objects.filter(pk=key).first()
+        if entry is not None and is_fresh(entry):
+            return as_result(entry, cached=True)
+        if not acquire_slot(timeout=wait):
+            raise GeocoderError('Rate limit geocoding penuh, coba lagi sebentar.')
+        place = call()
+        entry, _ = GeocodeCache.objects.update_or_create(key=key, defaults={
+            'kind': kind, 'query': query, 'found': place is not None,
+            'latitude': round(Decimal(str(place['lat'])), 6) if place else None,
+            'longitude': round(Decimal(str(place['lng'])), 6) if place else None,
+            'display_name': place['display_name'] if place else '',
+            'fetched_at': timezone.now(),
+        })
+        return as_result(entry, cached=False)
+
+    return single_flight(key, fetch)
+
+
+def geocode(query, wait=INTERACTIVE_WAIT):
+    """Alamat / nama tempat -> koordinat. Raise ValueError kalau query kosong."""
+    normalized = normalize_query(query)
+    if not normalized:
+        raise ValueError('Query kosong.')
+    return _resolve('search', normalized, lambda: get_geocoder().search(normalized), wait)
+
+
+def reverse_geocode(lat, lng, wait=INTERACTIVE_WAIT):
+    """Koordinat -> alamat."""
+    lat, lng = round(float(lat), 5), round(float(lng), 5)
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValueError('Koordinat di luar jangkauan.')
+    return _resolve('reverse', f'{lat:.5f},{lng:.5f}', lambda: get_geocoder().reverse(lat, lng), wait)
+
+
+# ==========================================
+# BATCH: LENGKAPI Lead.coordinates
+# ==========================================
+
+def leads_missing_coordinates():
+    return Lead.objects.filter(Q(coordinates__isnull=True) | Q(coordinates='')).exclude(address='')
+
+
+def resolve_missing_coordinates(limit=None, batch_size=BATCH_SIZE, log=None):
+    """
+    Isi coordinates lead yang masih kosong dari address-nya. Alamat yang sama
+    cukup di-geocode sekali; request upstream mengikuti rate limit (ditunggu,
+    bukan ditolak). Return jumlah lead resolved / not_found / failed.
+    """
+    stats = {'resolved': 0, 'not_found': 0, 'failed': 0}
+    last_pk, processed = '', 0
+    while limit is None or processed < limit:
+        size = batch_size if limit is None else min(batch_size, limit - processed)
+        rows = list(
+            leads_missing_coordinates().filter(pk__gt=last_pk).order_by('pk').values_list('pk', 'address')[:size]
+        )
+        if not rows:
+            break
+        last_pk = rows[-1][0]
+        processed += len(rows)
+
+        results = {}
+        for address in {normalize_query(address) for _, address in rows}:
+            try:
+                results[address] = geocode(address, wait=None)
+            except (GeocoderError, ValueError) as exc:
+                results[address] = None
+                if log:
+                    log(f'Gagal geocode "{address}": {exc}')
+
+        now = timezone.now()
+        updated = []
+        for pk, address in rows:
+            result = results.get(normalize_query(address))
+            if result is None:
+                stats['failed'] += 1
+            elif not result['found']:
+                stats['not_found'] += 1
+            else:
+                lead = Lead(pk=pk, coordinates=f"{result['lat']:.6f},{result['lng']:.6f}", edited_at=now)
+                lead.update_location()
+                updated.append(lead)
+        if updated:
+            Lead.objects.bulk_update(updated, ['coordinates', 'lat', 'lng', 'geohash', 'edited_at'])
+            # bulk_update tidak memicu signal
+            record_changes(Lead, [lead.pk for lead in updated])
+            bump_generation(Lead)
+            stats['resolved'] += len(updated)
+    return stats
@@ -0,0 +1,285 @@
+"""
+Import lead massal dari CSV / XLSX.
+
+File dibaca baris per baris (stream), divalidasi per chunk, lalu ditulis
+dengan bulk_create (atau COPY kalau database PostgreSQL). Baris yang gagal
+validasi dicatat di report tanpa menghentikan proses import. Kalau satu
+chunk gagal ditulis (constraint database), chunk itu diulang baris per baris
+dalam savepoint supaya hanya baris yang gagal yang dilaporkan.
+"""
+import codecs
+import csv
+import datetime
+import io
+
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from core.cache import bump_generation
+
+from .models import Lead, LeadPIC, generate_lead_ids
+from .analytics import refresh_leads
+from .search import index_leads
+from .sync import record_changes
+from . import realtime
+
+LEAD_COLUMNS = [
+    'property', 'source', 'type', 'coordinates', 'address', 'gp_pic',
+    'date_in', 'status_kanban', 'referral_or_affiliate_by', 'commission_amount',
+]
+PIC_COLUMNS = ['pic_name', 'phone_number', 'whatsapp', 'email']
+# Diisi Lead.update_location() dari coordinates
+GEO_COLUMNS = ['lat', 'lng', 'geohash']
+
+DEFAULT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+
+class LeadImportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Lead
+        fields = LEAD_COLUMNS
+
+
+class PICImportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = LeadPIC
+        fields = PIC_COLUMNS
+
+
+# ==========================================
+# READER
+# ==========================================
+
+def _normalize_header(value):
+    return str(value or '').strip().lower().replace(' ', '_')
+
+
+def _clean_cell(value):
+    if value is None:
+        return ''
+    # XLSX memberi datetime untuk kolom tanggal, DateField DRF butuh date
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def _iter_csv(fileobj):
+    if isinstance(fileobj, io.TextIOBase):
+        text = fileobj
+    else:
+        text = codecs.getreader('utf-8-sig')(fileobj)
+    reader = csv.reader(text)
+    header = next(reader, None)
+    if header is None:
+        return
+    yield [_normalize_header(col) for col in header]
+    yield from reader
+
+
+def _iter_xlsx(fileobj):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError('openpyxl belum terinstall, import XLSX tidak tersedia')
+
+    # read_only=True: openpyxl membaca sheet secara streaming
+    workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        yield [_normalize_header(col) for col in header]
+        yield from rows
+    finally:
+        workbook.close()
+
+
+def iter_records(fileobj, filename):
+    """Yield (nomor_baris, dict) dari file CSV / XLSX, header di baris 1."""
+    if filename.lower().endswith('.xlsx'):
+        rows = _iter_xlsx(fileobj)
+    elif filename.lower().endswith('.csv'):
+        rows = _iter_csv(fileobj)
+    else:
+        raise ValueError('Format file harus .csv atau .xlsx')
+
+    header = next(rows, None)
+    if not header:
+        return
+    for line_no, row in enumerate(rows, start=2):
+        if not any(cell not in (None, '') for cell in row):
+            continue
+        yield line_no, {
+            key: _clean_cell(value)
+            for key, value in zip(header, row)
+            if key in LEAD_COLUMNS or key in PIC_COLUMNS
+        }
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# ==========================================
+# WRITER
+# ==========================================
+
+def _copy_rows(model, columns, rows):
+    """COPY ... FROM STDIN (PostgreSQL), jauh lebih cepat dari INSERT batch."""
+    table = connection.ops.quote_name(model._meta.db_table)
+    column_sql = ', '.join(connection.ops.quote_name(col) for col in columns)
+    sql = f'COPY {table} ({column_sql}) FROM STDIN'
+
+    with connection.cursor() as cursor:
+        raw_cursor = cursor.cursor
+        if hasattr(raw_cursor, 'copy'):
+            # psycopg 3
+            with raw_cursor.copy(sql) as copy:
+                for row in rows:
+                    copy.write_row(row)
+        else:
+            # psycopg2
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(
+                ['\\N' if value is None else value for value in row] for row in rows
+            )
+            buffer.seek(0)
+            raw_cursor.copy_expert(f"{sql} WITH (FORMAT csv, NULL '\\N')", buffer)
+
+
+def _insert_rows(leads, pics, use_copy):
+    if use_copy:
+        now = timezone.now()
+        lead_columns = ['lead_id'] + LEAD_COLUMNS + GEO_COLUMNS + ['created_at', 'edited_at']
+        _copy_rows(Lead, lead_columns, (
+            [lead.lead_id] + [getattr(lead, col) for col in LEAD_COLUMNS + GEO_COLUMNS] + [now, now]
+            for lead in leads
+        ))
+        _copy_rows(LeadPIC, ['lead_id'] + PIC_COLUMNS, (
+            [pic.lead_id] + [getattr(pic, col) for col in PIC_COLUMNS]
+            for pic in pics
+        ))
+    else:
+        Lead.objects.bulk_create(leads, batch_size=500)
+        LeadPIC.objects.bulk_create(pics, batch_size=500)
+
+
+def _after_write(leads):
+    # bulk_create / COPY tidak memicu signal, index pencarian & summary diisi manual
+    lead_ids = [lead.lead_id for lead in leads]
+    index_leads(lead_ids)
+    refresh_leads(lead_ids)
+    bump_generation(Lead, LeadPIC)
+    record_changes(Lead, lead_ids)
+    # id PIC belum diketahui kalau ditulis lewat COPY
+    record_changes(LeadPIC, LeadPIC.objects.filter(lead_id__in=lead_ids).values_list('pk', flat=True))
+    realtime.leads_imported(len(lead_ids))
+
+
+def _write_chunk(leads, pics, use_copy):
+    with transaction.atomic():
+        _insert_rows(leads, pics, use_copy)
+        _after_write(leads)
+
+
+def _write_rows(rows):
+    """
+    Fallback kalau satu chunk gagal ditulis: tulis ulang baris per baris, masing-
+    masing dalam savepoint, supaya hanya baris yang benar-benar gagal yang dilaporkan.
+    rows = [(line_no, lead, pic / None)]. Return (lead yang tertulis, [(line_no, error)]).
+    """
+    written, failed = [], []
+    with transaction.atomic():
+        for line_no, lead, pic in rows:
+            try:
+                with transaction.atomic():
+                    _insert_rows([lead], [pic] if pic is not None else [], use_copy=False)
+            except DatabaseError as exc:
+                failed.append((line_no, str(exc)))
+                continue
+            written.append(lead)
+        if written:
+            _after_write(written)
+    return written, failed
+
+
+def import_leads(fileobj, filename, chunk_size=DEFAULT_CHUNK_SIZE, defaults=None, dry_run=False):
+    """
+    Import lead dari file. `defaults` mengisi kolom yang kosong (misal gp_pic).
+
+    Return report: total, created, failed dan errors per baris
+    (maksimal MAX_REPORTED_ERRORS entri supaya memori tetap kecil).
+    """
+    use_copy = connection.vendor == 'postgresql' and not dry_run
+    report = {'total': 0, 'created': 0, 'failed': 0, 'errors': []}
+
+    def add_error(line_no, errors):
+        report['failed'] += 1
+        if len(report['errors']) < MAX_REPORTED_ERRORS:
+            report['errors'].append({'row': line_no, 'errors': errors})
+
+    for chunk in _chunks(iter_records(fileobj, filename), chunk_size):
+        valid = []
+        for line_no, record in chunk:
+            report['total'] += 1
+            lead_data = {col: record[col] for col in LEAD_COLUMNS if record.get(col) not in (None, '')}
+            for key, value in (defaults or {}).items():
+                lead_data.setdefault(key, value)
+
+            lead_serializer = LeadImportSerializer(data=lead_data)
+            pic_serializer = None
+            if record.get('pic_name'):
+                pic_serializer = PICImportSerializer(data={col: record.get(col, '') for col in PIC_COLUMNS})
+
+            errors = {}
+            if not lead_serializer.is_valid():
+                errors.update(lead_serializer.errors)
+            if pic_serializer is not None and not pic_serializer.is_valid():
+                errors.update(pic_serializer.errors)
+            if errors:
+                add_error(line_no, errors)
+                continue
+
+            pic_data = pic_serializer.validated_data if pic_serializer is not None else None
+            valid.append((line_no, lead_serializer.validated_data, pic_data))
+
+        if not valid:
+            continue
+
+        rows = []
+        for lead_id, (line_no, lead_data, pic_data) in zip(generate_lead_ids(len(valid)), valid):
+            lead = Lead(lead_id=lead_id, **lead_data)
+            lead.update_location()  # bulk_create / COPY tidak lewat save()
+            pic = LeadPIC(lead_id=lead_id, **pic_data) if pic_data is not None else None
+            rows.append((line_no, lead, pic))
+        leads = [lead for _, lead, _ in rows]
+        pics = [pic for _, _, pic in rows if pic is not None]
+
+        if dry_run:
+            report['created'] += len(leads)
+            continue
+        try:
+            _write_chunk(leads, pics, use_copy)
+        except DatabaseError:
+            written, failed = _write_rows(rows)
+            for line_no, message in failed:
+                add_error(line_no, {'non_field_errors': [message]})
+            report['created'] += len(written)
+            continue
+        report['created'] += len(leads)
+
+    return report
@@ -0,0 +1,171 @@
+import json
+import platform
+import re
+import statistics
+import time
+import tracemalloc
+from urllib.parse import urlencode
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.urls import router
+
+BENCH_USERNAME = 'benchmark'
+# Query string tambahan untuk extra action yang butuh parameter
+ACTION_PARAMS = {
+    'search': {'q': 'hotel'},
+    'nearby': {'lat': -8.5, 'lng': 115.0, 'radius': 10},
+}
+# Extra action yang tidak di-benchmark (memanggil layanan eksternal)
+SKIP_ACTIONS = {'geocode'}
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark semua endpoint router di core/urls.py (list, retrieve, dan extra '
+        'action GET): latency p50/p90/p99, jumlah query, dan peak memory. '
+        'Hasil ditulis sebagai JSON agar bisa dibandingkan antar release.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20, help='Jumlah request per endpoint')
+        parser.add_argument('--page-size', type=int, default=50, help='0 = tanpa paginasi (mode lama)')
+        parser.add_argument('--output', default='bench_results.json')
+        parser.add_argument('--only', help='Regex, hanya endpoint yang cocok')
+        parser.add_argument('--no-cache', action='store_true', help='Matikan response cache (core/cache.py)')
+
+    def handle(self, *args, **options):
+        # APIClient mengirim Host: testserver
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver', 'localhost'],
+            API_CACHE_ENABLED=settings.API_CACHE_ENABLED and not options['no_cache'],
+        ):
+            self.run_benchmark(options)
+
+    def run_benchmark(self, options):
+        client = self.get_client()
+        endpoints = self.discover_endpoints(options['page_size'])
+        if options['only']:
+            endpoints = [e for e in endpoints if re.search(options['only'], e[0])]
+
+        results = []
+        for name, url in endpoints:
+            result = self.measure(client, name, url, options['repeat'])
+            results.append(result)
+            self.stdout.write(
+                f"{name:<32} {result['status']:>3}  p50={result['latency_ms']['p50']:8.2f}ms  "
+                f"p99={result['latency_ms']['p99']:8.2f}ms  queries={result['queries']:>3}  "
+                f"peak={result['peak_memory_kb']:9.1f}KB"
+            )
+
+        report = {
+            'timestamp': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'django': django.get_version(),
+            'python': platform.python_version(),
+            'repeat': options['repeat'],
+            'page_size': options['page_size'],
+            'response_cache': settings.API_CACHE_ENABLED,
+            'dataset': self.dataset_size(),
+            'results': results,
+        }
+        with open(options['output'], 'w') as fp:
+            json.dump(report, fp, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Hasil disimpan di {options['output']}"))
+
+    def get_client(self):
+        user, _ = User.objects.get_or_create(username=BENCH_USERNAME)
+        # Pakai JWT asli (bukan force_authenticate) supaya biaya autentikasi ikut terukur
+        token = RefreshToken.for_user(user).access_token
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return client
+
+    def discover_endpoints(self, page_size):
+        params = {'page_size': page_size} if page_size else {}
+        query = f'?{urlencode(params)}' if params else ''
+        endpoints = []
+        for prefix, viewset, basename in router.registry:
+            base = f'/api/{prefix}/'
+            endpoints.append((f'{basename}-list', base + query))
+
+            sample = viewset.queryset.order_by().values_list('pk', flat=True).first()
+            if sample is not None:
+                endpoints.append((f'{basename}-detail', f'{base}{sample}/'))
+
+            for extra in viewset.get_extra_actions():
+                if 'get' not in extra.mapping or '(?P<' in extra.url_path or extra.url_name in SKIP_ACTIONS:
+                    continue
+                if extra.detail:
+                    if sample is None:
+                        continue
+                    url = f'{base}{sample}/{extra.url_path}/'
+                else:
+                    url = f'{base}{extra.url_path}/'
+                action_params = {**params, **ACTION_PARAMS.get(extra.url_name, {})}
+                if action_params:
+                    url += f'?{urlencode(action_params)}'
+                endpoints.append((f'{basename}-{extra.url_name}', url))
+        return endpoints
+
+    def request(self, client, url):
+        response = client.get(url)
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        return response
+
+    def measure(self, client, name, url, repeat):
+        self.request(client, url)  # warm up
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.request(client, url)
+        queries = len(ctx)
+
+        tracemalloc.start()
+        self.request(client, url)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            self.request(client, url)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        return {
+            'name': name,
+            'url': url,
+            'status': response.status_code,
+            'queries': queries,
+            'peak_memory_kb': round(peak / 1024, 1),
+            'latency_ms': {
+                'min': round(min(timings), 3),
+                'mean': round(statistics.mean(timings), 3),
+                'p50': round(percentile(timings, 50), 3),
+                'p90': round(percentile(timings, 90), 3),
+                'p95': round(percentile(timings, 95), 3),
+                'p99': round(percentile(timings, 99), 3),
+                'max': round(max(timings), 3),
+            },
+        }
+
+    def dataset_size(self):
+        sizes = {}
+        for prefix, viewset, basename in router.registry:
+            sizes[basename] = viewset.queryset.model.objects.count()
+        return sizes
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import random
+import string
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.ids import new_id
+
+
+def legacy_lead_id():
+    # Generator lama Lead.save (sebelum core/ids.py)
+    raw_string = f"{time.time()}-{random.randint(1000, 9999)}"
+    return f"L-{hashlib.sha256(raw_string.encode()).hexdigest()[:12].upper()}"
+
+
+def legacy_deal_id():
+    # Generator lama generate_deal_id
+    return 'D-' + ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
+
+
+STRATEGIES = {
+    'legacy_hash': legacy_lead_id,
+    'legacy_random': legacy_deal_id,
+    'ksortable': lambda: new_id('L-'),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Bandingkan generator primary key lama (hash / random) dengan ID k-sortable '
+        '(core/ids.py): throughput insert, ukuran index PK, dan jumlah ID yang bentrok. '
+        'Memakai tabel sementara bench_ids_*, data asli tidak disentuh.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000)
+        parser.add_argument('--batch-size', type=int, default=500, help='Baris per transaksi')
+        parser.add_argument('--output', default=None, help='Tulis hasil sebagai JSON')
+
+    def handle(self, *args, **options):
+        results = []
+        for name, generate in STRATEGIES.items():
+            result = self.run_strategy(name, generate, options['rows'], options['batch_size'])
+            results.append(result)
+            self.stdout.write(
+                f"{name:<14} {result['rows_per_sec']:>10.0f} rows/s  "
+                f"index={result['index_kb']:>9.1f}KB ({result['index_bytes_per_row']:.1f} B/row, "
+                f"key {result['key_length']} char)  table={result['table_kb']:>9.1f}KB  "
+                f"collisions={result['collisions']}"
+            )
+
+        if options['output']:
+            report = {
+                'timestamp': timezone.now().isoformat(),
+                'database': connection.vendor,
+                'rows': options['rows'],
+                'batch_size': options['batch_size'],
+                'results': results,
+            }
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Hasil ditulis ke {options['output']}"))
+
+    def run_strategy(self, name, generate, rows, batch_size):
+        table = f'bench_ids_{name}'
+        quote = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {quote(table)}')
+            cursor.execute(
+                f'CREATE TABLE {quote(table)} (id varchar(20) PRIMARY KEY, payload varchar(100) NOT NULL)'
+            )
+        sql = f'INSERT INTO {quote(table)} (id, payload) VALUES (%s, %s) ON CONFLICT DO NOTHING'
+
+        key_length = len(generate())
+        inserted = 0
+        start = time.perf_counter()
+        try:
+            for offset in range(0, rows, batch_size):
+                batch = [(generate(), f'row {i}') for i in range(offset, min(offset + batch_size, rows))]
+                with transaction.atomic(), connection.cursor() as cursor:
+                    for row in batch:
+                        cursor.execute(sql, row)
+                        inserted += max(cursor.rowcount, 0)
+            elapsed = time.perf_counter() - start
+            index_bytes, table_bytes = self.relation_sizes(table)
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute(f'DROP TABLE IF EXISTS {quote(table)}')
+
+        return {
+            'strategy': name,
+            'seconds': round(elapsed, 3),
+            'rows_per_sec': round(inserted / elapsed, 1),
+            'collisions': rows - inserted,
+            'key_length': key_length,
+            'index_kb': round(index_bytes / 1024, 1),
+            'index_bytes_per_row': round(index_bytes / max(inserted, 1), 1),
+            'table_kb': round(table_bytes / 1024, 1),
+        }
+
+    def relation_sizes(self, table):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SELECT pg_relation_size(%s), pg_relation_size(%s)', [f'{table}_pkey', table])
+                return cursor.fetchone()
+            if connection.vendor == 'sqlite':
+                # Butuh SQLite dengan SQLITE_ENABLE_DBSTAT_VTAB (default di build Python resmi)
+                cursor.execute(
+                    'SELECT name, SUM(pgsize) FROM dbstat WHERE name IN (%s, %s) GROUP BY name',
+                    [f'sqlite_autoindex_{table}_1', table],
+                )
+                sizes = dict(cursor.fetchall())
+                return sizes.get(f'sqlite_autoindex_{table}_1', 0), sizes.get(table, 0)
+        return 0, 0
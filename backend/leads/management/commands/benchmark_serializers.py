@@ -0,0 +1,96 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from core.renderers import ORJSONRenderer
+from core.values import ValuesSerializer, prefetch_ordering
+from leads.serializers import DealSerializer, LeadSerializer
+from leads.views import DealViewSet, LeadViewSet
+
+ENDPOINTS = [
+    ('lead', LeadViewSet, LeadSerializer),
+    ('deal', DealViewSet, DealSerializer),
+]
+
+
+def best_of(repeat, func):
+    """Return (detik tercepat, hasil terakhir)."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+class Command(BaseCommand):
+    help = (
+        'Bandingkan serialisasi list lead / deal: ModelSerializer + JSONRenderer '
+        '(jalur lama) vs ValuesSerializer + ORJSONRenderer (core/values.py, '
+        'core/renderers.py) untuk N baris, termasuk query. Output kedua jalur '
+        'dicek byte per byte.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=3, help='Ambil waktu tercepat dari N kali')
+        parser.add_argument('--output', default=None, help='Tulis hasil sebagai JSON')
+
+    def handle(self, *args, **options):
+        results = []
+        for name, viewset, serializer_class in ENDPOINTS:
+            queryset = viewset.queryset.all()
+            rows = min(options['rows'], queryset.count())
+            if not rows:
+                raise CommandError('Dataset kosong, jalankan dulu: python manage.py generate_dataset --scale 10k')
+            result = self.measure(name, queryset, serializer_class, options['rows'], options['repeat'])
+            results.append(result)
+            self.stdout.write(
+                f"{name:<5} {result['rows']:>6} rows  "
+                f"serializer={result['serializer_ms']:>8.1f}ms  values={result['values_ms']:>7.1f}ms  "
+                f"json={result['json_ms']:>7.1f}ms  orjson={result['orjson_ms']:>6.1f}ms  "
+                f"total {result['before_ms']:.1f}ms -> {result['after_ms']:.1f}ms "
+                f"({result['speedup']:.1f}x)  identical={result['identical']}"
+            )
+
+        if options['output']:
+            report = {
+                'timestamp': timezone.now().isoformat(),
+                'database': connection.vendor,
+                'repeat': options['repeat'],
+                'results': results,
+            }
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Hasil ditulis ke {options['output']}"))
+
+    def measure(self, name, queryset, serializer_class, rows, repeat):
+        reader = ValuesSerializer.for_serializer(serializer_class)
+        if reader is None:
+            raise CommandError(f'{serializer_class.__name__} tidak didukung ValuesSerializer')
+
+        # Query + serialisasi, sama dengan yang dikerjakan list view
+        serializer_s, old_data = best_of(repeat, lambda: serializer_class(queryset[:rows], many=True).data)
+        ordering = prefetch_ordering(queryset)
+        values_s, new_data = best_of(repeat, lambda: reader.serialize(reader.get_queryset(queryset)[:rows], ordering))
+        json_s, old_body = best_of(repeat, lambda: JSONRenderer().render(old_data))
+        orjson_s, new_body = best_of(repeat, lambda: ORJSONRenderer().render(new_data))
+
+        before, after = serializer_s + json_s, values_s + orjson_s
+        return {
+            'endpoint': name,
+            'rows': len(old_data),
+            'serializer_ms': round(serializer_s * 1000, 1),
+            'values_ms': round(values_s * 1000, 1),
+            'json_ms': round(json_s * 1000, 1),
+            'orjson_ms': round(orjson_s * 1000, 1),
+            'before_ms': round(before * 1000, 1),
+            'after_ms': round(after * 1000, 1),
+            'speedup': round(before / after, 2),
+            'bytes': len(old_body),
+            'identical': old_body == new_body,
+        }
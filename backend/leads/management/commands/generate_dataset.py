@@ -0,0 +1,181 @@
+import random
+from datetime import date, time, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from activities.models import Activity
+from core.cache import bump_generation
+from leads.analytics import refresh_deals, refresh_leads
+from leads.models import (
+    Lead, LeadPIC, FollowUp, Meeting, Quotation, Deal, DealDetail, LeadSearchIndex,
+    PipelineSummary, RevenueSummary, LeadSummaryState, DealSummaryState, ChangeLog,
+    DealRevenue, RevenueLine, LeadCommission,
+)
+from leads.search import index_leads
+from leads.sync import record_changes
+
+SCALES = {'1k': 1_000, '10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+
+PIC_GP = ['EKA', 'SURYA', 'ANGGA', 'RUSDIANA', 'WIRA', 'YOGA', 'WAHYU', 'WULAN', 'TRISNA', 'SURYANI', 'WIDI', 'NIA']
+SOURCES = Lead.INBOUND_SOURCES + ['Cold Call', 'Walk In', 'Event', 'Database', 'Canvassing']
+TYPES = ['Hotel', 'Villa', 'Resort', 'Guest House', 'Homestay', 'Apartment']
+AREAS = ['Kuta', 'Seminyak', 'Canggu', 'Ubud', 'Sanur', 'Nusa Dua', 'Jimbaran', 'Denpasar', 'Lovina', 'Amed']
+PRODUCTS = ['PMS', 'Channel Manager', 'Booking Engine', 'POS', 'Website', 'Revenue Management']
+INITIATIONS = ['Training', 'Installation', 'Data Migration', 'Setup Website']
+BILLING = ['Month', 'Year', 'Quarter']
+# Bobot distribusi status_kanban: sebagian besar lead masih di tahap awal
+STATUS_WEIGHTS = [40, 25, 15, 10, 5, 5]
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate dataset sintetis (Lead, LeadPIC, FollowUp, Meeting, Quotation, Deal, '
+        'DealDetail, Activity) untuk benchmark. Hasil deterministik untuk seed yang sama.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=sorted(SCALES), help='Jumlah lead: 1k, 10k, 100k, 1m')
+        parser.add_argument('--leads', type=int, help='Jumlah lead (override --scale)')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--clear', action='store_true', help='Hapus semua data CRM sebelum generate')
+
+    def handle(self, *args, **options):
+        total = options['leads'] or SCALES.get(options['scale'] or '1k')
+        if total <= 0:
+            raise CommandError('Jumlah lead harus > 0')
+
+        if options['clear']:
+            self.stdout.write('Menghapus data lama...')
+            # DELETE langsung tanpa signal per baris (index pencarian, summary & change log
+            # ikut dikosongkan; client delta sync harus sync ulang dari awal)
+            with connection.cursor() as cursor:
+                for model in [ChangeLog, PipelineSummary, RevenueSummary, LeadSummaryState, DealSummaryState,
+                              LeadSearchIndex, RevenueLine, DealRevenue, LeadCommission,
+                              DealDetail, Deal, Quotation, Meeting, FollowUp, LeadPIC, Lead, Activity]:
+                    cursor.execute(f'DELETE FROM {connection.ops.quote_name(model._meta.db_table)}')
+
+        rng = random.Random(options['seed'])
+        batch_size = options['batch_size']
+        counts = {}
+        created = 0
+        while created < total:
+            size = min(batch_size, total - created)
+            with transaction.atomic():
+                for name, count in self.generate_batch(rng, created, size).items():
+                    counts[name] = counts.get(name, 0) + count
+            created += size
+            self.stdout.write(f'{created}/{total} lead')
+
+        summary = ', '.join(f'{name}={count}' for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f'Selesai: {summary}'))
+
+    def generate_batch(self, rng, offset, size):
+        statuses = [status for status, _ in Lead.STATUS_KANBAN_CHOICES]
+        leads, pics, followups, meetings, quotations, deals, details = [], [], [], [], [], [], []
+
+        for i in range(offset, offset + size):
+            area = rng.choice(AREAS)
+            status_index = rng.choices(range(len(statuses)), weights=STATUS_WEIGHTS)[0]
+            date_in = date(2023, 1, 1) + timedelta(days=rng.randrange(3 * 365))
+            gp_pic = rng.choice(PIC_GP)
+            lat, lng = -8.1 - rng.random() * 0.8, 114.6 + rng.random() * 0.9
+            lead = Lead(
+                lead_id=f'L-{rng.getrandbits(48):012X}',
+                property=f'{rng.choice(TYPES)} {area} {i}',
+                source=rng.choice(SOURCES),
+                type=rng.choice(TYPES),
+                coordinates=f'{lat:.6f}, {lng:.6f}',
+                address=f'Jl. Raya {area} No. {rng.randint(1, 300)}, Bali',
+                gp_pic=gp_pic,
+                date_in=date_in,
+                status_kanban=statuses[status_index],
+                commission_amount=str(rng.choice([0, 500000, 1000000])) if rng.random() < 0.2 else None,
+            )
+            lead.update_location()
+            leads.append(lead)
+
+            lead_pics = [
+                LeadPIC(
+                    lead=lead, pic_name=f'PIC {i}-{n}', phone_number=f'08{rng.randrange(10**9, 10**10)}',
+                    whatsapp=f'08{rng.randrange(10**9, 10**10)}', email=f'pic{i}.{n}@example.com',
+                )
+                for n in range(rng.randint(1, 3))
+            ]
+            pics.extend(lead_pics)
+
+            # Aktivitas makin banyak untuk lead yang stage-nya makin jauh
+            for n in range(rng.randint(0, 1 + status_index)):
+                followups.append(FollowUp(
+                    lead=lead, pic_gp=gp_pic, pic_lead=lead_pics[0].pic_name,
+                    date=date_in + timedelta(days=rng.randrange(1, 120)),
+                    start_time=time(rng.randint(8, 16)), end_time=time(17),
+                    fu_type=rng.choice(['Call', 'WhatsApp', 'Email']), notes='Follow up rutin',
+                ))
+            for n in range(rng.randint(0, status_index)):
+                meetings.append(Meeting(
+                    lead=lead, pic_gp=gp_pic, pic_lead=lead_pics[0].pic_name,
+                    date=date_in + timedelta(days=rng.randrange(1, 120)),
+                    start_time=time(rng.randint(8, 16)), end_time=time(17),
+                    meeting_type=rng.choice(['Online', 'Offline']), location=area,
+                    mom='Presentasi produk',
+                ))
+            if status_index >= 2:
+                quotations.append(Quotation(
+                    lead=lead, pic_gp=gp_pic, date=date_in + timedelta(days=rng.randrange(30, 150)),
+                    link_quotation=f'https://example.com/q/{lead.lead_id}', is_send=rng.random() < 0.8,
+                ))
+            if status_index >= 3:
+                deal = Deal(
+                    deal_id=f'D-{rng.getrandbits(40):010X}', lead=lead,
+                    deal_type=rng.choice(Deal.DEAL_TYPES)[0], room=rng.randint(5, 200),
+                    pic_lead=lead_pics[0], invoice_issued=rng.random() < 0.7,
+                    is_paid=rng.random() < 0.6,
+                    paid_date=date_in + timedelta(days=rng.randrange(60, 240)) if rng.random() < 0.6 else None,
+                )
+                deals.append(deal)
+                for n in range(rng.randint(1, 3)):
+                    details.append(DealDetail(
+                        deal_detail_id=f'DD-{rng.getrandbits(40):010X}', deal=deal,
+                        package=rng.choice(['Basic', 'Pro', 'Enterprise']),
+                        product=', '.join(rng.sample(PRODUCTS, rng.randint(1, 3))),
+                        product_amount=Decimal(rng.choice([350000, 750000, 1500000, 9000000])),
+                        product_amount_by=rng.choice(BILLING),
+                        initiation=', '.join(rng.sample(INITIATIONS, rng.randint(1, 2))),
+                        initiation_amount=Decimal(rng.choice([0, 1000000, 2500000])),
+                    ))
+
+        activities = [
+            Activity(
+                title=f'Task {offset + n}', description='Generated',
+                date=date(2023, 1, 1) + timedelta(days=rng.randrange(3 * 365)),
+                status=rng.choice(['pending', 'completed']),
+            )
+            for n in range(max(1, size // 10))
+        ]
+
+        Lead.objects.bulk_create(leads)
+        LeadPIC.objects.bulk_create(pics)
+        FollowUp.objects.bulk_create(followups)
+        Meeting.objects.bulk_create(meetings)
+        Quotation.objects.bulk_create(quotations)
+        Deal.objects.bulk_create(deals)
+        DealDetail.objects.bulk_create(details)
+        Activity.objects.bulk_create(activities)
+        index_leads([lead.lead_id for lead in leads])
+        refresh_leads([lead.lead_id for lead in leads])
+        refresh_deals([deal.deal_id for deal in deals])
+        bump_generation(Lead, LeadPIC, FollowUp, Meeting, Quotation, Deal, DealDetail, Activity)
+        for model, objects in [
+            (Lead, leads), (LeadPIC, pics), (FollowUp, followups), (Meeting, meetings),
+            (Quotation, quotations), (Deal, deals), (DealDetail, details), (Activity, activities),
+        ]:
+            record_changes(model, [obj.pk for obj in objects])
+
+        return {
+            'lead': len(leads), 'lead_pic': len(pics), 'follow_up': len(followups),
+            'meeting': len(meetings), 'quotation': len(quotations), 'deal': len(deals),
+            'deal_detail': len(details), 'activity': len(activities),
+        }
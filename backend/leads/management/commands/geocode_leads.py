@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from leads.geocoding import BATCH_SIZE, leads_missing_coordinates, resolve_missing_coordinates
+
+
+class Command(BaseCommand):
+    help = (
+        'Isi Lead.coordinates yang masih kosong dari address lewat geocoder '
+        '(settings.GEOCODER, mengikuti rate limit & cache geocode_cache).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None, help='Maksimal lead yang diproses')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'{leads_missing_coordinates().count()} lead belum punya koordinat')
+        stats = resolve_missing_coordinates(
+            limit=options['limit'], batch_size=options['batch_size'],
+            log=lambda message: self.stderr.write(message),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Selesai: {stats['resolved']} resolved, {stats['not_found']} tidak ditemukan, "
+            f"{stats['failed']} gagal"
+        ))
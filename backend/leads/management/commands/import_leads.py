@@ -0,0 +1,45 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from leads.importer import DEFAULT_CHUNK_SIZE, import_leads
+
+
+class Command(BaseCommand):
+    help = 'Import lead massal dari file CSV / XLSX (satu baris = satu lead + PIC opsional).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path file .csv atau .xlsx')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--gp-pic', help='Default gp_pic untuk baris yang kosong')
+        parser.add_argument('--source', help='Default source untuk baris yang kosong')
+        parser.add_argument('--dry-run', action='store_true', help='Validasi saja, tidak menyimpan')
+        parser.add_argument('--report', help='Simpan report lengkap (JSON) ke file ini')
+
+    def handle(self, *args, **options):
+        defaults = {}
+        if options['gp_pic']:
+            defaults['gp_pic'] = options['gp_pic']
+        if options['source']:
+            defaults['source'] = options['source']
+
+        try:
+            with open(options['path'], 'rb') as fileobj:
+                report = import_leads(
+                    fileobj, options['path'],
+                    chunk_size=options['chunk_size'],
+                    defaults=defaults,
+                    dry_run=options['dry_run'],
+                )
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        for error in report['errors'][:20]:
+            self.stderr.write(f"Baris {error['row']}: {json.dumps(error['errors'])}")
+        if options['report']:
+            with open(options['report'], 'w') as fp:
+                json.dump(report, fp, indent=2, default=str)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['created']} lead tersimpan, {report['failed']} gagal dari {report['total']} baris"
+        ))
@@ -0,0 +1,266 @@
+import asyncio
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from leads.models import Deal, Lead
+from .benchmark_api import BENCH_USERNAME, percentile
+
+# mode -> environment proses worker
+MODES = {
+    'wsgi': {'ASYNC_API': '0'},         # core.wsgi, view sync (deployment lama)
+    'asgi': {'ASYNC_API': '1'},         # core.asgi, handler async list / retrieve
+    'asgi-sync': {'ASYNC_API': '0'},    # core.asgi tanpa handler async (pembanding)
+}
+WARMUP = 10
+
+
+def get_host():
+    hosts = [host for host in settings.ALLOWED_HOSTS if host not in ('*', '') and not host.startswith('.')]
+    return hosts[0] if hosts else 'localhost'
+
+
+def summarize(latencies, statuses, elapsed):
+    ok = sum(1 for status in statuses if 200 <= status < 400)
+    return {
+        'requests': len(statuses),
+        'errors': len(statuses) - ok,
+        'seconds': round(elapsed, 3),
+        'requests_per_sec': round(len(statuses) / elapsed, 1),
+        'latency_ms': {
+            'p50': round(percentile(latencies, 50) * 1000, 2),
+            'p95': round(percentile(latencies, 95) * 1000, 2),
+            'p99': round(percentile(latencies, 99) * 1000, 2),
+        },
+    }
+
+
+# ==========================================
+# DRIVER IN-PROCESS (tanpa server / jaringan)
+# ==========================================
+
+def run_wsgi(paths, token, total, concurrency):
+    from core.wsgi import application
+
+    host = get_host()
+
+    def call(path):
+        path, _, query = path.partition('?')
+        environ = {
+            'REQUEST_METHOD': 'GET', 'SCRIPT_NAME': '', 'PATH_INFO': path, 'QUERY_STRING': query,
+            'SERVER_NAME': host, 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+            'HTTP_HOST': host, 'HTTP_AUTHORIZATION': f'Bearer {token}', 'REMOTE_ADDR': '127.0.0.1',
+            'wsgi.version': (1, 0), 'wsgi.url_scheme': 'http', 'wsgi.input': io.BytesIO(),
+            'wsgi.errors': sys.stderr, 'wsgi.multithread': True, 'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+        status = []
+        start = time.perf_counter()
+        result = application(environ, lambda s, headers, exc_info=None: status.append(int(s.split()[0])))
+        try:
+            b''.join(result)
+        finally:
+            result.close()  # request_finished -> koneksi dirapikan sesuai CONN_MAX_AGE
+        return time.perf_counter() - start, status[0]
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(call, paths[:WARMUP]))
+        start = time.perf_counter()
+        results = list(executor.map(call, (paths[i % len(paths)] for i in range(total))))
+    return results, time.perf_counter() - start
+
+
+def run_asgi(paths, token, total, concurrency):
+    from core.asgi import application
+
+    host = get_host().encode()
+
+    async def call(path):
+        path, _, query = path.partition('?')
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query.encode(),
+            'root_path': '', 'client': ('127.0.0.1', 0), 'server': (host.decode(), 80),
+            'headers': [(b'host', host), (b'authorization', f'Bearer {token}'.encode())],
+        }
+        sent = asyncio.Event()
+        status = []
+
+        async def receive():
+            if not sent.is_set():
+                sent.set()
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await asyncio.Future()  # client tidak pernah disconnect
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                status.append(message['status'])
+
+        start = time.perf_counter()
+        await application(scope, receive, send)
+        return time.perf_counter() - start, status[0]
+
+    async def main():
+        limit = asyncio.Semaphore(concurrency)
+
+        async def limited(path):
+            async with limit:
+                return await call(path)
+
+        await asyncio.gather(*(limited(path) for path in paths[:WARMUP]))
+        start = time.perf_counter()
+        results = await asyncio.gather(*(limited(paths[i % len(paths)]) for i in range(total)))
+        return results, time.perf_counter() - start
+
+    return asyncio.run(main())
+
+
+# ==========================================
+# DRIVER HTTP (server yang sudah jalan)
+# ==========================================
+
+def run_http(base_url, paths, token, total, concurrency):
+    base_url = base_url.rstrip('/')
+
+    def call(path):
+        request = Request(base_url + path, headers={'Authorization': f'Bearer {token}'})
+        start = time.perf_counter()
+        try:
+            with urlopen(request, timeout=30) as response:
+                response.read()
+                status = response.status
+        except HTTPError as exc:
+            status = exc.code
+        return time.perf_counter() - start, status
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(call, paths[:WARMUP]))
+        start = time.perf_counter()
+        results = list(executor.map(call, (paths[i % len(paths)] for i in range(total))))
+    return results, time.perf_counter() - start
+
+
+class Command(BaseCommand):
+    help = (
+        'Load test read path API: bandingkan throughput WSGI (view sync) dengan ASGI '
+        '(handler async, core/async_views.py) terhadap dataset yang sama. Default '
+        'menjalankan core.wsgi / core.asgi langsung di proses worker terpisah (tanpa '
+        'server); --target mode=URL untuk mengukur server yang sudah jalan, misal '
+        'gunicorn core.wsgi vs uvicorn core.asgi:application. Isi data dulu dengan '
+        'generate_dataset.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000, help='Jumlah request per mode')
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--page-size', type=int, default=50)
+        parser.add_argument('--modes', default='wsgi,asgi', help=f"Pilihan: {', '.join(MODES)}")
+        parser.add_argument('--target', action='append', default=[], metavar='MODE=URL',
+                            help='Ukur lewat HTTP, misal wsgi=http://127.0.0.1:8000')
+        parser.add_argument('--cache', action='store_true',
+                            help='Nyalakan response cache (default mati supaya yang terukur query + serialisasi)')
+        parser.add_argument('--output', default=None, help='Tulis hasil sebagai JSON')
+        # Internal: dipakai proses worker
+        parser.add_argument('--worker', choices=sorted(MODES), help='(internal)')
+        parser.add_argument('--paths', help='(internal)')
+        parser.add_argument('--token', help='(internal)')
+
+    def handle(self, *args, **options):
+        if options['worker']:
+            return self.run_worker(options)
+
+        paths = self.get_paths(options['page_size'])
+        token = str(RefreshToken.for_user(User.objects.get_or_create(username=BENCH_USERNAME)[0]).access_token)
+
+        if options['target']:
+            runs = [target.split('=', 1) for target in options['target']]
+        else:
+            runs = [(mode.strip(), None) for mode in options['modes'].split(',') if mode.strip()]
+        unknown = [mode for mode, url in runs if url is None and mode not in MODES]
+        if unknown:
+            raise CommandError(f"Mode tidak dikenal: {', '.join(unknown)}")
+
+        results = []
+        for mode, url in runs:
+            if url:
+                timings, elapsed = run_http(url, paths, token, options['requests'], options['concurrency'])
+                result = summarize(*zip(*timings), elapsed)
+            else:
+                result = self.spawn_worker(mode, paths, token, options)
+            result = {'mode': mode, 'target': url or 'in-process', **result}
+            results.append(result)
+            self.stdout.write(
+                f"{mode:<10} {result['requests_per_sec']:>9.1f} req/s  "
+                f"p50={result['latency_ms']['p50']:8.2f}ms  p95={result['latency_ms']['p95']:8.2f}ms  "
+                f"p99={result['latency_ms']['p99']:8.2f}ms  errors={result['errors']}"
+            )
+
+        baseline = results[0]['requests_per_sec']
+        for result in results[1:]:
+            self.stdout.write(f"{result['mode']} / {results[0]['mode']}: {result['requests_per_sec'] / baseline:.2f}x")
+
+        if options['output']:
+            database = settings.DATABASES['default']
+            report = {
+                'timestamp': timezone.now().isoformat(),
+                'database': connection.vendor,
+                'conn_max_age': database.get('CONN_MAX_AGE'),
+                'pool': bool(database.get('OPTIONS', {}).get('pool')),
+                'requests': options['requests'],
+                'concurrency': options['concurrency'],
+                'response_cache': options['cache'],
+                'dataset': {'leads': Lead.objects.count(), 'deals': Deal.objects.count()},
+                'paths': paths,
+                'results': results,
+            }
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Hasil ditulis ke {options['output']}"))
+
+    def get_paths(self, page_size):
+        lead_id = Lead.objects.order_by('-created_at').values_list('pk', flat=True).first()
+        deal_id = Deal.objects.order_by('-created_at').values_list('pk', flat=True).first()
+        if lead_id is None or deal_id is None:
+            raise CommandError('Dataset kosong, jalankan dulu: python manage.py generate_dataset --scale 10k')
+        # Campuran list & retrieve, dua-duanya lewat handler async di mode asgi
+        return [
+            f'/api/leads/?page_size={page_size}',
+            f'/api/leads/{lead_id}/',
+            f'/api/deals/?page_size={page_size}',
+            f'/api/deals/{deal_id}/',
+        ]
+
+    def spawn_worker(self, mode, paths, token, options):
+        # Proses baru per mode: ASYNC_API dibaca saat URLconf dimuat
+        env = {
+            **os.environ, **MODES[mode],
+            'API_CACHE_ENABLED': '1' if options['cache'] else '0',
+        }
+        command = [
+            sys.executable, str(settings.BASE_DIR / 'manage.py'), 'loadtest_api', '--worker', mode,
+            '--paths', json.dumps(paths), '--token', token,
+            '--requests', str(options['requests']), '--concurrency', str(options['concurrency']),
+        ]
+        process = subprocess.run(command, env=env, capture_output=True, text=True)
+        if process.returncode != 0:
+            raise CommandError(f'Worker {mode} gagal:\n{process.stderr}')
+        return json.loads(process.stdout.strip().splitlines()[-1])
+
+    def run_worker(self, options):
+        paths = json.loads(options['paths'])
+        run = run_wsgi if options['worker'] == 'wsgi' else run_asgi
+        timings, elapsed = run(paths, options['token'], options['requests'], options['concurrency'])
+        self.stdout.write(json.dumps(summarize(*zip(*timings), elapsed)))
@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from leads.sync import COMPACT_BATCH_SIZE, SYNC_RETENTION, compact_changes
+
+
+class Command(BaseCommand):
+    help = (
+        'Compact ChangeLog delta sync: hapus entri yang lebih tua dari retensi kalau '
+        'sudah ada entri lebih baru untuk baris yang sama, dan tombstone lama. '
+        'Client dengan cursor lebih lama dari itu akan diminta full resync (410).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=SYNC_RETENTION.days)
+        parser.add_argument('--batch-size', type=int, default=COMPACT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options['days'])
+        deleted = compact_changes(before=before, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Selesai: {deleted} entri ChangeLog dihapus'))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from leads.analytics import BATCH_SIZE, rebuild_summaries
+from leads.models import PipelineSummary, RevenueSummary
+
+
+class Command(BaseCommand):
+    help = (
+        'Bangun ulang summary table analytics (summary_pipeline, summary_revenue) '
+        'dari data lead / deal. Dipakai untuk backfill atau kalau summary tidak sinkron.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        rebuild_summaries(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Selesai: {PipelineSummary.objects.count()} baris pipeline, '
+            f'{RevenueSummary.objects.count()} baris revenue'
+        ))
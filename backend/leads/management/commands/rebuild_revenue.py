@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from leads.models import DealRevenue, LeadCommission, RevenueLine
+from leads.revenue import BATCH_SIZE, rebuild_revenue
+
+
+class Command(BaseCommand):
+    help = (
+        'Backfill tabel revenue ternormalisasi (revenue_deal, revenue_line, '
+        'revenue_commission) dari DealDetail & Lead.commission_amount, per batch. '
+        'Aman dijalankan ulang; endpoint revenue tetap terisi selama proses.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        def progress(label, done):
+            if options['verbosity'] > 1:
+                self.stdout.write(f'{label}: {done}')
+
+        rebuild_revenue(batch_size=options['batch_size'], progress=progress)
+        self.stdout.write(self.style.SUCCESS(
+            f'Selesai: {DealRevenue.objects.count()} deal, {RevenueLine.objects.count()} baris product / '
+            f'initiation, {LeadCommission.objects.count()} komisi'
+        ))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from leads.models import Lead
+from leads.search import BATCH_SIZE, index_leads
+
+
+class Command(BaseCommand):
+    help = 'Bangun ulang index pencarian lead (lead_search) untuk semua lead.'
+
+    def handle(self, *args, **options):
+        total = 0
+        batch = []
+        for lead_id in Lead.objects.order_by('pk').values_list('pk', flat=True).iterator(chunk_size=BATCH_SIZE):
+            batch.append(lead_id)
+            if len(batch) >= BATCH_SIZE:
+                index_leads(batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            index_leads(batch)
+            total += len(batch)
+        self.stdout.write(self.style.SUCCESS(f'{total} lead ter-index'))
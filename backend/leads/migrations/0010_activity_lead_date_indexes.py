@@ -0,0 +1,49 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leads', '0009_remove_lead_latitude_remove_lead_longitude_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='followup',
+            index=models.Index(fields=['lead', 'date', 'id'], name='follow_up_lead_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='followup',
+            index=models.Index(fields=['pic_gp', 'date'], name='follow_up_pic_gp_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='followup',
+            index=models.Index(fields=['date', 'id'], name='follow_up_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='meeting',
+            index=models.Index(fields=['lead', 'date', 'id'], name='meeting_lead_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='meeting',
+            index=models.Index(fields=['pic_gp', 'date'], name='meeting_pic_gp_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='meeting',
+            index=models.Index(fields=['date', 'id'], name='meeting_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quotation',
+            index=models.Index(fields=['lead', 'date', 'quotation_id'], name='quotation_lead_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quotation',
+            index=models.Index(fields=['pic_gp', 'date'], name='quotation_pic_gp_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quotation',
+            index=models.Index(fields=['date', 'quotation_id'], name='quotation_date_idx'),
+        ),
+    ]
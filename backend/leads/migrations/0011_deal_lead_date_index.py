@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leads', '0010_activity_lead_date_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='deal',
+            index=models.Index(fields=['lead', 'date', 'deal_id'], name='deal_lead_date_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leads', '0011_deal_lead_date_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='deal',
+            index=models.Index(fields=['created_at', 'deal_id'], name='deal_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deal',
+            index=models.Index(fields=['paid_date'], name='deal_paid_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deal',
+            index=models.Index(condition=models.Q(('is_paid', False)), fields=['created_at', 'deal_id'], name='deal_unpaid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deal',
+            index=models.Index(condition=models.Q(('invoice_issued', False)), fields=['created_at', 'deal_id'], name='deal_invoice_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(fields=['created_at', 'lead_id'], name='lead_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(fields=['status_kanban', 'created_at', 'lead_id'], name='lead_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(fields=['source', 'created_at'], name='lead_source_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(fields=['gp_pic', 'created_at'], name='lead_gp_pic_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(fields=['date_in'], name='lead_date_in_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(condition=models.Q(('status_kanban__in', ['lead_generation', 'follow_up', 'quotation'])), fields=['created_at', 'lead_id'], name='lead_open_pipeline_idx'),
+        ),
+    ]
@@ -0,0 +1,93 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "ALTER TABLE lead_search ADD COLUMN search_vector tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('simple', document)) STORED",
+    "CREATE INDEX lead_search_vector_idx ON lead_search USING GIN (search_vector)",
+    "CREATE INDEX lead_search_trgm_idx ON lead_search USING GIN (document gin_trgm_ops)",
+]
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS lead_search_trgm_idx",
+    "DROP INDEX IF EXISTS lead_search_vector_idx",
+    "ALTER TABLE lead_search DROP COLUMN IF EXISTS search_vector",
+]
+
+# FTS5 external content: isi tabel virtual disinkron dari lead_search lewat trigger
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE lead_search_fts USING fts5("
+    "document, content='lead_search', content_rowid='rowid', prefix='2 3 4')",
+    "CREATE TRIGGER lead_search_ai AFTER INSERT ON lead_search BEGIN "
+    "INSERT INTO lead_search_fts(rowid, document) VALUES (new.rowid, new.document); END",
+    "CREATE TRIGGER lead_search_ad AFTER DELETE ON lead_search BEGIN "
+    "INSERT INTO lead_search_fts(lead_search_fts, rowid, document) VALUES ('delete', old.rowid, old.document); END",
+    "CREATE TRIGGER lead_search_au AFTER UPDATE ON lead_search BEGIN "
+    "INSERT INTO lead_search_fts(lead_search_fts, rowid, document) VALUES ('delete', old.rowid, old.document); "
+    "INSERT INTO lead_search_fts(rowid, document) VALUES (new.rowid, new.document); END",
+]
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS lead_search_au",
+    "DROP TRIGGER IF EXISTS lead_search_ad",
+    "DROP TRIGGER IF EXISTS lead_search_ai",
+    "DROP TABLE IF EXISTS lead_search_fts",
+]
+
+
+def run_vendor_sql(statements):
+    def run(apps, schema_editor):
+        vendor_statements = statements.get(schema_editor.connection.vendor, [])
+        for sql in vendor_statements:
+            schema_editor.execute(sql)
+    return run
+
+
+def backfill(apps, schema_editor):
+    Lead = apps.get_model('leads', 'Lead')
+    LeadPIC = apps.get_model('leads', 'LeadPIC')
+    LeadSearchIndex = apps.get_model('leads', 'LeadSearchIndex')
+
+    lead_ids = list(Lead.objects.order_by('pk').values_list('pk', flat=True))
+    for start in range(0, len(lead_ids), 500):
+        batch = lead_ids[start:start + 500]
+        parts = {}
+        for row in Lead.objects.filter(pk__in=batch).values_list(
+            'pk', 'property', 'address', 'gp_pic', 'referral_or_affiliate_by',
+        ):
+            parts[row[0]] = [value for value in row if value]
+        for row in LeadPIC.objects.filter(lead_id__in=batch).values_list(
+            'lead_id', 'pic_name', 'phone_number', 'whatsapp', 'email',
+        ):
+            parts[row[0]].extend(value for value in row[1:] if value)
+        LeadSearchIndex.objects.bulk_create([
+            LeadSearchIndex(lead_id=lead_id, document=' '.join(values))
+            for lead_id, values in parts.items()
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leads', '0012_lead_deal_access_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeadSearchIndex',
+            fields=[
+                ('lead', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_index', serialize=False, to='leads.lead')),
+                ('document', models.TextField()),
+            ],
+            options={
+                'db_table': 'lead_search',
+            },
+        ),
+        migrations.RunPython(
+            run_vendor_sql({'postgresql': POSTGRES_FORWARD, 'sqlite': SQLITE_FORWARD}),
+            run_vendor_sql({'postgresql': POSTGRES_BACKWARD, 'sqlite': SQLITE_BACKWARD}),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leads', '0013_lead_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(fields=['type', 'created_at'], name='lead_type_created_idx'),
+        ),
+    ]
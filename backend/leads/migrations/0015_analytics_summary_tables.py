@@ -0,0 +1,67 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leads', '0014_lead_type_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DealSummaryState',
+            fields=[
+                ('deal_id', models.CharField(max_length=20, primary_key=True, serialize=False)),
+                ('month', models.DateField()),
+                ('gp_pic', models.CharField(max_length=100)),
+                ('deal_type', models.CharField(max_length=50)),
+                ('product_amount', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('initiation_amount', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+            ],
+            options={
+                'db_table': 'summary_deal_state',
+            },
+        ),
+        migrations.CreateModel(
+            name='LeadSummaryState',
+            fields=[
+                ('lead_id', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('status_kanban', models.CharField(max_length=50)),
+                ('gp_pic', models.CharField(max_length=100)),
+            ],
+            options={
+                'db_table': 'summary_lead_state',
+            },
+        ),
+        migrations.CreateModel(
+            name='PipelineSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status_kanban', models.CharField(max_length=50)),
+                ('gp_pic', models.CharField(max_length=100)),
+                ('lead_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'summary_pipeline',
+                'constraints': [models.UniqueConstraint(fields=('status_kanban', 'gp_pic'), name='summary_pipeline_key')],
+            },
+        ),
+        migrations.CreateModel(
+            name='RevenueSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('gp_pic', models.CharField(max_length=100)),
+                ('deal_type', models.CharField(max_length=50)),
+                ('deal_count', models.IntegerField(default=0)),
+                ('product_amount', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('initiation_amount', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+            ],
+            options={
+                'db_table': 'summary_revenue',
+                'constraints': [models.UniqueConstraint(fields=('month', 'gp_pic', 'deal_type'), name='summary_revenue_key')],
+            },
+        ),
+    ]
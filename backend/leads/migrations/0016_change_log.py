@@ -0,0 +1,53 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:39
+
+import django.utils.timezone
+from django.db import migrations, models
+
+# Sama dengan leads.sync.SYNC_RESOURCES: resource -> (app, model)
+RESOURCES = [
+    ('leads', 'leads', 'Lead'), ('lead_pics', 'leads', 'LeadPIC'),
+    ('followups', 'leads', 'FollowUp'), ('meetings', 'leads', 'Meeting'),
+    ('quotations', 'leads', 'Quotation'), ('deals', 'leads', 'Deal'),
+    ('deal_details', 'leads', 'DealDetail'), ('activities', 'activities', 'Activity'),
+]
+
+
+def backfill(apps, schema_editor):
+    # Semua baris yang sudah ada masuk log, jadi sync dari cursor kosong = replika penuh
+    ChangeLog = apps.get_model('leads', 'ChangeLog')
+    now = django.utils.timezone.now()
+    for resource, app_label, model_name in RESOURCES:
+        model = apps.get_model(app_label, model_name)
+        batch = []
+        for pk in model.objects.order_by('pk').values_list('pk', flat=True).iterator(chunk_size=2000):
+            batch.append(ChangeLog(resource=resource, object_id=str(pk), changed_at=now))
+            if len(batch) >= 2000:
+                ChangeLog.objects.bulk_create(batch)
+                batch = []
+        ChangeLog.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leads', '0015_analytics_summary_tables'),
+        ('activities', '0003_activity_edited_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLog',
+            fields=[
+                ('seq', models.BigAutoField(primary_key=True, serialize=False)),
+                ('resource', models.CharField(max_length=30)),
+                ('object_id', models.CharField(max_length=64)),
+                ('deleted', models.BooleanField(default=False)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'change_log',
+                'indexes': [models.Index(fields=['changed_at'], name='change_log_changed_at_idx')],
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:53
+
+from django.db import migrations, models
+
+from leads.geo import encode_geohash, make_point, parse_point
+
+BATCH_SIZE = 2000
+
+
+def backfill(apps, schema_editor):
+    # Isi lat / lng / geohash dari koordinat string yang sudah ada
+    for model_name, fields, parse in [
+        ('Lead', ['coordinates'], parse_point),
+        ('Meeting', ['latitude', 'longitude'], make_point),
+    ]:
+        model = apps.get_model('leads', model_name)
+        rows = model.objects.order_by('pk').values_list('pk', *fields).iterator(chunk_size=BATCH_SIZE)
+        batch = []
+        for pk, *values in rows:
+            point = parse(*values)
+            if point:
+                batch.append(model(pk=pk, lat=point[0], lng=point[1], geohash=encode_geohash(*point)))
+            if len(batch) >= BATCH_SIZE:
+                model.objects.bulk_update(batch, ['lat', 'lng', 'geohash'])
+                batch = []
+        model.objects.bulk_update(batch, ['lat', 'lng', 'geohash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leads', '0017_geocode_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lead',
+            name='geohash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=12),
+        ),
+        migrations.AddField(
+            model_name='lead',
+            name='lat',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='lead',
+            name='lng',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='meeting',
+            name='geohash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=12),
+        ),
+        migrations.AddField(
+            model_name='meeting',
+            name='lat',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='meeting',
+            name='lng',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(fields=['geohash'], name='lead_geohash_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='meeting',
+            index=models.Index(fields=['geohash'], name='meeting_geohash_idx'),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.8 on 2026-10-18 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leads', '0018_geo_location'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DealRevenue',
+            fields=[
+                ('deal_id', models.CharField(max_length=20, primary_key=True, serialize=False)),
+                ('lead_id', models.CharField(max_length=64)),
+                ('month', models.DateField()),
+                ('gp_pic', models.CharField(max_length=100)),
+                ('deal_type', models.CharField(max_length=50)),
+                ('mrr', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('arr', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('one_time', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+            ],
+            options={
+                'db_table': 'revenue_deal',
+                'indexes': [models.Index(fields=['month'], name='revenue_deal_month_idx'), models.Index(fields=['gp_pic', 'month'], name='revenue_deal_gp_pic_idx'), models.Index(fields=['deal_type', 'month'], name='revenue_deal_type_idx'), models.Index(fields=['lead_id'], name='revenue_deal_lead_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='LeadCommission',
+            fields=[
+                ('lead_id', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('month', models.DateField()),
+                ('gp_pic', models.CharField(max_length=100)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=18)),
+            ],
+            options={
+                'db_table': 'revenue_commission',
+                'indexes': [models.Index(fields=['month'], name='revenue_commission_month_idx'), models.Index(fields=['gp_pic', 'month'], name='revenue_commission_gp_pic_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='RevenueLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('deal_id', models.CharField(max_length=20)),
+                ('deal_detail_id', models.CharField(max_length=20)),
+                ('month', models.DateField()),
+                ('gp_pic', models.CharField(max_length=100)),
+                ('deal_type', models.CharField(max_length=50)),
+                ('kind', models.CharField(choices=[('product', 'Product'), ('initiation', 'Initiation')], max_length=20)),
+                ('item', models.CharField(max_length=255)),
+                ('billing_months', models.DecimalField(blank=True, decimal_places=4, max_digits=9, null=True)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('mrr', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('arr', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('one_time', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+            ],
+            options={
+                'db_table': 'revenue_line',
+                'indexes': [models.Index(fields=['kind', 'item', 'month'], name='revenue_line_item_idx'), models.Index(fields=['month', 'kind'], name='revenue_line_month_idx'), models.Index(fields=['deal_id'], name='revenue_line_deal_idx')],
+            },
+        ),
+    ]
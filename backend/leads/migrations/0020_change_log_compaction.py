@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-18 14:42
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leads', '0019_revenue_tables'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLogCompaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('compacted_seq', models.BigIntegerField()),
+                ('deleted_count', models.IntegerField(default=0)),
+                ('compacted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'change_log_compaction',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='changelog',
+            index=models.Index(fields=['resource', 'object_id', 'seq'], name='change_log_object_idx'),
+        ),
+    ]
@@ -1,10 +1,105 @@
-import hashlib
-import time
-import random
-import string
-from django.db import models
+from django.db import IntegrityError, connections, models, router, transaction
+from django.utils import timezone
 
-class Lead(models.Model):
+from core.ids import new_id, new_ids
+
+from .geo import encode_geohash, make_point, parse_point
+
+# ID k-sortable (core/ids.py): L- / D- / DD- + 16 char, terurut waktu pembuatan.
+# ID format lama (hash / random) tetap valid.
+ID_INSERT_RETRIES = 3
+
+def generate_lead_id():
+    return new_id('L-')
+
+def generate_lead_ids(count):
+    # Untuk bulk_create (import), id dialokasikan sekaligus & terurut
+    return new_ids('L-', count)
+
+def generate_deal_id():
+    return new_id('D-')
+
+def generate_deal_detail_id():
+    return new_id('DD-')
+
+
+class GeneratedIdMixin:
+    """
+    Insert dengan primary key hasil generator: selalu INSERT (bukan UPDATE lalu
+    INSERT, yang bisa menimpa baris lain kalau ID bentrok) dan kalau ID hasil
+    generator ternyata sudah dipakai, ulangi dengan ID baru. PK yang diisi
+    pemanggil tidak pernah diganti: bentrok tetap IntegrityError.
+
+    PK dari `default=` field (Deal, DealDetail) diisi di __init__; nilainya
+    dicatat supaya tetap dianggap hasil generator.
+    """
+    id_generator = None
+    _generated_pk = None
+
+    def __init__(self, *args, **kwargs):
+        pk = self._meta.pk
+        explicit = pk.attname in kwargs or pk.name in kwargs or 'pk' in kwargs or (
+            len(args) > self._meta.concrete_fields.index(pk)
+        )
+        super().__init__(*args, **kwargs)
+        if not explicit and pk.has_default():
+            self._generated_pk = self.pk
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding or kwargs.get('force_update') or kwargs.get('update_fields'):
+            return super().save(*args, **kwargs)
+        generated = not self.pk or self.pk == self._generated_pk
+        if not self.pk:
+            self.pk = self.id_generator()
+        kwargs['force_insert'] = True
+
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        for attempt in range(ID_INSERT_RETRIES):
+            try:
+                if not connections[using].in_atomic_block:
+                    return super().save(*args, **kwargs)
+                # Di dalam transaksi: savepoint supaya insert yang gagal tidak membatalkan transaksi
+                with transaction.atomic(using=using):
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                if not generated:
+                    raise
+                taken = type(self)._base_manager.using(using).filter(pk=self.pk).exists()
+                if not taken or attempt == ID_INSERT_RETRIES - 1:
+                    raise
+                self.pk = self._generated_pk = self.id_generator()
+
+
+class GeoLocated(models.Model):
+    # Salinan numerik koordinat string + geohash untuk query lokasi (leads/geo.py).
+    # Diisi di save(); jalur bulk_create / bulk_update memanggil update_location() sendiri.
+    lat = models.FloatField(null=True, blank=True, editable=False)
+    lng = models.FloatField(null=True, blank=True, editable=False)
+    geohash = models.CharField(max_length=12, blank=True, default='', editable=False)
+
+    class Meta:
+        abstract = True
+
+    def get_point(self):
+        """
+        Wajib di-override model turunan: return (lat, lng) dari kolom koordinat
+        model tersebut, atau None kalau kosong / tidak valid.
+        """
+        raise NotImplementedError(f'{type(self).__name__} harus mengimplementasikan get_point()')
+
+    def update_location(self):
+        point = self.get_point()
+        self.lat, self.lng = point or (None, None)
+        self.geohash = encode_geohash(*point) if point else ''
+
+    def save(self, *args, **kwargs):
+        self.update_location()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'lat', 'lng', 'geohash'}
+        super().save(*args, **kwargs)
+
+
+class Lead(GeneratedIdMixin, GeoLocated):
     # Primary Key berupa String Unik (L-XXXXXX)
     lead_id = models.CharField(max_length=64, primary_key=True, editable=False)
     
@@ -25,6 +120,12 @@ class Lead(models.Model):
         ('retention', 'Retention'),
     ]
     status_kanban = models.CharField(max_length=50, choices=STATUS_KANBAN_CHOICES, default='lead_generation')
+
+    # Source yang dihitung sebagai Inbound di kolom Lead Generation (sama dengan inboundSources di Leads.vue)
+    INBOUND_SOURCES = [
+        'Website', 'Referral', 'Reff', 'Reff No Commission',
+        'Social Media', 'Affiliate',
+    ]
     referral_or_affiliate_by = models.CharField(max_length=150, blank=True, null=True)
     commission_amount = models.CharField(max_length=100, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -32,12 +133,27 @@ class Lead(models.Model):
 
     class Meta:
         db_table = 'lead'
-    def save(self, *args, **kwargs):
-        if not self.lead_id:
-            raw_string = f"{time.time()}-{random.randint(1000, 9999)}"
-            hash_object = hashlib.sha256(raw_string.encode())
-            self.lead_id = f"L-{hash_object.hexdigest()[:12].upper()}"
-        super().save(*args, **kwargs)
+        indexes = [
+            # List default & keyset pagination (created_at, lead_id)
+            models.Index(fields=['created_at', 'lead_id'], name='lead_created_idx'),
+            # Kolom board: status_kanban = ? ORDER BY created_at
+            models.Index(fields=['status_kanban', 'created_at', 'lead_id'], name='lead_status_created_idx'),
+            models.Index(fields=['source', 'created_at'], name='lead_source_created_idx'),
+            models.Index(fields=['gp_pic', 'created_at'], name='lead_gp_pic_created_idx'),
+            models.Index(fields=['type', 'created_at'], name='lead_type_created_idx'),
+            models.Index(fields=['date_in'], name='lead_date_in_idx'),
+            # Pipeline yang masih berjalan (belum deals / onboarding / retention)
+            models.Index(
+                fields=['created_at', 'lead_id'], name='lead_open_pipeline_idx',
+                condition=models.Q(status_kanban__in=['lead_generation', 'follow_up', 'quotation']),
+            ),
+            # Query lokasi (leads/geo.py): range scan per sel geohash
+            models.Index(fields=['geohash'], name='lead_geohash_idx'),
+        ]
+    id_generator = staticmethod(generate_lead_id)
+
+    def get_point(self):
+        return parse_point(self.coordinates)
 
     def __str__(self):
         return f"{self.property} ({self.lead_id})"
@@ -68,8 +184,13 @@ class FollowUp(models.Model):
 
     class Meta:
         db_table = 'follow_up'
+        indexes = [
+            models.Index(fields=['lead', 'date', 'id'], name='follow_up_lead_date_idx'),
+            models.Index(fields=['pic_gp', 'date'], name='follow_up_pic_gp_date_idx'),
+            models.Index(fields=['date', 'id'], name='follow_up_date_idx'),
+        ]
 
-class Meeting(models.Model):
+class Meeting(GeoLocated):
     lead = models.ForeignKey(Lead, on_delete=models.CASCADE)
     pic_gp = models.CharField(max_length=100)
     pic_lead = models.CharField(max_length=100)
@@ -87,6 +208,15 @@ class Meeting(models.Model):
     edited_at = models.DateTimeField(auto_now=True)
     class Meta:
         db_table = 'meeting'
+        indexes = [
+            models.Index(fields=['lead', 'date', 'id'], name='meeting_lead_date_idx'),
+            models.Index(fields=['pic_gp', 'date'], name='meeting_pic_gp_date_idx'),
+            models.Index(fields=['date', 'id'], name='meeting_date_idx'),
+            models.Index(fields=['geohash'], name='meeting_geohash_idx'),
+        ]
+
+    def get_point(self):
+        return make_point(self.latitude, self.longitude)
     # ... (model Lead, LeadPIC, FollowUp, Meeting yang sudah ada)
 
 class Quotation(models.Model):
@@ -101,15 +231,15 @@ class Quotation(models.Model):
 
     class Meta:
         db_table = 'quotation'
+        indexes = [
+            models.Index(fields=['lead', 'date', 'quotation_id'], name='quotation_lead_date_idx'),
+            models.Index(fields=['pic_gp', 'date'], name='quotation_pic_gp_date_idx'),
+            models.Index(fields=['date', 'quotation_id'], name='quotation_date_idx'),
+        ]
 
-def generate_deal_id():
-    return 'D-' + ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
-
-def generate_deal_detail_id():
-    return 'DD-' + ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
-
-class Deal(models.Model):
+class Deal(GeneratedIdMixin, models.Model):
     deal_id = models.CharField(max_length=20, primary_key=True, default=generate_deal_id, editable=False)
+    id_generator = staticmethod(generate_deal_id)
     lead = models.ForeignKey(Lead, on_delete=models.CASCADE)
     
     DEAL_TYPES = [
@@ -141,12 +271,28 @@ class Deal(models.Model):
 
     class Meta:
         db_table = 'deal'
+        indexes = [
+            # Dipakai timeline per lead (urut date DESC)
+            models.Index(fields=['lead', 'date', 'deal_id'], name='deal_lead_date_idx'),
+            models.Index(fields=['created_at', 'deal_id'], name='deal_created_idx'),
+            models.Index(fields=['paid_date'], name='deal_paid_date_idx'),
+            # Deal belum lunas / invoice belum terbit (sheet Dealing Property)
+            models.Index(
+                fields=['created_at', 'deal_id'], name='deal_unpaid_idx',
+                condition=models.Q(is_paid=False),
+            ),
+            models.Index(
+                fields=['created_at', 'deal_id'], name='deal_invoice_pending_idx',
+                condition=models.Q(invoice_issued=False),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.deal_id} - {self.lead.property}"
 
-class DealDetail(models.Model):
+class DealDetail(GeneratedIdMixin, models.Model):
     deal_detail_id = models.CharField(max_length=20, primary_key=True, default=generate_deal_detail_id, editable=False)
+    id_generator = staticmethod(generate_deal_detail_id)
     deal = models.ForeignKey(Deal, related_name='details', on_delete=models.CASCADE)
     
     package = models.CharField(max_length=100)
@@ -165,4 +311,187 @@ class DealDetail(models.Model):
     class Meta:
         db_table = 'deal_detail'
     def __str__(self):
-        return f"Quote for {self.lead}"
\ No newline at end of file
+        return f"Quote for {self.lead}"
+class LeadSearchIndex(models.Model):
+    # Dokumen pencarian per lead (property, alamat, PIC, dll) - diisi oleh leads/search.py.
+    # PostgreSQL: kolom tsvector + index trigram, SQLite: tabel FTS5 (lihat migration 0013)
+    lead = models.OneToOneField(Lead, primary_key=True, on_delete=models.CASCADE, related_name='search_index')
+    document = models.TextField()
+
+    class Meta:
+        db_table = 'lead_search'
+
+# ==========================================
+# SUMMARY TABLES (ANALYTICS)
+# ==========================================
+# Diperbarui incremental oleh leads/analytics.py, dibangun ulang dengan
+# `manage.py rebuild_analytics`. Endpoint /api/leads/analytics/ hanya membaca tabel ini.
+
+class PipelineSummary(models.Model):
+    # Jumlah lead per status_kanban & gp_pic
+    status_kanban = models.CharField(max_length=50)
+    gp_pic = models.CharField(max_length=100)
+    lead_count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'summary_pipeline'
+        constraints = [
+            models.UniqueConstraint(fields=['status_kanban', 'gp_pic'], name='summary_pipeline_key'),
+        ]
+
+class RevenueSummary(models.Model):
+    # Deal & nilai DealDetail per bulan (Deal.date), gp_pic lead dan deal_type
+    month = models.DateField()
+    gp_pic = models.CharField(max_length=100)
+    deal_type = models.CharField(max_length=50)
+    deal_count = models.IntegerField(default=0)
+    product_amount = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    initiation_amount = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+
+    class Meta:
+        db_table = 'summary_revenue'
+        constraints = [
+            models.UniqueConstraint(fields=['month', 'gp_pic', 'deal_type'], name='summary_revenue_key'),
+        ]
+
+class LeadSummaryState(models.Model):
+    # Kontribusi terakhir tiap lead ke PipelineSummary (tanpa FK: baris harus tetap
+    # ada setelah lead dihapus supaya kontribusinya bisa dikurangi)
+    lead_id = models.CharField(max_length=64, primary_key=True)
+    status_kanban = models.CharField(max_length=50)
+    gp_pic = models.CharField(max_length=100)
+
+    class Meta:
+        db_table = 'summary_lead_state'
+
+class DealSummaryState(models.Model):
+    # Kontribusi terakhir tiap deal ke RevenueSummary
+    deal_id = models.CharField(max_length=20, primary_key=True)
+    month = models.DateField()
+    gp_pic = models.CharField(max_length=100)
+    deal_type = models.CharField(max_length=50)
+    product_amount = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    initiation_amount = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+
+    class Meta:
+        db_table = 'summary_deal_state'
+
+# ==========================================
+# REVENUE (MRR / ARR, NORMALISASI DEALDETAIL)
+# ==========================================
+# Diisi leads/revenue.py dari DealDetail (product_amount per product_amount_by,
+# string product / initiation dipecah per item) dan Lead.commission_amount.
+# Backfill: `manage.py rebuild_revenue`. Tanpa FK supaya bisa ditulis ulang per batch.
+
+class DealRevenue(models.Model):
+    # Total per deal, sudah dinormalisasi per bulan / tahun
+    deal_id = models.CharField(max_length=20, primary_key=True)
+    lead_id = models.CharField(max_length=64)
+    month = models.DateField()  # Deal.date, tanggal 1
+    gp_pic = models.CharField(max_length=100)
+    deal_type = models.CharField(max_length=50)
+    mrr = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    arr = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    one_time = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+
+    class Meta:
+        db_table = 'revenue_deal'
+        indexes = [
+            models.Index(fields=['month'], name='revenue_deal_month_idx'),
+            models.Index(fields=['gp_pic', 'month'], name='revenue_deal_gp_pic_idx'),
+            models.Index(fields=['deal_type', 'month'], name='revenue_deal_type_idx'),
+            models.Index(fields=['lead_id'], name='revenue_deal_lead_idx'),
+        ]
+
+class RevenueLine(models.Model):
+    # Satu baris per item product / initiation per DealDetail. Nominal DealDetail
+    # dibagi rata ke item-nya (sisa sen ke item pertama), jadi SUM per deal = DealRevenue
+    KIND_PRODUCT = 'product'
+    KIND_INITIATION = 'initiation'
+    KIND_CHOICES = [(KIND_PRODUCT, 'Product'), (KIND_INITIATION, 'Initiation')]
+
+    deal_id = models.CharField(max_length=20)
+    deal_detail_id = models.CharField(max_length=20)
+    month = models.DateField()
+    gp_pic = models.CharField(max_length=100)
+    deal_type = models.CharField(max_length=50)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    item = models.CharField(max_length=255)
+    # Lama satu periode tagihan dalam bulan (Month = 1, Year = 12); NULL = sekali bayar
+    billing_months = models.DecimalField(max_digits=9, decimal_places=4, null=True, blank=True)
+    amount = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    mrr = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    arr = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    one_time = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+
+    class Meta:
+        db_table = 'revenue_line'
+        indexes = [
+            models.Index(fields=['kind', 'item', 'month'], name='revenue_line_item_idx'),
+            models.Index(fields=['month', 'kind'], name='revenue_line_month_idx'),
+            models.Index(fields=['deal_id'], name='revenue_line_deal_idx'),
+        ]
+
+class LeadCommission(models.Model):
+    # Lead.commission_amount (CharField bebas: "Rp 500.000", "1,000,000") sebagai angka.
+    # Lead tanpa komisi / yang tidak bisa dibaca tidak punya baris
+    lead_id = models.CharField(max_length=64, primary_key=True)
+    month = models.DateField()  # Lead.date_in, tanggal 1
+    gp_pic = models.CharField(max_length=100)
+    amount = models.DecimalField(max_digits=18, decimal_places=2)
+
+    class Meta:
+        db_table = 'revenue_commission'
+        indexes = [
+            models.Index(fields=['month'], name='revenue_commission_month_idx'),
+            models.Index(fields=['gp_pic', 'month'], name='revenue_commission_gp_pic_idx'),
+        ]
+
+# ==========================================
+# DELTA SYNC
+# ==========================================
+
+class ChangeLog(models.Model):
+    # Satu baris per perubahan (insert / update / delete) untuk /api/sync/ (leads/sync.py).
+    # seq = urutan monoton (AUTOINCREMENT), deleted=True = tombstone.
+    seq = models.BigAutoField(primary_key=True)
+    resource = models.CharField(max_length=30)
+    object_id = models.CharField(max_length=64)
+    deleted = models.BooleanField(default=False)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'change_log'
+        indexes = [
+            # Re-scan perubahan yang commit terlambat (lihat SYNC_COMMIT_WINDOW)
+            models.Index(fields=['changed_at'], name='change_log_changed_at_idx'),
+            # Compaction: cari entri yang lebih baru untuk baris yang sama
+            models.Index(fields=['resource', 'object_id', 'seq'], name='change_log_object_idx'),
+        ]
+
+
+class ChangeLogCompaction(models.Model):
+    # Riwayat compaction ChangeLog (leads/sync.py: compact_changes). Entri dengan
+    # seq <= compacted_seq sudah diringkas, cursor sync yang lebih lama wajib full resync
+    compacted_seq = models.BigIntegerField()
+    deleted_count = models.IntegerField(default=0)
+    compacted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'change_log_compaction'
+
+
+class GeocodeCache(models.Model):
+    # Cache hasil geocoding (leads/geocoding.py), key = hash query yang sudah dinormalisasi.
+    # found=False = lokasi tidak ditemukan (negative cache, dicoba lagi setelah GEOCODE_NEGATIVE_TTL)
+    key = models.CharField(max_length=64, primary_key=True)
+    kind = models.CharField(max_length=10)  # search / reverse
+    query = models.TextField()
+    found = models.BooleanField(default=False)
+    latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    display_name = models.TextField(blank=True)
+    fetched_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'geocode_cache'
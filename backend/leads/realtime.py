@@ -0,0 +1,116 @@
+"""
+Event real-time (core/realtime.py) untuk kanban, sheet Dealing Property dan aktivitas.
+
+Event sengaja ringkas - client menerapkan perubahan langsung ke state lokal
+(kartu kanban / sel sheet) dan hanya refetch satu baris kalau perlu:
+
+  leads      : lead.saved {id, status_kanban, edited_at, created}
+               lead.status {ids, status_kanban, edited_at}   (pindah massal)
+               lead.deleted {id}, lead.imported {count}
+  deals      : deal.saved {id, lead, fields, created}, deal.deleted {id}
+               deal.details {id}                   (produk / paket / file berubah)
+  activities : activity.saved / activity.deleted {id, kind, lead}
+               (kind 'activity' dari app activities, lead = null)
+
+`fields` deal.saved memakai key & format DealSerializer (sama dengan baris list /
+detail), dibangun dari nilai yang sudah ada di instance tanpa query:
+- kolom biasa & FK (sebagai id) selalu ikut;
+- field dari relasi (lead_property, pic_lead_name, ...) hanya kalau relasinya
+  sudah dimuat di instance; kalau tidak, key-nya tidak dikirim dan client
+  mengambil ulang barisnya bila FK-nya berubah;
+- `details` dan kolom file tidak ikut (URL file absolut butuh request):
+  perubahan file dikirim sebagai deal.details.
+"""
+from django.db.models import FileField
+from rest_framework.fields import SkipField
+from rest_framework.relations import PKOnlyObject
+
+from core.realtime import broadcast
+
+from .models import Deal
+
+DEAL_FILE_FIELDS = frozenset(field.name for field in Deal._meta.concrete_fields if isinstance(field, FileField))
+
+ACTIVITY_KINDS = {
+    'FollowUp': 'followup',
+    'Meeting': 'meeting',
+    'Quotation': 'quotation',
+}
+
+
+_deal_event_fields = None
+
+
+def _get_deal_event_fields():
+    """[(nama, field DRF, relasi model atau None)] dari DealSerializer, dibangun sekali."""
+    global _deal_event_fields
+    if _deal_event_fields is None:
+        # Import di sini: serializers.py mengimpor modul ini
+        from .serializers import DealSerializer
+
+        _deal_event_fields = [
+            (name, field, Deal._meta.get_field(field.source_attrs[0]) if len(field.source_attrs) > 1 else None)
+            for name, field in DealSerializer().fields.items()
+            if not field.write_only and name != 'details' and name not in DEAL_FILE_FIELDS
+        ]
+    return _deal_event_fields
+
+
+def _deal_fields(deal):
+    fields = {}
+    for name, field, relation in _get_deal_event_fields():
+        # Relasi yang belum dimuat tidak di-query (signal post_save di setiap save Deal)
+        if relation is not None and not relation.is_cached(deal):
+            continue
+        try:
+            attribute = field.get_attribute(deal)
+        except SkipField:
+            continue
+        # Sama dengan Serializer.to_representation: FK kosong / nilai None -> None
+        check = attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+        fields[name] = None if check is None else field.to_representation(attribute)
+    return fields
+
+
+def lead_saved(lead, created=False):
+    broadcast('leads', {
+        'type': 'lead.saved', 'id': lead.pk, 'status_kanban': lead.status_kanban,
+        'edited_at': lead.edited_at, 'created': created,
+    })
+
+
+def leads_moved(lead_ids, status_kanban, edited_at):
+    broadcast('leads', {
+        'type': 'lead.status', 'ids': list(lead_ids), 'status_kanban': status_kanban, 'edited_at': edited_at,
+    })
+
+
+def leads_imported(count):
+    broadcast('leads', {'type': 'lead.imported', 'count': count})
+
+
+def lead_deleted(lead_id):
+    broadcast('leads', {'type': 'lead.deleted', 'id': lead_id})
+
+
+def deal_saved(deal, created=False):
+    broadcast('deals', {
+        'type': 'deal.saved', 'id': deal.pk, 'lead': deal.lead_id,
+        'fields': _deal_fields(deal), 'created': created,
+    })
+
+
+def deal_details_changed(deal_id):
+    broadcast('deals', {'type': 'deal.details', 'id': deal_id})
+
+
+def deal_deleted(deal_id):
+    broadcast('deals', {'type': 'deal.deleted', 'id': deal_id})
+
+
+def activity_changed(activity, deleted=False):
+    kind = ACTIVITY_KINDS[type(activity).__name__]
+    broadcast('activities', {
+        'type': 'activity.deleted' if deleted else 'activity.saved',
+        'id': activity.pk, 'kind': kind, 'lead': activity.lead_id,
+    })
@@ -0,0 +1,348 @@
+"""
+Revenue berulang (MRR / ARR) yang sudah dinormalisasi dari DealDetail.
+
+DealDetail menyimpan product_amount per periode tagihan bebas
+(product_amount_by: "Month", "Year", "3 Bulan", ...), initiation_amount sekali
+bayar, dan product / initiation sebagai string koma. Lead.commission_amount
+berupa teks. Semua itu tidak bisa di-SUM di SQL, jadi modul ini menulis ulang
+datanya ke tabel angka:
+
+- RevenueLine   : satu baris per item product / initiation per DealDetail,
+                  nominal dibagi rata ke item (sisa sen ke item pertama);
+- DealRevenue   : total MRR / ARR / one-time per deal (= SUM RevenueLine);
+- LeadCommission: commission_amount sebagai Decimal.
+
+Periode tagihan yang tidak dikenal (misal "One Time", "Lifetime") dihitung
+sebagai pembayaran sekali (one_time), bukan MRR.
+
+refresh_revenue() / refresh_commissions() dipanggil dari leads/analytics.py
+(refresh_deals / refresh_leads), jadi ikut jalur signal maupun jalur bulk
+yang sudah ada. Backfill: `manage.py rebuild_revenue`.
+"""
+import datetime
+import re
+from decimal import ROUND_DOWN, ROUND_HALF_UP, Decimal, InvalidOperation
+from functools import lru_cache
+
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from .models import Deal, DealDetail, DealRevenue, Lead, LeadCommission, RevenueLine
+
+BATCH_SIZE = 500
+ZERO = Decimal('0')
+CENT = Decimal('0.01')
+MAX_AMOUNT = Decimal('1e15')  # batas DecimalField(max_digits=18, decimal_places=2)
+
+# Lama satu periode tagihan dalam bulan
+PERIOD_MONTHS = {
+    'day': Decimal(12) / Decimal(365), 'daily': Decimal(12) / Decimal(365),
+    'hari': Decimal(12) / Decimal(365), 'harian': Decimal(12) / Decimal(365),
+    'week': Decimal(12) / Decimal(52), 'weekly': Decimal(12) / Decimal(52),
+    'minggu': Decimal(12) / Decimal(52), 'mingguan': Decimal(12) / Decimal(52),
+    'month': Decimal(1), 'monthly': Decimal(1), 'mo': Decimal(1),
+    'bulan': Decimal(1), 'bulanan': Decimal(1),
+    'quarter': Decimal(3), 'quarterly': Decimal(3), 'triwulan': Decimal(3), 'kuartal': Decimal(3),
+    'semester': Decimal(6),
+    'year': Decimal(12), 'yearly': Decimal(12), 'annual': Decimal(12), 'annually': Decimal(12),
+    'yr': Decimal(12), 'tahun': Decimal(12), 'tahunan': Decimal(12),
+}
+# "Month", "per month", "/month", "3 Months", "12 bulan"
+_PERIOD_RE = re.compile(r'^(?:per\s+|/\s*)?(\d+)?\s*([a-z]+?)s?$')
+
+# "Rp 1.500.000", "1,000,000.50", "2,5 jt"
+_AMOUNT_RE = re.compile(r'-?\d[\d.,]*')
+AMOUNT_SCALES = {'rb': 1000, 'ribu': 1000, 'k': 1000, 'jt': 10 ** 6, 'juta': 10 ** 6}
+
+GROUPS = {
+    # group_by -> (kolom, baca dari RevenueLine dengan kind ini / None = DealRevenue)
+    'month': ('month', None),
+    'deal_type': ('deal_type', None),
+    'gp_pic': ('gp_pic', None),
+    'product': ('item', RevenueLine.KIND_PRODUCT),
+    'initiation': ('item', RevenueLine.KIND_INITIATION),
+}
+
+
+# ==========================================
+# NORMALISASI
+# ==========================================
+
+@lru_cache(maxsize=256)
+def billing_months(value):
+    """product_amount_by -> lama periode dalam bulan (Decimal), None = sekali bayar."""
+    match = _PERIOD_RE.match(' '.join(str(value or '').lower().split()))
+    if not match:
+        return None
+    count, unit = match.groups()
+    months = PERIOD_MONTHS.get(unit)
+    if months is None or count == '0':
+        return None
+    return months * int(count or 1)
+
+
+def split_items(value):
+    """'PMS, Channel Manager' -> ['PMS', 'Channel Manager']."""
+    return [item.strip() for item in (value or '').split(',') if item.strip()]
+
+
+def split_amount(amount, count):
+    """Bagi rata ke `count` bagian (2 desimal); sisa pembulatan masuk bagian pertama."""
+    amount = (amount or ZERO).quantize(CENT)
+    share = (amount / count).quantize(CENT, rounding=ROUND_DOWN)
+    return [amount - share * (count - 1)] + [share] * (count - 1)
+
+
+def parse_amount(value):
+    """Teks nominal bebas -> Decimal (2 desimal), None kalau kosong / tidak bisa dibaca / persen."""
+    text = str(value or '').strip().lower()
+    if not text or '%' in text:
+        return None
+    text = text.replace(' ', '')
+    match = _AMOUNT_RE.search(text)
+    if not match:
+        return None
+    number = match.group().rstrip('.,')
+
+    # Pemisah desimal: yang terakhir kalau ada titik & koma, selain itu pemisah
+    # tunggal yang tidak diikuti tepat 3 digit ("1.5" / "2,5" vs "500.000")
+    separators = [char for char in number if char in '.,']
+    decimal_sep = None
+    if len(set(separators)) == 2:
+        decimal_sep = separators[-1]
+    elif len(separators) == 1 and len(number) - number.index(separators[0]) - 1 != 3:
+        decimal_sep = separators[0]
+    for sep in '.,':
+        if sep != decimal_sep:
+            number = number.replace(sep, '')
+    if decimal_sep:
+        number = number.replace(decimal_sep, '.')
+
+    try:
+        amount = Decimal(number)
+    except InvalidOperation:
+        return None
+    suffix = re.match(r'[a-z]*', text[match.end():].lstrip('.,')).group()
+    amount *= AMOUNT_SCALES.get(suffix, 1)
+    if abs(amount) >= MAX_AMOUNT:
+        return None
+    return amount.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def detail_lines(detail, deal):
+    """RevenueLine (belum disimpan) untuk satu baris DealDetail (.values())."""
+    base = {
+        'deal_id': detail['deal_id'], 'deal_detail_id': detail['deal_detail_id'],
+        'month': deal['date'].replace(day=1), 'gp_pic': deal['lead__gp_pic'], 'deal_type': deal['deal_type'],
+    }
+    lines = []
+
+    months = billing_months(detail['product_amount_by'])
+    products = split_items(detail['product']) or ['']
+    for item, amount in zip(products, split_amount(detail['product_amount'], len(products))):
+        if months is None:
+            recurring = {'mrr': ZERO, 'arr': ZERO, 'one_time': amount}
+        else:
+            recurring = {
+                'mrr': (amount / months).quantize(CENT, rounding=ROUND_HALF_UP),
+                'arr': (amount * 12 / months).quantize(CENT, rounding=ROUND_HALF_UP),
+                'one_time': ZERO,
+            }
+        lines.append(RevenueLine(
+            **base, kind=RevenueLine.KIND_PRODUCT, item=item, amount=amount,
+            billing_months=months.quantize(Decimal('0.0001')) if months is not None else None, **recurring,
+        ))
+
+    initiations = split_items(detail['initiation'])
+    if initiations or detail['initiation_amount']:
+        initiations = initiations or ['']
+        for item, amount in zip(initiations, split_amount(detail['initiation_amount'], len(initiations))):
+            lines.append(RevenueLine(
+                **base, kind=RevenueLine.KIND_INITIATION, item=item, amount=amount,
+                mrr=ZERO, arr=ZERO, one_time=amount,
+            ))
+    return lines
+
+
+# ==========================================
+# REFRESH
+# ==========================================
+
+def refresh_revenue(deal_ids):
+    """Tulis ulang DealRevenue & RevenueLine untuk deal_ids (deal yang sudah dihapus ikut dibersihkan)."""
+    deal_ids = list(dict.fromkeys(deal_ids))
+    for start in range(0, len(deal_ids), BATCH_SIZE):
+        batch = deal_ids[start:start + BATCH_SIZE]
+        deals = {
+            row['deal_id']: row
+            for row in Deal.objects.filter(pk__in=batch).values('deal_id', 'lead_id', 'date', 'deal_type', 'lead__gp_pic')
+        }
+        totals = {
+            deal_id: DealRevenue(
+                deal_id=deal_id, lead_id=deal['lead_id'], month=deal['date'].replace(day=1),
+                gp_pic=deal['lead__gp_pic'], deal_type=deal['deal_type'], mrr=ZERO, arr=ZERO, one_time=ZERO,
+            )
+            for deal_id, deal in deals.items()
+        }
+        lines = []
+        details = (
+            DealDetail.objects.filter(deal_id__in=list(deals)).order_by('deal_id', 'created_at', 'deal_detail_id')
+            .values(
+                'deal_detail_id', 'deal_id', 'product', 'product_amount', 'product_amount_by',
+                'initiation', 'initiation_amount',
+            )
+        )
+        for detail in details:
+            for line in detail_lines(detail, deals[detail['deal_id']]):
+                total = totals[line.deal_id]
+                total.mrr += line.mrr
+                total.arr += line.arr
+                total.one_time += line.one_time
+                lines.append(line)
+
+        with transaction.atomic():
+            RevenueLine.objects.filter(deal_id__in=batch).delete()
+            DealRevenue.objects.filter(pk__in=batch).delete()
+            DealRevenue.objects.bulk_create(totals.values())
+            RevenueLine.objects.bulk_create(lines)
+
+
+def refresh_commissions(lead_ids):
+    """Tulis ulang LeadCommission untuk lead_ids."""
+    lead_ids = list(dict.fromkeys(lead_ids))
+    for start in range(0, len(lead_ids), BATCH_SIZE):
+        batch = lead_ids[start:start + BATCH_SIZE]
+        commissions = []
+        for lead_id, gp_pic, date_in, raw in Lead.objects.filter(pk__in=batch).values_list(
+            'lead_id', 'gp_pic', 'date_in', 'commission_amount',
+        ):
+            amount = parse_amount(raw)
+            if amount is not None:
+                commissions.append(LeadCommission(
+                    lead_id=lead_id, month=date_in.replace(day=1), gp_pic=gp_pic, amount=amount,
+                ))
+
+        if not commissions:
+            LeadCommission.objects.filter(pk__in=batch).delete()
+            continue
+        with transaction.atomic():
+            LeadCommission.objects.filter(pk__in=batch).delete()
+            LeadCommission.objects.bulk_create(commissions)
+
+
+def rebuild_revenue(batch_size=BATCH_SIZE, progress=None):
+    """
+    Backfill: hitung ulang semua deal & lead per batch (tabel tidak dikosongkan
+    dulu, jadi endpoint tetap terisi selama proses), lalu hapus baris yatim.
+    `progress(label, jumlah)` dipanggil setiap batch selesai.
+    """
+    for model, refresh in [(Deal, refresh_revenue), (Lead, refresh_commissions)]:
+        done, batch = 0, []
+        for pk in model.objects.order_by().values_list('pk', flat=True).iterator(chunk_size=batch_size):
+            batch.append(pk)
+            if len(batch) >= batch_size:
+                refresh(batch)
+                done += len(batch)
+                batch = []
+                if progress:
+                    progress(model._meta.model_name, done)
+        if batch:
+            refresh(batch)
+            done += len(batch)
+            if progress:
+                progress(model._meta.model_name, done)
+
+    with transaction.atomic():
+        DealRevenue.objects.exclude(deal_id__in=Deal.objects.values('pk')).delete()
+        RevenueLine.objects.exclude(deal_id__in=Deal.objects.values('pk')).delete()
+        LeadCommission.objects.exclude(lead_id__in=Lead.objects.values('pk')).delete()
+
+
+# ==========================================
+# QUERY (hanya baca tabel revenue)
+# ==========================================
+
+def parse_month(value):
+    """'2024-03' -> date(2024, 3, 1). ValueError kalau format salah."""
+    return datetime.datetime.strptime(value, '%Y-%m').date()
+
+
+def money(value):
+    return str((value or ZERO).quantize(CENT))
+
+
+def get_revenue(group_by='month', date_from=None, date_to=None, deal_type=None, gp_pic=None, product=None):
+    """
+    MRR / ARR / one-time per `group_by` (month, product, initiation, deal_type,
+    gp_pic). date_from / date_to = bulan (date, inklusif). Filter product
+    membatasi ke baris product itu saja. Komisi (LeadCommission, per bulan
+    date_in lead) ikut di hasil per month / gp_pic dan di totals kalau tidak
+    difilter deal_type / product.
+    """
+    if group_by not in GROUPS:
+        raise ValueError(f"group_by harus salah satu dari: {', '.join(GROUPS)}")
+    column, kind = GROUPS[group_by]
+    if product and kind is None:
+        kind = RevenueLine.KIND_PRODUCT
+
+    if kind is None:
+        queryset = DealRevenue.objects.all()
+        deal_count = Count('deal_id')
+    else:
+        queryset = RevenueLine.objects.filter(kind=kind)
+        deal_count = Count('deal_id', distinct=True)
+        if product:
+            queryset = queryset.filter(item=product)
+
+    filters = {}
+    if date_from:
+        filters['month__gte'] = date_from
+    if date_to:
+        filters['month__lte'] = date_to
+    if gp_pic:
+        filters['gp_pic'] = gp_pic
+    queryset = queryset.filter(**filters)
+    if deal_type:
+        queryset = queryset.filter(deal_type=deal_type)
+
+    sums = {'deal_count': deal_count, 'mrr': Sum('mrr'), 'arr': Sum('arr'), 'one_time': Sum('one_time')}
+    rows = queryset.order_by(column).values(column).annotate(**sums)
+    totals = queryset.aggregate(**sums)
+
+    def key(value):
+        return value.strftime('%Y-%m') if group_by == 'month' else value
+
+    results = {
+        key(row[column]): {
+            group_by: key(row[column]), 'deal_count': row['deal_count'],
+            'mrr': money(row['mrr']), 'arr': money(row['arr']), 'one_time': money(row['one_time']),
+        }
+        for row in rows
+    }
+    data = {
+        'group_by': group_by,
+        'results': list(results.values()),
+        'totals': {
+            'deal_count': totals['deal_count'], 'mrr': money(totals['mrr']),
+            'arr': money(totals['arr']), 'one_time': money(totals['one_time']),
+        },
+    }
+
+    if not (deal_type or product):
+        commission_rows = LeadCommission.objects.filter(**filters)
+        data['totals']['commission'] = money(commission_rows.aggregate(total=Sum('amount'))['total'])
+        if group_by in ('month', 'gp_pic'):
+            commissions = {
+                key(value): amount
+                for value, amount in commission_rows.order_by(column).values_list(column).annotate(Sum('amount'))
+            }
+            for name, row in results.items():
+                row['commission'] = money(commissions.pop(name, ZERO))
+            # Bulan / gp_pic yang hanya punya komisi, tanpa deal
+            for name, amount in commissions.items():
+                results[name] = {
+                    group_by: name, 'deal_count': 0, 'mrr': money(ZERO), 'arr': money(ZERO),
+                    'one_time': money(ZERO), 'commission': money(amount),
+                }
+            data['results'] = [results[name] for name in sorted(results)]
+    return data
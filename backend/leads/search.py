@@ -0,0 +1,127 @@
+"""
+Pencarian lead (property, alamat, gp_pic, referral, PIC).
+
+Index disimpan di tabel lead_search (LeadSearchIndex) satu baris per lead:
+- PostgreSQL: kolom search_vector (tsvector, GIN) + GIN trigram untuk fuzzy
+- SQLite: tabel virtual FTS5 lead_search_fts (dipakai untuk development)
+- backend lain: fallback icontains
+
+Index diperbarui otomatis lewat signal (leads/signals.py) setelah transaksi
+commit; jalur bulk (import, generate_dataset) memanggil index_leads() langsung.
+"""
+import re
+import threading
+
+from django.db import connection, transaction
+
+from .models import Lead, LeadPIC, LeadSearchIndex
+
+LEAD_FIELDS = ['lead_id', 'property', 'address', 'gp_pic', 'referral_or_affiliate_by']
+PIC_FIELDS = ['pic_name', 'phone_number', 'whatsapp', 'email']
+BATCH_SIZE = 500
+# Ambang word_similarity untuk pencocokan fuzzy (typo) di PostgreSQL
+TRIGRAM_THRESHOLD = 0.4
+
+_pending = threading.local()
+
+
+# ==========================================
+# INDEXING
+# ==========================================
+
+def index_leads(lead_ids):
+    """Bangun ulang dokumen pencarian untuk lead_ids (batch, query konstan per 500 lead)."""
+    lead_ids = list(dict.fromkeys(lead_ids))
+    for start in range(0, len(lead_ids), BATCH_SIZE):
+        batch = lead_ids[start:start + BATCH_SIZE]
+
+        parts = {}
+        for row in Lead.objects.filter(pk__in=batch).values_list(*LEAD_FIELDS):
+            parts[row[0]] = [value for value in row if value]
+        for row in LeadPIC.objects.filter(lead_id__in=batch).order_by('id').values_list('lead_id', *PIC_FIELDS):
+            if row[0] in parts:
+                parts[row[0]].extend(value for value in row[1:] if value)
+
+        missing = [lead_id for lead_id in batch if lead_id not in parts]
+        if missing:
+            LeadSearchIndex.objects.filter(lead_id__in=missing).delete()
+        if parts:
+            LeadSearchIndex.objects.bulk_create(
+                [LeadSearchIndex(lead_id=lead_id, document=' '.join(values)) for lead_id, values in parts.items()],
+                update_conflicts=True, unique_fields=['lead'], update_fields=['document'],
+            )
+
+
+def schedule_reindex(lead_id):
+    """
+    Tandai lead untuk di-index ulang setelah transaksi commit. Banyak perubahan
+    PIC dalam satu transaksi cukup memicu satu kali index_leads().
+    """
+    if not hasattr(_pending, 'ids'):
+        _pending.ids = set()
+    _pending.ids.add(lead_id)
+    transaction.on_commit(flush_reindex)
+
+
+def flush_reindex():
+    ids = getattr(_pending, 'ids', None)
+    if ids:
+        _pending.ids = set()
+        index_leads(ids)
+
+
+# ==========================================
+# QUERY
+# ==========================================
+
+def tokenize(query):
+    return re.findall(r'\w+', query.lower())
+
+
+def search_lead_ids(query, limit=20):
+    """Return list lead_id terurut relevansi (prefix match, fuzzy di PostgreSQL)."""
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+
+    if connection.vendor == 'postgresql':
+        sql = """
+            SELECT lead_id FROM (
+                SELECT lead_id,
+                       ts_rank(search_vector, to_tsquery('simple', %(tsquery)s))
+                       + word_similarity(%(text)s, document) AS score
+                FROM lead_search
+                WHERE search_vector @@ to_tsquery('simple', %(tsquery)s)
+                   OR %(text)s <%% document
+            ) ranked
+            WHERE score > 0
+            ORDER BY score DESC, lead_id
+            LIMIT %(limit)s
+        """
+        params = {
+            'tsquery': ' & '.join(f'{token}:*' for token in tokens),
+            'text': ' '.join(tokens),
+            'limit': limit,
+        }
+        with connection.cursor() as cursor:
+            cursor.execute(f"SET pg_trgm.word_similarity_threshold = {TRIGRAM_THRESHOLD}")
+            cursor.execute(sql, params)
+            return [row[0] for row in cursor.fetchall()]
+
+    if connection.vendor == 'sqlite':
+        sql = """
+            SELECT s.lead_id FROM lead_search_fts
+            JOIN lead_search s ON s.rowid = lead_search_fts.rowid
+            WHERE lead_search_fts MATCH %s
+            ORDER BY bm25(lead_search_fts), s.lead_id
+            LIMIT %s
+        """
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [match, limit])
+            return [row[0] for row in cursor.fetchall()]
+
+    queryset = LeadSearchIndex.objects.all()
+    for token in tokens:
+        queryset = queryset.filter(document__icontains=token)
+    return list(queryset.order_by('lead_id').values_list('lead_id', flat=True)[:limit])
@@ -1,5 +1,59 @@
+from django.db import transaction
 from rest_framework import serializers
+from core.cache import bump_generation
+from . import realtime
 from .models import Lead, LeadPIC, FollowUp, Meeting, Quotation, Deal, DealDetail
+from .sync import batch_changes, record_changes, record_set_null
+
+
+def sync_nested(parent, related_name, items, pk_field):
+    """
+    Simpan list child (pics / details) secara diff, dicocokkan lewat id:
+    - id ada & milik parent  -> update (hanya baris yang berubah, 1 bulk UPDATE)
+    - id kosong / asing      -> insert baru (1 bulk INSERT)
+    - child lama tidak dikirim -> delete (1 DELETE)
+    Child yang tidak berubah tidak disentuh, jadi primary key tetap dan
+    relasi seperti Deal.pic_lead tidak ikut ter-reset.
+    """
+    manager = getattr(parent, related_name)
+    model = manager.model
+    fk_name = manager.field.name
+    existing = {obj.pk: obj for obj in manager.all()}
+    auto_now_fields = [f for f in model._meta.concrete_fields if getattr(f, 'auto_now', False)]
+
+    to_create, to_update, update_fields, keep = [], [], set(), set()
+    for item in items:
+        item = dict(item)
+        pk = item.pop(pk_field, None)
+        obj = existing.get(pk)
+        if obj is None or pk in keep:
+            to_create.append(model(**{fk_name: parent}, **item))
+            continue
+
+        keep.add(pk)
+        changed = [field for field, value in item.items() if getattr(obj, field) != value]
+        if changed:
+            for field in changed:
+                setattr(obj, field, item[field])
+            for field in auto_now_fields:
+                field.pre_save(obj, add=False)
+                changed.append(field.name)
+            update_fields.update(changed)
+            to_update.append(obj)
+
+    to_delete = [pk for pk in existing if pk not in keep]
+    if to_delete:
+        record_set_null(model, to_delete)
+        with batch_changes():
+            model.objects.filter(pk__in=to_delete).delete()
+    if to_update:
+        model.objects.bulk_update(to_update, sorted(update_fields))
+    if to_create:
+        model.objects.bulk_create(to_create)
+    if to_update or to_create:
+        # bulk_update / bulk_create tidak memicu signal (cache & delta sync)
+        bump_generation(model)
+        record_changes(model, [obj.pk for obj in to_update + to_create])
 
 class LeadPICSerializer(serializers.ModelSerializer):
     id = serializers.IntegerField(required=False) # Agar update bisa terima ID 
@@ -21,15 +75,21 @@ class LeadSerializer(serializers.ModelSerializer):
             'referral_or_affiliate_by', 'commission_amount'
         ]
 
+    @transaction.atomic
     def create(self, validated_data):
         pics_data = validated_data.pop('pics', [])
         lead = Lead.objects.create(**validated_data)
-        
+
         for pic_data in pics_data:
             if 'id' in pic_data: del pic_data['id']
-            LeadPIC.objects.create(lead=lead, **pic_data)
+        pics = LeadPIC.objects.bulk_create([LeadPIC(lead=lead, **pic_data) for pic_data in pics_data])
+        if pics:
+            # bulk_create tidak memicu signal (cache & delta sync)
+            bump_generation(LeadPIC)
+            record_changes(LeadPIC, [pic.pk for pic in pics])
         return lead
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         pics_data = validated_data.pop('pics', None)
         
@@ -38,10 +98,7 @@ class LeadSerializer(serializers.ModelSerializer):
         instance.save()
 
         if pics_data is not None:
-            instance.pics.all().delete()
-            for pic_data in pics_data:
-                if 'id' in pic_data: del pic_data['id']
-                LeadPIC.objects.create(lead=instance, **pic_data)
+            sync_nested(instance, 'pics', pics_data, 'id')
 
         return instance
 
@@ -69,6 +126,8 @@ class QuotationSerializer(serializers.ModelSerializer):
 # ==========================================
 
 class DealDetailSerializer(serializers.ModelSerializer):
+    deal_detail_id = serializers.CharField(required=False) # Agar update bisa terima ID
+
     class Meta:
         model = DealDetail
         fields = '__all__'
@@ -89,6 +148,7 @@ class DealSerializer(serializers.ModelSerializer):
         model = Deal
         fields = '__all__'
 
+    @transaction.atomic
     def create(self, validated_data):
         # 1. Ambil data details (array) dari payload
         details_data = validated_data.pop('details')
@@ -96,12 +156,18 @@ class DealSerializer(serializers.ModelSerializer):
         # 2. Buat Header Deal
         deal = Deal.objects.create(**validated_data)
         
-        # 3. Buat Detail Deal satu per satu
+        # 3. Buat semua Detail Deal dalam 1 INSERT
         for detail_data in details_data:
-            DealDetail.objects.create(deal=deal, **detail_data)
+            detail_data.pop('deal_detail_id', None)
+        details = DealDetail.objects.bulk_create([DealDetail(deal=deal, **detail_data) for detail_data in details_data])
+        if details:
+            # bulk_create tidak memicu signal (cache & delta sync)
+            bump_generation(DealDetail)
+            record_changes(DealDetail, [detail.pk for detail in details])
             
         return deal
     
+    @transaction.atomic
     def update(self, instance, validated_data):
         details_data = validated_data.pop('details', None)
         
@@ -110,10 +176,35 @@ class DealSerializer(serializers.ModelSerializer):
             setattr(instance, attr, value)
         instance.save()
 
-        # 2. Update Details (Hapus lama, Timpa baru - paling aman untuk nested list)
+        # 2. Update Details (diff berdasarkan deal_detail_id: insert / update / delete)
         if details_data is not None:
-            instance.details.all().delete()
-            for detail_data in details_data:
-                DealDetail.objects.create(deal=instance, **detail_data)
+            sync_nested(instance, 'details', details_data, 'deal_detail_id')
+        # File tidak ikut di event deal.saved: client ambil ulang barisnya
+        if details_data is not None or realtime.DEAL_FILE_FIELDS & validated_data.keys():
+            realtime.deal_details_changed(instance.pk)
         
-        return instance
\ No newline at end of file
+        return instance
+# ==========================================
+# STAGE TRANSITION SERIALIZERS
+# ==========================================
+
+ACTIVITY_SERIALIZERS = {
+    'followup': FollowUpSerializer,
+    'meeting': MeetingSerializer,
+    'quotation': QuotationSerializer,
+    'deal': DealSerializer,
+}
+
+class LeadTransitionSerializer(serializers.Serializer):
+    status_kanban = serializers.ChoiceField(choices=Lead.STATUS_KANBAN_CHOICES)
+    activity_type = serializers.ChoiceField(choices=list(ACTIVITY_SERIALIZERS), required=False)
+    activity = serializers.DictField(required=False)
+
+    def validate(self, attrs):
+        if 'activity' in attrs and 'activity_type' not in attrs:
+            raise serializers.ValidationError({'activity_type': 'Wajib diisi jika activity dikirim'})
+        return attrs
+
+class LeadBulkTransitionSerializer(serializers.Serializer):
+    lead_ids = serializers.ListField(child=serializers.CharField(), allow_empty=False, max_length=5000)
+    status_kanban = serializers.ChoiceField(choices=Lead.STATUS_KANBAN_CHOICES)
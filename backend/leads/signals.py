@@ -0,0 +1,105 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.cache import invalidate_on_change
+
+from . import realtime
+from .analytics import schedule_refresh
+from .models import Lead, LeadPIC, FollowUp, Meeting, Quotation, Deal, DealDetail
+from .search import schedule_reindex
+from .sync import track_changes
+
+
+# ==========================================
+# SEARCH INDEX
+# ==========================================
+
+@receiver(post_save, sender=Lead)
+def reindex_lead(sender, instance, **kwargs):
+    schedule_reindex(instance.pk)
+
+
+@receiver(post_save, sender=LeadPIC)
+@receiver(post_delete, sender=LeadPIC)
+def reindex_lead_pic(sender, instance, **kwargs):
+    schedule_reindex(instance.lead_id)
+
+
+# ==========================================
+# SUMMARY TABLES (ANALYTICS)
+# ==========================================
+
+@receiver(post_save, sender=Lead)
+@receiver(post_delete, sender=Lead)
+def refresh_lead_summary(sender, instance, **kwargs):
+    schedule_refresh(lead_ids=[instance.pk])
+
+
+@receiver(post_save, sender=Deal)
+@receiver(post_delete, sender=Deal)
+def refresh_deal_summary(sender, instance, **kwargs):
+    schedule_refresh(deal_ids=[instance.pk])
+
+
+@receiver(post_save, sender=DealDetail)
+@receiver(post_delete, sender=DealDetail)
+def refresh_deal_detail_summary(sender, instance, **kwargs):
+    schedule_refresh(deal_ids=[instance.deal_id])
+
+
+# ==========================================
+# RESPONSE CACHE (core/cache.py)
+# ==========================================
+
+invalidate_on_change(Lead, LeadPIC, FollowUp, Meeting, Quotation, Deal, DealDetail)
+
+
+# ==========================================
+# DELTA SYNC (ChangeLog + tombstone)
+# ==========================================
+
+track_changes()
+
+
+# ==========================================
+# REAL-TIME (WebSocket, core/realtime.py)
+# ==========================================
+
+@receiver(post_save, sender=Lead)
+def broadcast_lead(sender, instance, created, **kwargs):
+    realtime.lead_saved(instance, created)
+
+
+@receiver(post_delete, sender=Lead)
+def broadcast_lead_delete(sender, instance, **kwargs):
+    realtime.lead_deleted(instance.pk)
+
+
+@receiver(post_save, sender=Deal)
+def broadcast_deal(sender, instance, created, **kwargs):
+    realtime.deal_saved(instance, created)
+
+
+@receiver(post_delete, sender=Deal)
+def broadcast_deal_delete(sender, instance, **kwargs):
+    realtime.deal_deleted(instance.pk)
+
+
+@receiver(post_save, sender=DealDetail)
+@receiver(post_delete, sender=DealDetail)
+def broadcast_deal_detail(sender, instance, **kwargs):
+    realtime.deal_details_changed(instance.deal_id)
+
+
+@receiver(post_save, sender=FollowUp)
+@receiver(post_save, sender=Meeting)
+@receiver(post_save, sender=Quotation)
+def broadcast_activity(sender, instance, **kwargs):
+    realtime.activity_changed(instance)
+
+
+@receiver(post_delete, sender=FollowUp)
+@receiver(post_delete, sender=Meeting)
+@receiver(post_delete, sender=Quotation)
+def broadcast_activity_delete(sender, instance, **kwargs):
+    realtime.activity_changed(instance, deleted=True)
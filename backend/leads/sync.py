@@ -0,0 +1,261 @@
+"""
+Delta sync: client menyimpan replika lokal dan hanya mengambil perubahan
+sejak cursor terakhir (GET /api/sync/?cursor=...).
+
+Setiap save / delete Lead, LeadPIC, FollowUp, Meeting, Quotation, Deal,
+DealDetail dan Activity dicatat di ChangeLog (seq monoton + changed_at),
+termasuk tombstone untuk hard delete dan cascade delete dari Lead. Jalur bulk
+yang tidak memicu signal memanggil record_changes() langsung.
+
+Cursor berisi seq terakhir yang sudah dikirim + batas waktu. Transaksi yang
+mendapat seq lebih kecil tapi commit belakangan tetap terkirim di request
+berikutnya selama durasinya di bawah SYNC_COMMIT_WINDOW (perubahan di jendela
+itu bisa terkirim dua kali; upsert / delete di client harus idempotent).
+
+Retensi: compact_changes() (command prune_changelog, jadwalkan harian) menghapus
+entri yang lebih tua dari SYNC_RETENTION kalau sudah ada entri lebih baru untuk
+baris yang sama, dan tombstone lama. Sync dari awal tetap menghasilkan replika
+penuh; cursor yang lebih tua dari compaction terakhir dijawab 410
+(full_resync_required) dan client harus sync ulang tanpa cursor.
+"""
+import base64
+import json
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.db import models, transaction
+from django.db.models import Exists, Max, Min, OuterRef, Q
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import serializers, status
+from rest_framework.exceptions import APIException
+
+from activities.models import Activity
+from .models import ChangeLog, ChangeLogCompaction, Lead, LeadPIC, FollowUp, Meeting, Quotation, Deal, DealDetail
+
+SYNC_PAGE_SIZE = 500
+SYNC_COMMIT_WINDOW = timedelta(seconds=10)
+SYNC_RETENTION = timedelta(days=30)
+COMPACT_BATCH_SIZE = 10000
+
+# Nama resource di payload sync -> model
+SYNC_RESOURCES = OrderedDict([
+    ('leads', Lead),
+    ('lead_pics', LeadPIC),
+    ('followups', FollowUp),
+    ('meetings', Meeting),
+    ('quotations', Quotation),
+    ('deals', Deal),
+    ('deal_details', DealDetail),
+    ('activities', Activity),
+])
+RESOURCE_NAMES = {model: name for name, model in SYNC_RESOURCES.items()}
+
+_buffer = threading.local()
+
+
+class FullResyncRequired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = 'Cursor sudah melewati retensi ChangeLog, sync ulang tanpa cursor.'
+    default_code = 'full_resync_required'
+
+
+def _flat_serializer(model):
+    # Satu baris = satu tabel (FK sebagai id), relasi disinkronkan sebagai resource sendiri
+    meta = type('Meta', (), {'model': model, 'fields': '__all__'})
+    return type(f'{model.__name__}SyncSerializer', (serializers.ModelSerializer,), {'Meta': meta})
+
+
+SYNC_SERIALIZERS = {name: _flat_serializer(model) for name, model in SYNC_RESOURCES.items()}
+
+
+# ==========================================
+# RECORDING
+# ==========================================
+
+def record_changes(model, object_ids, deleted=False):
+    """Catat perubahan banyak baris sekaligus (1 INSERT)."""
+    resource = RESOURCE_NAMES[model]
+    now = timezone.now()
+    entries = [
+        ChangeLog(resource=resource, object_id=str(object_id), deleted=deleted, changed_at=now)
+        for object_id in object_ids
+    ]
+    pending = getattr(_buffer, 'entries', None)
+    if pending is not None:
+        pending.extend(entries)
+    elif entries:
+        ChangeLog.objects.bulk_create(entries, batch_size=1000)
+
+
+@contextmanager
+def batch_changes():
+    """
+    Kumpulkan ChangeLog dari signal per baris (misal QuerySet.delete / cascade)
+    lalu tulis dengan satu bulk INSERT di akhir blok.
+    """
+    if getattr(_buffer, 'entries', None) is not None:
+        yield
+        return
+    _buffer.entries = []
+    try:
+        yield
+        entries = _buffer.entries
+    finally:
+        _buffer.entries = None
+    if entries:
+        ChangeLog.objects.bulk_create(entries, batch_size=1000)
+
+
+def record_set_null(model, object_ids):
+    """
+    Catat baris model lain yang FK-nya akan di-SET_NULL saat object_ids dihapus
+    (misal Deal.pic_lead saat LeadPIC dihapus) - UPDATE itu tidak memicu signal.
+    Dipanggil sebelum delete.
+    """
+    for relation in model._meta.related_objects:
+        if relation.on_delete is models.SET_NULL and relation.related_model in RESOURCE_NAMES:
+            related_ids = relation.related_model.objects.filter(
+                **{f'{relation.field.name}__in': object_ids}
+            ).values_list('pk', flat=True)
+            record_changes(relation.related_model, list(related_ids))
+
+
+def _record_save(sender, instance, **kwargs):
+    record_changes(sender, [instance.pk])
+
+
+def _record_delete(sender, instance, **kwargs):
+    record_changes(sender, [instance.pk], deleted=True)
+
+
+def track_changes():
+    for model in SYNC_RESOURCES.values():
+        uid = f'sync:{model._meta.label}'
+        post_save.connect(_record_save, sender=model, dispatch_uid=uid)
+        post_delete.connect(_record_delete, sender=model, dispatch_uid=uid)
+
+
+# ==========================================
+# CURSOR
+# ==========================================
+
+def encode_cursor(seq, horizon):
+    payload = {'s': seq, 't': horizon.isoformat() if horizon else None}
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(encoded):
+    """Return (seq, horizon); raise exception kalau cursor rusak."""
+    padded = encoded + '=' * (-len(encoded) % 4)
+    payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    seq = int(payload['s'])
+    horizon = parse_datetime(payload['t']) if payload.get('t') else None
+    if seq < 0 or (payload.get('t') and horizon is None):
+        raise ValueError('invalid cursor')
+    return seq, horizon
+
+
+# ==========================================
+# RETENSI
+# ==========================================
+
+def compacted_seq():
+    """seq tertinggi yang sudah di-compact (0 kalau belum pernah)."""
+    return ChangeLogCompaction.objects.aggregate(seq=Max('compacted_seq'))['seq'] or 0
+
+
+def compact_changes(before=None, batch_size=COMPACT_BATCH_SIZE):
+    """
+    Hapus entri ChangeLog dengan changed_at < before (default: now - SYNC_RETENTION)
+    yang sudah digantikan entri lebih baru untuk baris yang sama, plus tombstone
+    lama. Entri terakhir baris yang masih ada tetap disimpan, jadi replay dari
+    seq 0 tetap lengkap. Return jumlah entri yang dihapus.
+    """
+    before = before or timezone.now() - SYNC_RETENTION
+    upto = ChangeLog.objects.filter(changed_at__lt=before).aggregate(seq=Max('seq'))['seq']
+    if upto is None or upto <= compacted_seq():
+        return 0
+    # Watermark dicatat dulu: cursor <= upto langsung ditolak selama penghapusan berjalan
+    compaction = ChangeLogCompaction.objects.create(compacted_seq=upto)
+
+    newer = ChangeLog.objects.filter(
+        resource=OuterRef('resource'), object_id=OuterRef('object_id'), seq__gt=OuterRef('seq'),
+    )
+    start = ChangeLog.objects.aggregate(seq=Min('seq'))['seq'] - 1
+    total = 0
+    while start < upto:
+        end = min(start + batch_size, upto)
+        with transaction.atomic():
+            total += ChangeLog.objects.filter(seq__gt=start, seq__lte=end).filter(
+                Q(deleted=True) | Exists(newer)
+            ).delete()[0]
+        start = end
+
+    compaction.deleted_count = total
+    compaction.save(update_fields=['deleted_count'])
+    return total
+
+
+# ==========================================
+# QUERY
+# ==========================================
+
+def get_changes(cursor=None, page_size=SYNC_PAGE_SIZE, context=None):
+    """
+    Return dict: cursor baru, has_more, baris yang berubah per resource
+    (`changes`) dan id yang dihapus per resource (`deleted`).
+    """
+    seq, horizon = cursor or (0, None)
+    now = timezone.now()
+    if cursor is not None and seq < compacted_seq():
+        # Tombstone / perubahan setelah cursor mungkin sudah di-compact
+        raise FullResyncRequired()
+
+    fields = ('seq', 'resource', 'object_id', 'deleted')
+    entries = list(
+        ChangeLog.objects.filter(seq__gt=seq).order_by('seq').values_list(*fields)[:page_size + 1]
+    )
+    has_more = len(entries) > page_size
+    entries = entries[:page_size]
+    if horizon is not None:
+        # Perubahan dengan seq lama yang baru commit setelah sync sebelumnya
+        late = ChangeLog.objects.filter(seq__lte=seq, changed_at__gte=horizon).order_by('seq')
+        entries = list(late.values_list(*fields)) + entries
+
+    # Beberapa perubahan pada baris yang sama cukup dikirim sekali (status terakhir)
+    latest = OrderedDict()
+    for entry_seq, resource, object_id, deleted in entries:
+        latest.pop((resource, object_id), None)
+        latest[(resource, object_id)] = deleted
+
+    upserts = {name: [] for name in SYNC_RESOURCES}
+    deleted = {name: [] for name in SYNC_RESOURCES}
+    for (resource, object_id), is_deleted in latest.items():
+        if resource in SYNC_RESOURCES:
+            (deleted if is_deleted else upserts)[resource].append(object_id)
+
+    changes = {}
+    for name, model in SYNC_RESOURCES.items():
+        ids = upserts[name]
+        if not ids:
+            changes[name] = []
+            continue
+        pk_field = model._meta.pk
+        rows = {str(obj.pk): obj for obj in model.objects.filter(pk__in=[pk_field.to_python(i) for i in ids])}
+        # Baris yang sudah tidak ada (dihapus setelah halaman ini) dikirim sebagai tombstone
+        deleted[name].extend(object_id for object_id in ids if object_id not in rows)
+        present = [rows[object_id] for object_id in ids if object_id in rows]
+        changes[name] = SYNC_SERIALIZERS[name](present, many=True, context=context or {}).data
+
+    last_seq = max([seq] + [entry[0] for entry in entries])
+    return {
+        'cursor': encode_cursor(last_seq, now - SYNC_COMMIT_WINDOW),
+        'has_more': has_more,
+        'changes': changes,
+        'deleted': deleted,
+    }
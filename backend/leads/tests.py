@@ -1,3 +1,1839 @@
-from django.test import TestCase
+import asyncio
+import csv
+import io
+import json
+import random
+import tempfile
+import re
+import threading
+import time
+from unittest import mock
+from datetime import date, timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.db.models import Count
+from django.test import (
+    AsyncClient, AsyncRequestFactory, TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature,
+)
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.authentication import CachedJWTAuthentication, user_cache_key
+from core.ids import id_timestamp, new_id, new_ids
+from core.renderers import ORJSONRenderer
+from core.realtime import CLOSE_UNAUTHORIZED, websocket_application
+
+from . import geo, geocoding, realtime
+from .analytics import refresh_deals, refresh_leads
+from .importer import import_leads
+from .views import BOARD_COLUMNS, INBOUND, DealViewSet, FollowUpViewSet, LeadViewSet
+from .models import (
+    Lead, LeadPIC, FollowUp, Meeting, Quotation, Deal, DealDetail, GeocodeCache,
+    DealRevenue, LeadCommission, RevenueLine, ChangeLog,
+)
+from .revenue import billing_months, parse_amount, split_amount
+from .serializers import DealSerializer
+from .sync import compact_changes
+
+
+def make_lead(**kwargs):
+    data = {
+        'property': 'Hotel',
+        'source': 'Website',
+        'gp_pic': 'EKA',
+        'date_in': date(2026, 1, 1),
+    }
+    data.update(kwargs)
+    return Lead.objects.create(**data)
+
+
+def make_deal(lead, details=2, **kwargs):
+    pic = LeadPIC.objects.create(lead=lead, pic_name='Budi', phone_number='0812')
+    deal = Deal.objects.create(lead=lead, deal_type='New Deal', pic_lead=pic, **kwargs)
+    for i in range(details):
+        DealDetail.objects.create(
+            deal=deal, package='Basic', product='PMS, Channel Manager',
+            product_amount=100, product_amount_by='Month', initiation='Training',
+        )
+    return deal
+
+
+class APITestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='tester', password='secret-pass')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+
+class KeysetPaginationTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(7):
+            make_lead(property=f'Hotel {i}')
+
+    def test_unpaginated_compat_mode_returns_plain_list(self):
+        response = self.client.get('/api/leads/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 7)
+
+    @override_settings(API_UNPAGINATED_COMPAT=False)
+    def test_default_page_when_compat_disabled(self):
+        response = self.client.get('/api/leads/')
+        self.assertIn('results', response.data)
+
+    def test_walks_all_pages_without_duplicates(self):
+        seen = []
+        url = '/api/leads/?page_size=3'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['results']), 3)
+            seen.extend(row['lead_id'] for row in response.data['results'])
+            url = response.data['next']
+
+        expected = list(
+            Lead.objects.order_by('-created_at', '-lead_id').values_list('lead_id', flat=True)
+        )
+        self.assertEqual(seen, expected)
+
+    def test_concurrent_insert_does_not_shift_next_page(self):
+        first = self.client.get('/api/leads/?page_size=3')
+        make_lead(property='Inserted later')
+        second = self.client.get(first.data['next'])
+
+        first_ids = {row['lead_id'] for row in first.data['results']}
+        second_ids = [row['lead_id'] for row in second.data['results']]
+        self.assertFalse(first_ids & set(second_ids))
+        self.assertNotIn('Inserted later', [row['property'] for row in second.data['results']])
+
+    def test_previous_link_returns_same_page(self):
+        first = self.client.get('/api/leads/?page_size=3')
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+        self.assertEqual(
+            [row['lead_id'] for row in back.data['results']],
+            [row['lead_id'] for row in first.data['results']],
+        )
+
+    def test_nullable_ordering_pages_across_nulls(self):
+        lead = Lead.objects.first()
+        for i in range(7):
+            make_deal(lead, details=0, paid_date=date(2025, 1, 1 + i % 3) if i % 2 else None)
+
+        for ordering, tie_breaker in [('paid_date', 'deal_id'), ('-paid_date', '-deal_id')]:
+            # NULL selalu di akhir, di kedua arah
+            expected = [
+                *Deal.objects.filter(paid_date__isnull=False).order_by(ordering, tie_breaker).values_list('pk', flat=True),
+                *Deal.objects.filter(paid_date__isnull=True).order_by(tie_breaker).values_list('pk', flat=True),
+            ]
+            url, seen = f'/api/deals/?ordering={ordering}&page_size=2', []
+            while url:
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                seen.extend(row['deal_id'] for row in response.data['results'])
+                last_page, url = response, response.data['next']
+            self.assertEqual(seen, expected)
+
+            # Halaman terakhir = 1 deal NULL; previous = 2 deal sebelumnya (juga NULL)
+            back = self.client.get(last_page.data['previous'])
+            self.assertEqual([row['deal_id'] for row in back.data['results']], expected[4:6])
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/leads/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 404)
+
+    def test_invalid_page_size_is_400(self):
+        for value in ['abc', '0', '-5']:
+            response = self.client.get(f'/api/leads/?page_size={value}')
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('page_size', response.data)
+
+
+class KanbanBoardTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(5):
+            make_lead(property=f'Inbound {i}', source='Website')
+        for i in range(3):
+            make_lead(property=f'Outbound {i}', source='Cold Call')
+        for i in range(4):
+            make_lead(property=f'FU {i}', status_kanban='follow_up')
+
+    def test_board_counts_and_first_cards(self):
+        response = self.client.get('/api/leads/board/?page_size=2')
+        self.assertEqual(response.status_code, 200)
+
+        columns = {col['key']: col for col in response.data['columns']}
+        self.assertEqual(
+            list(columns),
+            ['lead_generation_inbound', 'lead_generation_outbound', 'follow_up',
+             'quotation', 'deals', 'onboarding', 'retention'],
+        )
+        self.assertEqual(columns['lead_generation_inbound']['count'], 5)
+        self.assertEqual(columns['lead_generation_outbound']['count'], 3)
+        self.assertEqual(columns['follow_up']['count'], 4)
+        self.assertEqual(columns['deals']['count'], 0)
+        self.assertEqual(len(columns['follow_up']['results']), 2)
+        self.assertIsNone(columns['deals']['next'])
+
+    def test_board_query_count_is_independent_of_lead_volume(self):
+        for status in ['quotation', 'deals', 'onboarding', 'retention']:
+            make_lead(status_kanban=status)
+        # 1 count + (cards + pics) per kolom
+        with self.assertNumQueries(15):
+            self.client.get('/api/leads/board/?page_size=2')
+        for i in range(20):
+            make_lead(property=f'More {i}', status_kanban='quotation')
+        with self.assertNumQueries(15):
+            self.client.get('/api/leads/board/?page_size=2')
+
+    def test_column_pages_follow_next_link(self):
+        board = self.client.get('/api/leads/board/?page_size=2')
+        inbound = next(c for c in board.data['columns'] if c['key'] == 'lead_generation_inbound')
+        seen = [row['lead_id'] for row in inbound['results']]
+
+        url = inbound['next']
+        self.assertIn('/api/leads/board/lead_generation_inbound/', url)
+        while url:
+            response = self.client.get(url)
+            seen.extend(row['lead_id'] for row in response.data['results'])
+            url = response.data['next']
+
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(len(set(seen)), 5)
+
+    def test_unknown_column(self):
+        response = self.client.get('/api/leads/board/unknown/')
+        self.assertEqual(response.status_code, 404)
+
+
+class QueryCountTests(APITestCase):
+    """Jumlah query list/detail tidak boleh naik seiring jumlah baris (N+1)."""
+
+    def seed(self, count):
+        for i in range(count):
+            lead = make_lead(property=f'Hotel {i}')
+            LeadPIC.objects.create(lead=lead, pic_name=f'PIC {i}')
+            make_deal(lead)
+
+    def assertConstantQueries(self, url, expected):
+        self.seed(3)
+        with self.assertNumQueries(expected):
+            self.assertEqual(self.client.get(url).status_code, 200)
+        self.seed(30)
+        with self.assertNumQueries(expected):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+    # +1 query di setiap request: validator ETag (COUNT + MAX(edited_at)), cache LocMem
+    def test_lead_list(self):
+        # leads + pics
+        self.assertConstantQueries('/api/leads/', 3)
+
+    def test_lead_list_paginated(self):
+        self.assertConstantQueries('/api/leads/?page_size=20', 3)
+
+    def test_deal_list(self):
+        # deals JOIN lead, pic_lead + details
+        self.assertConstantQueries('/api/deals/', 3)
+
+    def test_deal_list_paginated(self):
+        self.assertConstantQueries('/api/deals/?page_size=20', 3)
+
+    @override_settings(API_CACHE_SHARED=True)
+    def test_list_with_shared_cache_skips_validator_query(self):
+        # ETag list dari generation counter cache bersama
+        self.assertConstantQueries('/api/leads/', 2)
+        self.assertConstantQueries('/api/deals/', 2)
+
+    def test_lead_detail(self):
+        lead = make_lead()
+        for i in range(10):
+            LeadPIC.objects.create(lead=lead, pic_name=f'PIC {i}')
+        with self.assertNumQueries(3):
+            self.client.get(f'/api/leads/{lead.lead_id}/')
+
+    def test_deal_detail(self):
+        deal = make_deal(make_lead(), details=10)
+        with self.assertNumQueries(3):
+            response = self.client.get(f'/api/deals/{deal.deal_id}/')
+        self.assertEqual(response.data['lead_property'], 'Hotel')
+        self.assertEqual(response.data['pic_lead_name'], 'Budi')
+        self.assertEqual(len(response.data['details']), 10)
+
+
+class ActivityFilterTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.lead = make_lead()
+        self.other = make_lead(property='Other')
+        for lead, day, pic in [
+            (self.lead, 1, 'EKA'), (self.lead, 5, 'SURYA'),
+            (self.lead, 9, 'EKA'), (self.other, 5, 'EKA'),
+        ]:
+            FollowUp.objects.create(
+                lead=lead, pic_gp=pic, pic_lead='Budi', date=date(2026, 2, day),
+                start_time='09:00', end_time='10:00', fu_type='Call', notes='-',
+            )
+            Quotation.objects.create(lead=lead, pic_gp=pic, date=date(2026, 2, day))
+
+    def test_filter_by_lead_ordered_by_date(self):
+        response = self.client.get('/api/followups/', {'lead': self.lead.lead_id})
+        self.assertEqual([row['date'] for row in response.data], ['2026-02-09', '2026-02-05', '2026-02-01'])
+
+    def test_filter_by_date_range_and_pic(self):
+        response = self.client.get('/api/quotations/', {
+            'lead': self.lead.lead_id, 'pic_gp': 'EKA',
+            'date_from': '2026-02-02', 'date_to': '2026-02-28',
+        })
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]['date'], '2026-02-09')
+
+    def test_invalid_date(self):
+        response = self.client.get('/api/meetings/', {'date_from': '09-02-2026'})
+        self.assertEqual(response.status_code, 400)
+
+
+class FilterBackendTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        make_lead(property='A', source='Website', type='Hotel', date_in=date(2026, 1, 3))
+        make_lead(property='B', source='Referral', type='Villa', date_in=date(2026, 1, 1))
+        make_lead(property='C', source='Cold Call', type='Villa', date_in=date(2026, 1, 2))
+
+    def test_filter_and_whitelisted_ordering(self):
+        response = self.client.get('/api/leads/', {
+            'source__in': 'Website,Referral', 'ordering': 'date_in',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['property'] for row in response.data], ['B', 'A'])
+
+        response = self.client.get('/api/leads/', {'type': 'Villa', 'date_in__gte': '2026-01-02'})
+        self.assertEqual([row['property'] for row in response.data], ['C'])
+
+    def test_rejects_unindexed_field_and_ordering(self):
+        response = self.client.get('/api/leads/', {'property': 'A'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('property', response.data)
+
+        response = self.client.get('/api/leads/', {'source__icontains': 'web'})
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get('/api/leads/', {'ordering': 'property'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_deal_date_range_requires_lead(self):
+        lead = make_lead()
+        make_deal(lead, details=0, date=date(2026, 3, 1), is_paid=False)
+        params = {'date__gte': '2026-02-01'}
+
+        response = self.client.get('/api/deals/', params)
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get('/api/deals/', {**params, 'lead': lead.lead_id})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 1)
+
+        response = self.client.get('/api/deals/', {'is_paid': 'false'})
+        self.assertEqual(len(response.data), 1)
+        response = self.client.get('/api/deals/', {'is_paid': 'true'})
+        self.assertEqual(len(response.data), 0)
+
+    def test_activity_status_filter(self):
+        from activities.models import Activity
+        Activity.objects.create(title='A', date=date(2026, 1, 1), status='pending')
+        Activity.objects.create(title='B', date=date(2026, 1, 2), status='completed')
+
+        response = self.client.get('/api/activities/', {'status': 'completed'})
+        self.assertEqual([row['title'] for row in response.data], ['B'])
+        response = self.client.get('/api/activities/', {'title': 'A'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_every_whitelisted_field_is_index_supported(self):
+        from core.filters import IndexedFilterBackend
+        from core.urls import router
+
+        backend = IndexedFilterBackend()
+        for prefix, viewset, basename in router.registry:
+            if getattr(viewset, 'filter_fields', None) is None:
+                continue
+            model = viewset.queryset.model
+            ordering = list(viewset.queryset.query.order_by)
+            for name, lookups in viewset.filter_fields.items():
+                for lookup in lookups:
+                    if name == 'date' and model is Deal and lookup != 'exact':
+                        continue  # sengaja wajib bersama ?lead=
+                    with self.subTest(basename=basename, field=name, lookup=lookup):
+                        self.assertTrue(backend.is_index_supported(model, [(name, lookup, None)], ordering))
+            for name in viewset.ordering_fields:
+                with self.subTest(basename=basename, ordering=name):
+                    self.assertTrue(backend.is_index_supported(model, [], [name]))
+
+
+class TimelineTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.lead = make_lead()
+        for day in [3, 10, 10, 20]:
+            FollowUp.objects.create(
+                lead=self.lead, pic_gp='EKA', pic_lead='Budi', date=date(2026, 3, day),
+                start_time='09:00', end_time='10:00', fu_type='Call', notes='-',
+            )
+        for day in [10, 15]:
+            Meeting.objects.create(
+                lead=self.lead, pic_gp='EKA', pic_lead='Budi', date=date(2026, 3, day),
+                start_time='09:00', end_time='10:00', meeting_type='Online', mom='-',
+            )
+        Quotation.objects.create(lead=self.lead, pic_gp='EKA', date=date(2026, 3, 12))
+        make_deal(self.lead)
+        # Aktivitas lead lain tidak boleh ikut
+        Quotation.objects.create(lead=make_lead(property='Other'), pic_gp='EKA', date=date(2026, 3, 12))
+
+    def walk(self, page_size):
+        rows = []
+        url = f'/api/leads/{self.lead.lead_id}/timeline/?page_size={page_size}'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            rows.extend(response.data['results'])
+            url = response.data['next']
+        return rows
+
+    def test_merged_stream_is_date_ordered(self):
+        rows = self.walk(page_size=100)
+        self.assertEqual(len(rows), 8)
+        self.assertEqual(rows[0]['type'], 'deal')
+        dates = [row['date'] for row in rows]
+        self.assertEqual(dates, sorted(dates, reverse=True))
+        self.assertEqual(
+            [row['type'] for row in rows if row['date'] == date(2026, 3, 10)],
+            ['meeting', 'followup', 'followup'],
+        )
+
+    def test_pages_cover_stream_without_duplicates(self):
+        full = [(row['type'], row['id']) for row in self.walk(page_size=100)]
+        for page_size in [1, 2, 3]:
+            self.assertEqual([(row['type'], row['id']) for row in self.walk(page_size)], full)
+
+    def test_compact_payload(self):
+        rows = self.walk(page_size=100)
+        quotation = next(row for row in rows if row['type'] == 'quotation')
+        self.assertEqual(set(quotation), {'type', 'id', 'date', 'pic_gp', 'link_quotation', 'is_send'})
+
+    def test_query_count(self):
+        with self.assertNumQueries(5):
+            self.client.get(f'/api/leads/{self.lead.lead_id}/timeline/?page_size=3')
+
+    def test_unknown_lead_and_bad_cursor(self):
+        self.assertEqual(self.client.get('/api/leads/L-NOPE/timeline/').status_code, 404)
+        response = self.client.get(f'/api/leads/{self.lead.lead_id}/timeline/?cursor=abc')
+        self.assertEqual(response.status_code, 404)
+
+
+class LeadImportTests(APITestCase):
+    CSV = (
+        'Property,Source,Type,GP PIC,Date In,PIC Name,Phone Number,Email\n'
+        'Hotel A,Website,Hotel,EKA,2026-01-05,Budi,0812,budi@example.com\n'
+        ',Website,Hotel,EKA,2026-01-05,,,\n'
+        'Villa B,Referral,Villa,SURYA,05/01/2026,,,\n'
+        'Villa C,Referral,Villa,SURYA,2026-01-07,Ani,,not-an-email\n'
+        'Villa D,Cold Call,Villa,,2026-01-08,,,\n'
+    )
+
+    def test_upload_reports_row_errors_without_aborting(self):
+        upload = SimpleUploadedFile('leads.csv', self.CSV.encode(), content_type='text/csv')
+        response = self.client.post('/api/leads/import/', {'file': upload, 'gp_pic': 'WIRA'}, format='multipart')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total'], 5)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual([err['row'] for err in response.data['errors']], [3, 4, 5])
+        self.assertIn('property', response.data['errors'][0]['errors'])
+
+        hotel = Lead.objects.get(property='Hotel A')
+        self.assertEqual(hotel.pics.get().email, 'budi@example.com')
+        self.assertEqual(Lead.objects.get(property='Villa D').gp_pic, 'WIRA')
+
+    def test_chunked_writes_use_constant_queries(self):
+        rows = ''.join(f'Hotel {i},Website,Hotel,EKA,2026-01-05,PIC {i},,\n' for i in range(60))
+        data = 'property,source,type,gp_pic,date_in,pic_name,phone_number,email\n' + rows
+        # per chunk: savepoint + insert lead + insert pic + index pencarian (3)
+        # + summary analytics (6) + komisi revenue (2) + change log lead & pic (3)
+        # + release; chunk pertama juga INSERT baris summary (3)
+        with self.assertNumQueries(3 * 18 + 3):
+            report = import_leads(io.BytesIO(data.encode()), 'leads.csv', chunk_size=20)
+        self.assertEqual(report['created'], 60)
+        self.assertEqual(LeadPIC.objects.count(), 60)
+
+    def test_failed_chunk_reports_only_failing_rows(self):
+        existing = make_lead(property='Existing')
+        rows = ''.join(f'Hotel {i},Website,Hotel,EKA,2026-01-05,PIC {i},,\n' for i in range(4))
+        data = 'property,source,type,gp_pic,date_in,pic_name,phone_number,email\n' + rows
+        # Baris ke-3 (baris file 4) mendapat lead_id yang sudah dipakai -> IntegrityError
+        ids = ['L-IMPORT-1', 'L-IMPORT-2', existing.lead_id, 'L-IMPORT-4']
+        with mock.patch('leads.importer.generate_lead_ids', return_value=ids):
+            report = import_leads(io.BytesIO(data.encode()), 'leads.csv', chunk_size=10)
+
+        self.assertEqual(report['created'], 3)
+        self.assertEqual(report['failed'], 1)
+        self.assertEqual([error['row'] for error in report['errors']], [4])
+        self.assertEqual(
+            set(Lead.objects.filter(property__startswith='Hotel').values_list('lead_id', flat=True)),
+            {'L-IMPORT-1', 'L-IMPORT-2', 'L-IMPORT-4'},
+        )
+        self.assertEqual(LeadPIC.objects.filter(lead_id='L-IMPORT-4').count(), 1)
+        self.assertFalse(LeadPIC.objects.filter(lead_id=existing.lead_id).exists())
+
+    def test_rejects_unknown_format(self):
+        upload = SimpleUploadedFile('leads.txt', b'x')
+        response = self.client.post('/api/leads/import/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+
+
+class ExportTests(APITestCase):
+    def read_csv(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode()
+        return list(csv.reader(io.StringIO(content)))
+
+    def test_lead_export_flattens_pics(self):
+        lead = make_lead(property='Hotel A')
+        LeadPIC.objects.create(lead=lead, pic_name='Budi')
+        LeadPIC.objects.create(lead=lead, pic_name='Ani')
+        make_lead(property='Hotel B')
+
+        with self.assertNumQueries(1):
+            rows = self.read_csv(self.client.get('/api/leads/export/'))
+        self.assertEqual(rows[0][:2], ['Lead ID', 'Property'])
+        self.assertEqual(len(rows), 4)
+        pic_column = rows[0].index('PIC Name')
+        self.assertEqual(
+            sorted(row[pic_column] for row in rows[1:] if row[1] == 'Hotel A'), ['Ani', 'Budi'],
+        )
+
+    def test_deal_export_one_row_per_detail(self):
+        make_deal(make_lead(), details=3)
+        rows = self.read_csv(self.client.get('/api/deals/export/'))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[1][rows[0].index('PIC Lead')], 'Budi')
+
+    def test_export_honours_list_filters(self):
+        lead, other = make_lead(), make_lead(property='Other')
+        for item in [lead, other]:
+            Quotation.objects.create(lead=item, pic_gp='EKA', date=date(2026, 3, 1))
+        rows = self.read_csv(self.client.get('/api/quotations/export/', {'lead': lead.lead_id}))
+        self.assertEqual([row[1] for row in rows[1:]], [lead.lead_id])
+
+    def test_unknown_format(self):
+        response = self.client.get('/api/leads/export/', {'export_format': 'pdf'})
+        self.assertEqual(response.status_code, 400)
+
+    async def test_asgi_export_streams_async(self):
+        await sync_to_async(make_deal)(await sync_to_async(make_lead)(), details=3)
+        user = await sync_to_async(User.objects.create_user)(username='exporter')
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+
+        response = await AsyncClient().get('/api/deals/export/', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        # Async iterator: handler ASGI tidak menampung seluruh isi dengan list()
+        self.assertTrue(response.is_async)
+        content = b''.join([chunk async for chunk in response.streaming_content]).decode()
+        expected = await sync_to_async(lambda: self.read_csv(self.client.get('/api/deals/export/')))()
+        self.assertEqual(list(csv.reader(io.StringIO(content))), expected)
+
+
+class NestedWriteTests(APITestCase):
+    def lead_payload(self, lead, pics):
+        return {
+            'property': lead.property, 'source': lead.source, 'gp_pic': lead.gp_pic,
+            'date_in': '2026-01-01', 'pics': pics,
+        }
+
+    def test_lead_update_diffs_pics_by_id(self):
+        lead = make_lead()
+        keep = LeadPIC.objects.create(lead=lead, pic_name='Budi')
+        edit = LeadPIC.objects.create(lead=lead, pic_name='Ani')
+        drop = LeadPIC.objects.create(lead=lead, pic_name='Old')
+        deal = Deal.objects.create(lead=lead, deal_type='New Deal', pic_lead=keep)
+
+        response = self.client.put(f'/api/leads/{lead.lead_id}/', self.lead_payload(lead, [
+            {'id': keep.id, 'pic_name': 'Budi'},
+            {'id': edit.id, 'pic_name': 'Ani Baru', 'email': 'ani@example.com'},
+            {'pic_name': 'New'},
+        ]), format='json')
+
+        self.assertEqual(response.status_code, 200)
+        pics = {pic.pic_name: pic for pic in lead.pics.all()}
+        self.assertEqual(set(pics), {'Budi', 'Ani Baru', 'New'})
+        self.assertEqual(pics['Budi'].id, keep.id)
+        self.assertEqual(pics['Ani Baru'].id, edit.id)
+        self.assertFalse(LeadPIC.objects.filter(id=drop.id).exists())
+        deal.refresh_from_db()
+        self.assertEqual(deal.pic_lead_id, keep.id)
+
+    def test_lead_update_query_count_independent_of_pic_count(self):
+        def run(count):
+            lead = make_lead()
+            pics = [LeadPIC.objects.create(lead=lead, pic_name=f'P{i}') for i in range(count * 3)]
+            payload = (
+                [{'id': pic.id, 'pic_name': pic.pic_name + '!'} for pic in pics[:count]]
+                + [{'id': pic.id, 'pic_name': pic.pic_name} for pic in pics[count:count * 2]]
+                + [{'pic_name': f'N{i}'} for i in range(count)]
+            )
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.put(f'/api/leads/{lead.lead_id}/', self.lead_payload(lead, payload), format='json')
+            self.assertEqual(lead.pics.count(), count * 3)
+            return len(ctx)
+
+        self.assertEqual(run(2), run(25))
+
+    def test_deal_update_diffs_details(self):
+        deal = make_deal(make_lead(), details=2)
+        first, second = deal.details.order_by('deal_detail_id')
+        response = self.client.patch(f'/api/deals/{deal.deal_id}/', {'details': [
+            {'deal_detail_id': first.deal_detail_id, 'package': 'Pro', 'product': 'PMS',
+             'product_amount': '250.00', 'product_amount_by': 'Year', 'initiation': 'Training'},
+            {'package': 'Addon', 'product': 'Channel Manager', 'product_amount_by': 'Month',
+             'initiation': '-'},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        details = {d.deal_detail_id: d for d in deal.details.all()}
+        self.assertEqual(len(details), 2)
+        self.assertEqual(details[first.deal_detail_id].package, 'Pro')
+        self.assertNotIn(second.deal_detail_id, details)
+
+    def test_deal_create_inserts_details(self):
+        lead = make_lead()
+        response = self.client.post('/api/deals/', {
+            'lead': lead.lead_id, 'deal_type': 'New Deal',
+            'details': [
+                {'package': 'Basic', 'product': 'PMS', 'product_amount_by': 'Month', 'initiation': '-'}
+                for _ in range(3)
+            ],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data['details']), 3)
+
+
+class TransitionTests(APITestCase):
+    def test_moves_lead_and_creates_deal_atomically(self):
+        lead = make_lead()
+        response = self.client.post(f'/api/leads/{lead.lead_id}/transition/', {
+            'status_kanban': 'deals',
+            'activity_type': 'deal',
+            'activity': {
+                'deal_type': 'New Deal',
+                'details': [{'package': 'Basic', 'product': 'PMS', 'product_amount_by': 'Month', 'initiation': '-'}],
+            },
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['lead']['status_kanban'], 'deals')
+        self.assertEqual(response.data['activity']['lead'], lead.lead_id)
+        self.assertEqual(Deal.objects.get(lead=lead).details.count(), 1)
+
+    def test_invalid_activity_leaves_lead_untouched(self):
+        lead = make_lead()
+        response = self.client.post(f'/api/leads/{lead.lead_id}/transition/', {
+            'status_kanban': 'follow_up',
+            'activity_type': 'followup',
+            'activity': {'pic_gp': 'EKA'},
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('activity', response.data)
+        lead.refresh_from_db()
+        self.assertEqual(lead.status_kanban, 'lead_generation')
+        self.assertFalse(FollowUp.objects.exists())
+
+    def test_stage_only(self):
+        lead = make_lead()
+        response = self.client.post(
+            f'/api/leads/{lead.lead_id}/transition/', {'status_kanban': 'onboarding'}, format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.data['activity'])
+
+    def test_bulk_move_single_update(self):
+        leads = [make_lead(property=f'H{i}') for i in range(5)]
+        ids = [lead.lead_id for lead in leads[:4]]
+        # savepoint + SELECT id + 1 UPDATE + 1 INSERT change log + release
+        with self.assertNumQueries(5):
+            response = self.client.post('/api/leads/transition/', {
+                'lead_ids': ids, 'status_kanban': 'retention',
+            }, format='json')
+        self.assertEqual(response.data['updated'], 4)
+        self.assertEqual(Lead.objects.filter(status_kanban='retention').count(), 4)
+
+    def test_bulk_move_logs_only_existing_leads(self):
+        lead = make_lead()
+        ChangeLog.objects.all().delete()
+        response = self.client.post('/api/leads/transition/', {
+            'lead_ids': [lead.lead_id, 'L-TIDAKADA'], 'status_kanban': 'retention',
+        }, format='json')
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual(list(ChangeLog.objects.values_list('object_id', flat=True)), [lead.lead_id])
+
+    def test_bulk_move_rejects_unknown_stage(self):
+        response = self.client.post('/api/leads/transition/', {
+            'lead_ids': ['L-1'], 'status_kanban': 'lost',
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class QueryPlanTests(TestCase):
+    """
+    EXPLAIN query list & board pada dataset seed; gagal kalau plan tidak
+    memakai index yang dimaksud atau jatuh ke sequential scan (index hilang /
+    query berubah).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(42)
+        statuses = [status for status, _ in Lead.STATUS_KANBAN_CHOICES]
+        leads = [
+            Lead(
+                lead_id=f'L-{i:012d}', property=f'Hotel {i}',
+                source=rng.choice(['Website', 'Referral', 'Cold Call', 'Event']),
+                gp_pic=rng.choice(['EKA', 'SURYA', 'WIRA']),
+                date_in=date(2025, 1, 1) + timedelta(days=i % 365),
+                status_kanban=rng.choice(statuses),
+                coordinates=f'{rng.uniform(-8.9, -8.1):.5f}, {rng.uniform(114.5, 115.7):.5f}',
+            )
+            for i in range(2000)
+        ]
+        # bulk_create tidak memanggil save(): isi lat / lng / geohash sendiri
+        for lead in leads:
+            lead.update_location()
+        leads = Lead.objects.bulk_create(leads)
+        Deal.objects.bulk_create([
+            Deal(
+                lead=lead, deal_type='New Deal',
+                is_paid=rng.random() < 0.8, invoice_issued=rng.random() < 0.7,
+                paid_date=date(2025, 1, 1) + timedelta(days=rng.randrange(365)),
+            )
+            for lead in leads[:1500]
+        ])
+        FollowUp.objects.bulk_create([
+            FollowUp(
+                lead=rng.choice(leads), pic_gp='EKA', pic_lead='-',
+                date=date(2025, 1, 1) + timedelta(days=rng.randrange(365)),
+                start_time='09:00', end_time='10:00', fu_type='Call', notes='-',
+            )
+            for _ in range(3000)
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def assertUsesIndex(self, queryset, *index_names):
+        """
+        Plan harus memakai salah satu index yang dimaksud (nama index, bukan
+        sekadar "bukan seq scan") dan tidak ada tabel yang di-scan penuh.
+        """
+        if connection.vendor == 'postgresql':
+            # Dataset test kecil: tanpa ini planner memilih seq scan walau index ada.
+            # Karena itu yang dicek adalah nama index-nya, bukan hanya tidak adanya Seq Scan
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            plan = queryset.explain()
+            self.assertNotIn('Seq Scan', plan, plan)
+        else:
+            plan = queryset.explain()
+            # SQLite: "SCAN <table>" tanpa "USING ... INDEX" = full table scan
+            self.assertIsNone(re.search(r'\bSCAN \w+\s*$', plan, re.M), plan)
+        self.assertTrue(
+            any(re.search(rf'\b{name}\b', plan) for name in index_names),
+            f'index {", ".join(index_names)} tidak dipakai:\n{plan}',
+        )
+
+    def test_lead_list(self):
+        self.assertUsesIndex(LeadViewSet.queryset[:51], 'lead_created_idx')
+
+    def test_lead_list_filters(self):
+        queryset = LeadViewSet.queryset
+        self.assertUsesIndex(queryset.filter(gp_pic='EKA')[:51], 'lead_gp_pic_created_idx', 'lead_created_idx')
+        self.assertUsesIndex(queryset.filter(source='Website')[:51], 'lead_source_created_idx', 'lead_created_idx')
+        self.assertUsesIndex(
+            queryset.filter(date_in__range=(date(2025, 2, 1), date(2025, 3, 1)))[:51],
+            'lead_date_in_idx', 'lead_created_idx',
+        )
+        self.assertUsesIndex(
+            queryset.filter(status_kanban__in=['lead_generation', 'follow_up', 'quotation'])[:51],
+            'lead_open_pipeline_idx', 'lead_status_created_idx', 'lead_created_idx',
+        )
+
+    def test_board_columns(self):
+        for key, status, label, condition in BOARD_COLUMNS:
+            self.assertUsesIndex(
+                LeadViewSet.queryset.filter(condition)[:21], 'lead_status_created_idx', 'lead_open_pipeline_idx',
+            )
+
+    def test_board_counts(self):
+        self.assertUsesIndex(
+            Lead.objects.order_by().values('status_kanban')
+            .annotate(total=Count('pk'), inbound=Count('pk', filter=INBOUND)),
+            'lead_status_created_idx',
+        )
+
+    def test_deal_list_filters(self):
+        queryset = DealViewSet.queryset
+        self.assertUsesIndex(queryset[:51], 'deal_created_idx')
+        self.assertUsesIndex(queryset.filter(is_paid=False)[:51], 'deal_unpaid_idx')
+        self.assertUsesIndex(queryset.filter(invoice_issued=False)[:51], 'deal_invoice_pending_idx')
+        self.assertUsesIndex(
+            queryset.filter(paid_date__gte=date(2025, 6, 1))[:51], 'deal_paid_date_idx', 'deal_created_idx',
+        )
+
+    def test_activity_by_lead(self):
+        self.assertUsesIndex(FollowUpViewSet.queryset.filter(lead_id='L-000000000001')[:51], 'follow_up_lead_date_idx')
+
+    def test_nearby_uses_geohash_index(self):
+        self.assertUsesIndex(geo.within_radius(Lead.objects.all(), -8.5, 115.2, 5)[:100], 'lead_geohash_idx')
+
+
+class DatasetAndBenchmarkCommandTests(TestCase):
+    def generate(self):
+        call_command('generate_dataset', leads=120, seed=3, batch_size=50, clear=True, stdout=io.StringIO())
+        return sorted(Lead.objects.values_list('lead_id', 'status_kanban'))
+
+    def test_generate_dataset_is_deterministic(self):
+        first = self.generate()
+        self.assertEqual(len(first), 120)
+        self.assertTrue(LeadPIC.objects.exists())
+        self.assertTrue(DealDetail.objects.exists())
+        self.assertEqual(self.generate(), first)
+
+    def test_clear_removes_revenue_rows(self):
+        self.generate()
+        self.assertTrue(DealRevenue.objects.exists())
+        call_command('generate_dataset', leads=40, seed=9, clear=True, stdout=io.StringIO())
+        # Tidak ada baris revenue sisa dataset lama
+        self.assertFalse(DealRevenue.objects.exclude(deal_id__in=Deal.objects.values('pk')).exists())
+        self.assertFalse(RevenueLine.objects.exclude(deal_id__in=Deal.objects.values('pk')).exists())
+        self.assertFalse(LeadCommission.objects.exclude(lead_id__in=Lead.objects.values('pk')).exists())
+
+    def test_benchmark_writes_results_for_router_endpoints(self):
+        call_command('generate_dataset', leads=30, seed=1, stdout=io.StringIO())
+        with tempfile.NamedTemporaryFile(suffix='.json') as output:
+            # Tanpa response cache: cache hit + user dari cache auth = 0 query
+            call_command('benchmark_api', repeat=2, no_cache=True, output=output.name, stdout=io.StringIO())
+            report = json.load(open(output.name))
+
+        names = {result['name'] for result in report['results']}
+        for basename in ['activity', 'lead', 'followup', 'meeting', 'quotation', 'user', 'deal']:
+            self.assertIn(f'{basename}-list', names)
+            self.assertIn(f'{basename}-detail', names)
+        self.assertIn('lead-board', names)
+        for result in report['results']:
+            self.assertEqual(result['status'], 200, result['url'])
+            self.assertGreater(result['queries'], 0)
+            self.assertIn('p99', result['latency_ms'])
+
+
+class LeadSearchTests(APITestCase):
+    def create_lead(self, property, pics):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/leads/', {
+                'property': property, 'source': 'Website', 'gp_pic': 'EKA',
+                'date_in': '2026-01-01', 'address': 'Jl. Raya Ubud', 'pics': pics,
+            }, format='json')
+        return response.data['lead_id']
+
+    def search(self, q):
+        response = self.client.get('/api/leads/search/', {'q': q})
+        self.assertEqual(response.status_code, 200)
+        return [row['lead_id'] for row in response.data['results']]
+
+    def test_prefix_search_over_lead_and_pic_fields(self):
+        villa = self.create_lead('Villa Kembang', [{'pic_name': 'Made Surya', 'phone_number': '081234567', 'email': 'made@kembang.id'}])
+        hotel = self.create_lead('Hotel Kembang Sari', [{'pic_name': 'Ketut'}])
+
+        self.assertEqual(set(self.search('kemb')), {villa, hotel})
+        self.assertEqual(self.search('villa kem'), [villa])
+        self.assertEqual(self.search('0812345'), [villa])
+        self.assertEqual(self.search('made@kembang'), [villa])
+        self.assertEqual(self.search('ketut'), [hotel])
+        self.assertEqual(self.search('tidakada'), [])
+
+    def test_index_follows_updates_and_deletes(self):
+        lead_id = self.create_lead('Villa Kembang', [{'pic_name': 'Made'}])
+        pic_id = LeadPIC.objects.get(lead_id=lead_id).id
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(f'/api/leads/{lead_id}/', {
+                'property': 'Villa Melati', 'gp_pic': 'EKA', 'date_in': '2026-01-01',
+                'pics': [{'id': pic_id, 'pic_name': 'Nyoman'}],
+            }, format='json')
+        self.assertEqual(self.search('melati nyoman'), [lead_id])
+        self.assertEqual(self.search('kembang'), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'/api/leads/{lead_id}/')
+        self.assertEqual(self.search('melati'), [])
+
+    def test_bulk_import_is_indexed(self):
+        data = 'property,gp_pic,date_in,pic_name\nResort Lovina,EKA,2026-01-01,Gede\n'
+        import_leads(io.BytesIO(data.encode()), 'leads.csv')
+        self.assertEqual(len(self.search('lovina gede')), 1)
+
+    def test_query_required(self):
+        self.assertEqual(self.client.get('/api/leads/search/').status_code, 400)
+
+
+class AnalyticsTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        with self.captureOnCommitCallbacks(execute=True):
+            for status, count in [('lead_generation', 4), ('follow_up', 3), ('quotation', 2), ('deals', 1)]:
+                for i in range(count):
+                    make_lead(status_kanban=status, gp_pic='EKA' if i % 2 else 'WIRA')
+            self.lead = Lead.objects.filter(status_kanban='deals').get()
+            self.deal = make_deal(self.lead, details=2)
+
+    def get_analytics(self):
+        response = self.client.get('/api/leads/analytics/')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_funnel_and_revenue(self):
+        data = self.get_analytics()
+        funnel = {row['status']: row for row in data['funnel']}
+        self.assertEqual(funnel['lead_generation']['count'], 4)
+        self.assertEqual(funnel['lead_generation']['reached'], 10)
+        self.assertEqual(funnel['follow_up']['reached'], 6)
+        self.assertEqual(funnel['lead_generation']['conversion_rate'], 0.6)
+        self.assertIsNone(funnel['retention']['conversion_rate'])
+
+        self.assertEqual(data['deal_types'], [{'deal_type': 'New Deal', 'count': 1}])
+        month = self.deal.date.strftime('%Y-%m')
+        self.assertEqual(data['revenue_by_month'], [{
+            'month': month, 'deal_count': 1, 'product_amount': '200.00',
+            'initiation_amount': '0.00', 'total_amount': '200.00',
+        }])
+        self.assertEqual(data['revenue_by_gp_pic'][0]['gp_pic'], 'WIRA')
+
+    def test_incremental_updates(self):
+        lead_ids = list(Lead.objects.filter(status_kanban='lead_generation').values_list('pk', flat=True)[:2])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/leads/transition/', {
+                'lead_ids': lead_ids, 'status_kanban': 'follow_up',
+            }, format='json')
+            self.lead.gp_pic = 'SURYA'
+            self.lead.save()
+            self.deal.details.first().delete()
+
+        data = self.get_analytics()
+        funnel = {row['status']: row['count'] for row in data['funnel']}
+        self.assertEqual(funnel['lead_generation'], 2)
+        self.assertEqual(funnel['follow_up'], 5)
+        self.assertEqual(
+            [(row['gp_pic'], row['product_amount']) for row in data['revenue_by_gp_pic']],
+            [('SURYA', '100.00')],
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'/api/leads/{self.lead.lead_id}/')
+        data = self.get_analytics()
+        self.assertEqual(data['revenue_by_month'], [])
+        self.assertEqual(data['deal_types'], [])
+        self.assertEqual(sum(row['count'] for row in data['funnel']), 9)
+
+    def test_reads_only_summary_tables(self):
+        with self.assertNumQueries(2):
+            self.get_analytics()
+
+    def test_rebuild_matches_incremental(self):
+        before = self.get_analytics()
+        call_command('rebuild_analytics', stdout=io.StringIO())
+        self.assertEqual(self.get_analytics(), before)
+
+    @skipUnlessDBFeature('has_select_for_update')
+    def test_refresh_locks_source_and_state_rows(self):
+        with CaptureQueriesContext(connection) as ctx:
+            refresh_leads([self.lead.pk])
+            refresh_deals([self.deal.pk])
+        locked = [query['sql'] for query in ctx.captured_queries if 'FOR UPDATE' in query['sql']]
+        for table in ['lead', 'summary_lead_state', 'deal', 'summary_deal_state']:
+            self.assertTrue(any(f'FROM "{table}"' in sql for sql in locked), table)
+
+
+class RevenueTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lead = make_lead(gp_pic='WIRA', commission_amount='Rp 500.000', date_in=timezone.localdate())
+            self.deal = make_deal(self.lead, details=0)
+            DealDetail.objects.create(
+                deal=self.deal, package='Pro', product='PMS, POS', product_amount=1200,
+                product_amount_by='Year', initiation='Training, Installation', initiation_amount=300,
+            )
+            DealDetail.objects.create(
+                deal=self.deal, package='Basic', product='PMS', product_amount=100,
+                product_amount_by='Month', initiation='', initiation_amount=0,
+            )
+            make_lead(gp_pic='EKA', commission_amount='10%')
+
+    def get_revenue(self, **params):
+        response = self.client.get('/api/leads/revenue/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_normalization(self):
+        self.assertEqual(billing_months('Month'), 1)
+        self.assertEqual(billing_months('3 Months'), 3)
+        self.assertEqual(billing_months('Tahun'), 12)
+        self.assertIsNone(billing_months('One Time'))
+        self.assertEqual(parse_amount('Rp 1.500.000'), Decimal('1500000.00'))
+        self.assertEqual(parse_amount('1,000,000.50'), Decimal('1000000.50'))
+        self.assertEqual(parse_amount('2,5 jt'), Decimal('2500000.00'))
+        self.assertIsNone(parse_amount('10%'))
+        self.assertIsNone(parse_amount('-'))
+        self.assertEqual(split_amount(Decimal('100'), 3), [Decimal('33.34'), Decimal('33.33'), Decimal('33.33')])
+
+    def test_lines_and_totals(self):
+        lines = RevenueLine.objects.filter(deal_id=self.deal.pk)
+        self.assertEqual(
+            sorted(lines.values_list('kind', 'item', 'mrr', 'arr', 'one_time')),
+            [
+                ('initiation', 'Installation', 0, 0, 150),
+                ('initiation', 'Training', 0, 0, 150),
+                ('product', 'PMS', 50, 600, 0),
+                ('product', 'PMS', 100, 1200, 0),
+                ('product', 'POS', 50, 600, 0),
+            ],
+        )
+        total = DealRevenue.objects.get(pk=self.deal.pk)
+        self.assertEqual((total.mrr, total.arr, total.one_time), (200, 2400, 300))
+        self.assertEqual(
+            list(LeadCommission.objects.values_list('lead_id', 'amount')), [(self.lead.pk, Decimal('500000.00'))],
+        )
+
+    def test_endpoint_groups(self):
+        month = self.deal.date.strftime('%Y-%m')
+        data = self.get_revenue()
+        self.assertEqual(data['results'], [{
+            'month': month, 'deal_count': 1, 'mrr': '200.00', 'arr': '2400.00',
+            'one_time': '300.00', 'commission': '500000.00',
+        }])
+
+        data = self.get_revenue(group_by='product')
+        self.assertEqual(
+            [(row['product'], row['deal_count'], row['mrr']) for row in data['results']],
+            [('PMS', 1, '150.00'), ('POS', 1, '50.00')],
+        )
+        self.assertEqual(data['totals']['mrr'], '200.00')
+
+        data = self.get_revenue(group_by='gp_pic', product='POS')
+        self.assertEqual(data['results'], [{
+            'gp_pic': 'WIRA', 'deal_count': 1, 'mrr': '50.00', 'arr': '600.00', 'one_time': '0.00',
+        }])
+        self.assertNotIn('commission', data['totals'])
+
+        data = self.get_revenue(group_by='deal_type', **{'from': '2000-01', 'to': '2000-12'})
+        self.assertEqual(data['results'], [])
+        self.assertEqual(data['totals']['commission'], '0.00')
+
+    def test_reads_only_revenue_tables(self):
+        with self.assertNumQueries(4):
+            self.get_revenue(group_by='gp_pic')
+
+    def test_invalid_params(self):
+        self.assertEqual(self.client.get('/api/leads/revenue/', {'group_by': 'room'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/leads/revenue/', {'from': '2024'}).status_code, 400)
+
+    def test_incremental_updates(self):
+        detail = self.deal.details.get(product='PMS')
+        with self.captureOnCommitCallbacks(execute=True):
+            detail.product_amount_by = 'One Time'
+            detail.save()
+            self.lead.commission_amount = '750rb'
+            self.lead.save()
+        total = DealRevenue.objects.get(pk=self.deal.pk)
+        self.assertEqual((total.mrr, total.one_time), (100, 400))
+        self.assertEqual(LeadCommission.objects.get().amount, Decimal('750000.00'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'/api/leads/{self.lead.lead_id}/')
+        self.assertFalse(DealRevenue.objects.exists())
+        self.assertFalse(RevenueLine.objects.exists())
+        self.assertFalse(LeadCommission.objects.exists())
+
+    def test_backfill_matches_incremental(self):
+        before = self.get_revenue(group_by='product')
+        DealRevenue.objects.all().delete()
+        LeadCommission.objects.all().delete()
+        RevenueLine.objects.create(
+            deal_id='D-ORPHAN', deal_detail_id='DD-ORPHAN', month=date(2024, 1, 1), gp_pic='X',
+            deal_type='New Deal', kind='product', item='PMS', mrr=1,
+        )
+        call_command('rebuild_revenue', batch_size=1, stdout=io.StringIO())
+        self.assertEqual(self.get_revenue(group_by='product'), before)
+        self.assertEqual(LeadCommission.objects.count(), 1)
+
+
+@override_settings(API_CACHE_ENABLED=False)
+class ConditionalRequestTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.lead = make_lead()
+        self.deal = make_deal(self.lead, details=1)
+
+    def test_list_not_modified(self):
+        response = self.client.get('/api/leads/')
+        etag = response['ETag']
+        self.assertIn('Last-Modified', response)
+
+        # Cukup 1 query validator, tanpa query data & serialisasi
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/leads/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get('/api/leads/?page_size=10', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        make_lead(property='Baru')
+        response = self.client.get('/api/leads/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_list_changes_on_delete(self):
+        other = make_lead(property='Lain')
+        etag = self.client.get('/api/leads/')['ETag']
+        other.delete()
+        response = self.client.get('/api/leads/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_etag_without_shared_cache_sees_other_workers(self):
+        # Cache LocMem: write di worker lain tidak menaikkan counter proses ini
+        etag = self.client.get('/api/leads/')['ETag']
+        # (QuerySet.update tidak memicu signal bump_generation)
+        Lead.objects.update(property='Diubah worker lain', edited_at=timezone.now() + timedelta(seconds=1))
+        self.assertEqual(self.client.get('/api/leads/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    @override_settings(API_CACHE_SHARED=True)
+    def test_shared_cache_list_not_modified_without_queries(self):
+        etag = self.client.get('/api/leads/')['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/leads/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    @override_settings(API_CACHE_SHARED=True)
+    def test_list_etag_follows_related_models(self):
+        etag = self.client.get('/api/deals/?page_size=10')['ETag']
+        self.assertEqual(self.client.get('/api/deals/?page_size=10', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        detail = self.deal.details.get()
+        detail.package = 'Pro'
+        detail.save()
+        self.assertEqual(self.client.get('/api/deals/?page_size=10', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_detail_follows_related_rows(self):
+        url = f'/api/deals/{self.deal.deal_id}/'
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # lead_property ikut di response deal
+        self.lead.property = 'Hotel Baru'
+        self.lead.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_if_modified_since(self):
+        response = self.client.get(f'/api/leads/{self.lead.lead_id}/')
+        response = self.client.get(
+            f'/api/leads/{self.lead.lead_id}/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_if_match_on_write(self):
+        url = f'/api/leads/{self.lead.lead_id}/'
+        etag = self.client.get(url)['ETag']
+        payload = {'property': 'Hotel A', 'gp_pic': 'EKA', 'date_in': '2026-01-01', 'pics': []}
+
+        response = self.client.put(url, payload, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        # Client lain masih memegang ETag lama
+        response = self.client.put(url, {**payload, 'property': 'Hotel B'}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 412)
+        response = self.client.delete(url, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(Lead.objects.get(pk=self.lead.pk).property, 'Hotel A')
+
+    def test_missing_object_is_404(self):
+        self.assertEqual(self.client.get('/api/leads/L-TIDAKADA/').status_code, 404)
+
+
+class ResponseCacheTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.lead = make_lead()
+        self.deal = make_deal(self.lead, details=1)
+
+    def test_hit_after_miss_without_queries(self):
+        response = self.client.get('/api/leads/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/leads/')
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.data[0]['lead_id'], self.lead.lead_id)
+
+        # ETag ikut di-cache: revalidasi langsung 304
+        response = self.client.get('/api/leads/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+        stats = self.client.get('/api/cache-stats/').data['lead']
+        self.assertEqual((stats['hits'], stats['misses']), (2, 1))
+
+    def test_nested_changes_invalidate(self):
+        url = f'/api/deals/{self.deal.deal_id}/'
+        self.client.get(url)
+
+        detail = self.deal.details.get()
+        detail.product_amount = 999
+        detail.save()
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['details'][0]['product_amount'], '999.00')
+
+        pic = self.deal.pic_lead
+        pic.pic_name = 'Wayan'
+        pic.save()
+        self.assertEqual(self.client.get(url).data['pic_lead_name'], 'Wayan')
+
+    def test_bulk_writes_invalidate(self):
+        self.client.get('/api/leads/')
+        self.client.post('/api/leads/transition/', {
+            'lead_ids': [self.lead.lead_id], 'status_kanban': 'follow_up',
+        }, format='json')
+        response = self.client.get('/api/leads/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data[0]['status_kanban'], 'follow_up')
+
+        # Update nested lewat serializer (bulk_update LeadPIC)
+        pic = LeadPIC.objects.get(lead=self.lead)
+        self.client.patch(f'/api/leads/{self.lead.lead_id}/', {
+            'pics': [{'id': pic.id, 'pic_name': 'Ketut'}],
+        }, format='json')
+        self.assertEqual(self.client.get('/api/leads/').data[0]['pics'][0]['pic_name'], 'Ketut')
+
+    def test_unrelated_model_keeps_cache(self):
+        self.client.get('/api/leads/')
+        FollowUp.objects.create(
+            lead=self.lead, pic_gp='EKA', pic_lead='Budi', date=date(2026, 2, 1),
+            start_time='09:00', end_time='10:00', fu_type='Call', notes='-',
+        )
+        self.assertEqual(self.client.get('/api/leads/')['X-Cache'], 'HIT')
+
+
+class SyncTests(APITestCase):
+    def sync(self, cursor=None, **params):
+        if cursor:
+            params['cursor'] = cursor
+        response = self.client.get('/api/sync/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_initial_then_delta(self):
+        lead = make_lead()
+        deal = make_deal(lead, details=1)
+        data = self.sync()
+        self.assertEqual([row['lead_id'] for row in data['changes']['leads']], [lead.lead_id])
+        self.assertEqual([row['deal_id'] for row in data['changes']['deals']], [deal.deal_id])
+        self.assertEqual(len(data['changes']['deal_details']), 1)
+        self.assertIn('edited_at', data['changes']['leads'][0])
+
+        # Tanpa perubahan: cursor lanjut, isi kosong (kecuali jendela commit)
+        cursor = data['cursor']
+        empty = self.sync(cursor)
+        self.assertFalse(any(empty['deleted'].values()))
+
+        lead.property = 'Hotel Baru'
+        lead.save()
+        data = self.sync(empty['cursor'])
+        self.assertEqual([row['property'] for row in data['changes']['leads']], ['Hotel Baru'])
+
+    def test_cascade_delete_sends_tombstones(self):
+        lead = make_lead()
+        deal = make_deal(lead, details=2)
+        detail_ids = sorted(str(pk) for pk in deal.details.values_list('pk', flat=True))
+        pic_id = str(deal.pic_lead_id)
+        cursor = self.sync()['cursor']
+
+        response = self.client.delete(f'/api/leads/{lead.lead_id}/')
+        self.assertEqual(response.status_code, 204)
+        data = self.sync(cursor)
+        self.assertEqual(data['deleted']['leads'], [lead.lead_id])
+        self.assertEqual(data['deleted']['deals'], [deal.deal_id])
+        self.assertEqual(data['deleted']['lead_pics'], [pic_id])
+        self.assertEqual(sorted(data['deleted']['deal_details']), detail_ids)
+        self.assertEqual(data['changes']['leads'], [])
+
+    def test_nested_pic_delete_updates_deal(self):
+        lead = make_lead()
+        deal = make_deal(lead, details=0)
+        cursor = self.sync()['cursor']
+
+        self.client.patch(f'/api/leads/{lead.lead_id}/', {'pics': []}, format='json')
+        data = self.sync(cursor)
+        self.assertEqual(data['deleted']['lead_pics'], [str(deal.pic_lead_id)])
+        self.assertEqual([row['pic_lead'] for row in data['changes']['deals']], [None])
+
+    def test_children_created_via_api(self):
+        response = self.client.post('/api/leads/', {
+            'property': 'Hotel API', 'source': 'Website', 'gp_pic': 'EKA', 'date_in': '2026-01-01',
+            'pics': [{'pic_name': 'Budi'}, {'pic_name': 'Ani'}],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        lead_id = response.data['lead_id']
+        response = self.client.post('/api/deals/', {
+            'lead': lead_id, 'deal_type': 'New Deal',
+            'details': [{'package': 'Basic', 'product': 'PMS', 'product_amount_by': 'Month', 'initiation': '-'}],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+
+        data = self.sync()
+        self.assertEqual(sorted(row['pic_name'] for row in data['changes']['lead_pics']), ['Ani', 'Budi'])
+        self.assertEqual(
+            [row['deal_detail_id'] for row in data['changes']['deal_details']],
+            [response.data['details'][0]['deal_detail_id']],
+        )
+
+    def test_pagination(self):
+        for i in range(3):
+            make_lead(property=f'H{i}')
+        data = self.sync(page_size=2)
+        self.assertTrue(data['has_more'])
+        self.assertEqual(len(data['changes']['leads']), 2)
+        data = self.sync(data['cursor'], page_size=2)
+        self.assertFalse(data['has_more'])
+        self.assertIn('H2', [row['property'] for row in data['changes']['leads']])
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/sync/', {'cursor': 'bukan-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_compaction_keeps_full_replica(self):
+        kept, removed = make_lead(property='Lama'), make_lead()
+        kept.property = 'Baru'
+        kept.save()
+        removed.delete()
+        call_command('prune_changelog', days=0, stdout=io.StringIO())
+
+        # Hanya entri terakhir baris yang masih ada yang tersisa
+        self.assertEqual(list(ChangeLog.objects.values_list('resource', 'object_id')), [('leads', kept.lead_id)])
+        data = self.sync()
+        self.assertEqual([row['property'] for row in data['changes']['leads']], ['Baru'])
+        self.assertEqual(data['deleted']['leads'], [])
+
+    def test_cursor_older_than_compaction_requires_resync(self):
+        lead = make_lead()
+        cursor = self.sync()['cursor']
+        lead.save()
+        recent = self.sync(cursor)['cursor']
+        compact_changes(before=timezone.now() + timedelta(seconds=1))
+
+        response = self.client.get('/api/sync/', {'cursor': cursor})
+        self.assertEqual(response.status_code, 410)
+        self.assertEqual(response.data['detail'].code, 'full_resync_required')
+        # Cursor setelah compaction tetap berlaku
+        self.assertEqual(self.client.get('/api/sync/', {'cursor': recent}).status_code, 200)
+
+
+class WebSocketClient:
+    """Driver ASGI minimal untuk menguji core.realtime tanpa server."""
+
+    def __init__(self, path='/ws/updates/', query=''):
+        self.input, self.output = asyncio.Queue(), asyncio.Queue()
+        scope = {'type': 'websocket', 'path': path, 'query_string': query.encode(), 'headers': []}
+        self.task = asyncio.ensure_future(websocket_application(scope, self.input.get, self.output.put))
+
+    async def connect(self):
+        await self.input.put({'type': 'websocket.connect'})
+        return await self.receive()
+
+    async def send_json(self, data):
+        await self.input.put({'type': 'websocket.receive', 'text': json.dumps(data)})
+
+    async def receive(self):
+        return await asyncio.wait_for(self.output.get(), timeout=2)
+
+    async def receive_json(self):
+        return json.loads((await self.receive())['text'])
+
+    async def disconnect(self):
+        await self.input.put({'type': 'websocket.disconnect', 'code': 1000})
+        await asyncio.wait_for(self.task, timeout=2)
+
+
+class RealtimeTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.token = str(AccessToken.for_user(self.user))
+
+    def commit(self, func):
+        # TestCase tidak pernah commit: jalankan callback on_commit secara manual
+        def run():
+            with self.captureOnCommitCallbacks(execute=True):
+                return func()
+        return sync_to_async(run)()
+
+    def test_deal_event_fields_need_no_queries(self):
+        deal = make_deal(make_lead(), details=1, is_paid=True)
+        expected = {
+            name: value for name, value in DealSerializer(Deal.objects.get(pk=deal.pk)).data.items()
+            if name not in ('details', 'nik_npwp', 'bukti_payment')
+        }
+
+        # Relasi belum dimuat: field relasi tidak ikut, tanpa query
+        plain = Deal.objects.get(pk=deal.pk)
+        with self.assertNumQueries(0):
+            fields = realtime._deal_fields(plain)
+        related = {'lead_property', 'lead_pic_gp', 'pic_lead_name', 'pic_lead_contact', 'pic_lead_email'}
+        self.assertEqual(fields, {name: value for name, value in expected.items() if name not in related})
+
+        loaded = Deal.objects.select_related('lead', 'pic_lead').get(pk=deal.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(realtime._deal_fields(loaded), expected)
+
+    def test_rejects_missing_or_invalid_token(self):
+        async def scenario():
+            for query in ('', 'token=bukan-jwt'):
+                message = await WebSocketClient(query=query).connect()
+                self.assertEqual(message, {'type': 'websocket.close', 'code': CLOSE_UNAUTHORIZED})
+        async_to_sync(scenario)()
+
+    def test_kanban_move_and_deal_edit_are_broadcast(self):
+        lead = make_lead()
+        deal = make_deal(lead, details=1)
+
+        async def scenario():
+            client = WebSocketClient(query=f'token={self.token}&topics=leads,deals')
+            self.assertEqual((await client.connect())['type'], 'websocket.accept')
+            self.assertEqual((await client.receive_json())['topics'], ['deals', 'leads'])
+
+            await self.commit(lambda: self.client.post('/api/leads/transition/', {
+                'lead_ids': [lead.lead_id], 'status_kanban': 'follow_up',
+            }, format='json'))
+            event = await client.receive_json()
+            self.assertEqual(event['type'], 'lead.status')
+            self.assertEqual((event['ids'], event['status_kanban']), ([lead.lead_id], 'follow_up'))
+
+            await self.commit(lambda: self.client.patch(
+                f'/api/deals/{deal.deal_id}/', {'is_paid': True}, format='json',
+            ))
+            event = await client.receive_json()
+            self.assertEqual((event['type'], event['id']), ('deal.saved', deal.deal_id))
+            self.assertTrue(event['fields']['is_paid'])
+            # Key sama dengan baris DealSerializer (di-Object.assign ke sheet), tanpa file
+            row = (await sync_to_async(self.client.get)(f'/api/deals/{deal.deal_id}/')).data
+            self.assertEqual(set(event['fields']), set(row) - {'details', 'nik_npwp', 'bukti_payment'})
+            self.assertEqual(event['fields']['pic_lead_name'], row['pic_lead_name'])
+            await client.disconnect()
+        async_to_sync(scenario)()
+
+    def test_subscription_filters_topics(self):
+        lead = make_lead()
+
+        async def scenario():
+            client = WebSocketClient(query=f'token={self.token}&topics=activities')
+            await client.connect()
+            await client.receive_json()
+
+            # Perubahan lead tidak dikirim ke subscriber 'activities' saja
+            await self.commit(lambda: Lead.objects.filter(pk=lead.pk).get().save())
+            await self.commit(lambda: FollowUp.objects.create(
+                lead=lead, pic_gp='EKA', pic_lead='Budi', date=date(2026, 2, 1),
+                start_time='09:00', end_time='10:00', fu_type='Call', notes='-',
+            ))
+            event = await client.receive_json()
+            self.assertEqual((event['type'], event['kind'], event['lead']), ('activity.saved', 'followup', lead.lead_id))
+
+            await client.send_json({'action': 'unsubscribe', 'topics': ['activities']})
+            self.assertEqual((await client.receive_json())['topics'], [])
+            await client.send_json({'action': 'ping'})
+            self.assertEqual(await client.receive_json(), {'type': 'pong'})
+            await client.disconnect()
+        async_to_sync(scenario)()
+
+
+class StubGeocoder:
+    """Pengganti Nominatim di test (settings.GEOCODER['BACKEND'])."""
+    places = {'jl. raya ubud no. 1, bali': {'lat': '-8.506800', 'lng': '115.262500', 'display_name': 'Ubud, Bali'}}
+    calls = []
+
+    def __init__(self, **options):
+        pass
+
+    def search(self, query):
+        self.calls.append(query)
+        return self.places.get(query)
+
+    def reverse(self, lat, lng):
+        self.calls.append((lat, lng))
+        return {'lat': lat, 'lng': lng, 'display_name': 'Ubud, Bali'}
+
+
+@override_settings(GEOCODER={'BACKEND': 'leads.tests.StubGeocoder', 'RATE': 1000})
+class GeocodingTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        StubGeocoder.calls = []
+
+    def test_search_is_cached_by_normalized_query(self):
+        response = self.client.get('/api/leads/geocode/', {'q': 'Jl. Raya Ubud No. 1,  BALI'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['found'], response.data['lat']), (True, -8.5068))
+        self.assertFalse(response.data['cached'])
+
+        response = self.client.get('/api/leads/geocode/', {'q': 'jl. raya ubud no. 1, bali.'})
+        self.assertTrue(response.data['cached'])
+        self.assertEqual(len(StubGeocoder.calls), 1)
+
+    def test_not_found_and_reverse(self):
+        response = self.client.get('/api/leads/geocode/', {'q': 'Antah Berantah'})
+        self.assertFalse(response.data['found'])
+        self.client.get('/api/leads/geocode/', {'q': 'antah berantah'})
+        self.assertEqual(len(StubGeocoder.calls), 1)  # negative cache
+
+        response = self.client.get('/api/leads/geocode/', {'lat': '-8.5068001', 'lng': '115.2625'})
+        self.assertEqual(response.data['display_name'], 'Ubud, Bali')
+        self.assertEqual(self.client.get('/api/leads/geocode/', {'lat': '91', 'lng': '0'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/leads/geocode/', {'q': '  '}).status_code, 400)
+
+    def test_single_flight_coalesces_concurrent_calls(self):
+        calls, results = [], []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.2)
+            return 'hasil'
+
+        threads = [
+            threading.Thread(target=lambda: results.append(geocoding.single_flight('k', slow)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual((len(calls), results), (1, ['hasil'] * 5))
+
+    def test_batch_resolves_missing_coordinates(self):
+        leads = [make_lead(property=f'H{i}', address='Jl. Raya Ubud No. 1, Bali') for i in range(3)]
+        unknown = make_lead(address='Antah Berantah')
+        done = make_lead(address='Jl. Raya Ubud No. 1, Bali', coordinates='-8.1,115.1')
+
+        call_command('geocode_leads', batch_size=2, stdout=io.StringIO(), stderr=io.StringIO())
+        self.assertEqual(len(StubGeocoder.calls), 2)  # 1 alamat ditemukan + 1 tidak
+        for lead in leads:
+            lead.refresh_from_db()
+            self.assertEqual(lead.coordinates, '-8.506800,115.262500')
+        unknown.refresh_from_db()
+        done.refresh_from_db()
+        self.assertIsNone(unknown.coordinates)
+        self.assertEqual(done.coordinates, '-8.1,115.1')
+        self.assertEqual(GeocodeCache.objects.count(), 2)
+
+
+class NearbyTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.ubud = make_lead(property='Ubud', coordinates='-8.506800, 115.262500')
+        self.sanur = make_lead(property='Sanur', coordinates='-8.688000,115.262000')  # ~20 km
+        self.kuta = make_lead(property='Kuta', coordinates='-8.723800, 115.172300')  # ~26 km
+        make_lead(property='Tanpa koordinat', coordinates='')
+        self.meeting = Meeting.objects.create(
+            lead=self.ubud, pic_gp='EKA', pic_lead='Budi', date=date(2026, 2, 1), start_time='09:00',
+            end_time='10:00', meeting_type='Offline', latitude='-8.5070', longitude='115.2630', mom='-',
+        )
+
+    def test_numeric_columns_follow_strings(self):
+        self.assertEqual((self.ubud.lat, self.ubud.lng), (-8.5068, 115.2625))
+        self.assertTrue(self.ubud.geohash.startswith('qw'))
+        self.ubud.coordinates = 'bukan koordinat'
+        self.ubud.save(update_fields=['coordinates'])
+        self.ubud.refresh_from_db()
+        self.assertEqual((self.ubud.lat, self.ubud.geohash), (None, ''))
+
+    def test_radius_ordered_by_distance(self):
+        response = self.client.get('/api/leads/nearby/', {'lat': -8.5, 'lng': 115.26, 'radius': 22})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['property'] for row in response.data['leads']], ['Ubud', 'Sanur'])
+        self.assertLess(response.data['leads'][0]['distance'], 1)
+        self.assertAlmostEqual(response.data['leads'][1]['distance'], 20.9, delta=0.5)
+        self.assertEqual([row['id'] for row in response.data['meetings']], [self.meeting.id])
+
+    def test_bbox(self):
+        response = self.client.get('/api/leads/nearby/', {
+            'bbox': '115.1,-8.8,115.2,-8.6', 'types': 'leads',
+        })
+        self.assertEqual([row['lead_id'] for row in response.data['leads']], [self.kuta.lead_id])
+        self.assertNotIn('meetings', response.data)
+        self.assertEqual(self.client.get('/api/leads/nearby/', {'lat': 'x', 'lng': 1}).status_code, 400)
+
+    def test_search_area_is_capped(self):
+        response = self.client.get('/api/leads/nearby/', {'bbox': '-180,-90,180,90'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('bbox', response.data)
+        response = self.client.get('/api/leads/nearby/', {'lat': -8.5, 'lng': 115.26, 'radius': 5000})
+        self.assertEqual(response.status_code, 400)
+
+    def test_covering_cells_contain_every_point(self):
+        rng = random.Random(7)
+        south, west, north, east = -8.9, 114.4, -8.05, 115.7
+        cells = geo.covering_cells(south, west, north, east)
+        self.assertLessEqual(len(cells), geo.MAX_CELLS)
+        for _ in range(500):
+            lat, lng = rng.uniform(south, north), rng.uniform(west, east)
+            self.assertTrue(geo.encode_geohash(lat, lng).startswith(tuple(cells)))
+
+
+class AsyncReadTests(TransactionTestCase):
+    # Worker thread handler async memakai koneksi sendiri: data harus sudah di-commit
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='tester', password='secret-pass')
+        self.deal = make_deal(make_lead(property='Async Hotel'), details=2)
+
+    def call_async(self, view, path, **kwargs):
+        request = AsyncRequestFactory().get(path)
+        force_authenticate(request, self.user)
+        return async_to_sync(view)(request, **kwargs)
+
+    def call_sync(self, view, path, **kwargs):
+        request = APIRequestFactory().get(path)
+        force_authenticate(request, self.user)
+        return view(request, **kwargs).render()
+
+    def test_only_list_and_retrieve_become_async(self):
+        self.assertFalse(asyncio.iscoroutinefunction(LeadViewSet.as_view({'get': 'list'})))
+        with override_settings(ASYNC_API=True):
+            self.assertTrue(asyncio.iscoroutinefunction(LeadViewSet.as_view({'get': 'list', 'post': 'create'})))
+            self.assertTrue(asyncio.iscoroutinefunction(DealViewSet.as_view({'get': 'retrieve'})))
+            self.assertFalse(asyncio.iscoroutinefunction(LeadViewSet.as_view({'get': 'board'})))
+            self.assertFalse(asyncio.iscoroutinefunction(FollowUpViewSet.as_view({'get': 'list'})))
+
+    def test_async_handlers_match_sync_responses(self):
+        cases = [
+            (LeadViewSet, {'get': 'list'}, '/api/leads/?page_size=10', {}),
+            (LeadViewSet, {'get': 'retrieve'}, '/api/leads/x/', {'pk': self.deal.lead_id}),
+            (DealViewSet, {'get': 'list'}, '/api/deals/?page_size=10', {}),
+            (DealViewSet, {'get': 'retrieve'}, '/api/deals/x/', {'pk': self.deal.deal_id}),
+        ]
+        for viewset, actions, path, kwargs in cases:
+            expected = self.call_sync(viewset.as_view(actions), path, **kwargs)
+            with override_settings(ASYNC_API=True):
+                view = viewset.as_view(actions)
+            response = self.call_async(view, path, **kwargs)
+            self.assertEqual(response.status_code, 200, path)
+            # Sudah dirender di worker thread
+            self.assertTrue(response.is_rendered)
+            self.assertEqual(json.loads(response.content), json.loads(expected.content), path)
+
+    def test_async_retrieve_missing_object(self):
+        with override_settings(ASYNC_API=True):
+            view = DealViewSet.as_view({'get': 'retrieve'})
+        self.assertEqual(self.call_async(view, '/api/deals/x/', pk='D-TIDAKADA').status_code, 404)
+
+
+@override_settings(API_CACHE_ENABLED=False)
+class CachedAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='tester', password='secret-pass')
+        self.other = User.objects.create_user(username='other', password='secret-pass')
+        self.client = self.jwt_client(self.user)
+
+    def jwt_client(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        return client
+
+    def count_queries(self, client, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [query['sql'] for query in ctx.captured_queries]
+
+    def test_cached_user_saves_one_query(self):
+        make_lead()
+        first = self.count_queries(self.client, '/api/leads/')
+        second = self.count_queries(self.client, '/api/leads/')
+        self.assertEqual(len(second), len(first) - 1)
+        self.assertFalse(any('auth_user' in sql for sql in second))
+
+    def test_update_invalidates_cached_user(self):
+        self.client.get('/api/leads/')
+        old_hash = cache.get(user_cache_key(self.user.pk))['revoke_hash']
+
+        response = self.client.patch(f'/api/users/{self.user.pk}/', {'password': 'new-secret-pass'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+
+        self.client.get('/api/leads/')
+        self.assertNotEqual(cache.get(user_cache_key(self.user.pk))['revoke_hash'], old_hash)
+
+    def test_cached_payload_has_no_password(self):
+        self.client.get('/api/leads/')
+        fields = cache.get(user_cache_key(self.user.pk))
+        self.assertNotIn('password', fields)
+        self.assertEqual(set(fields), {'id', 'username', 'is_active', 'is_staff', 'revoke_hash'})
+        self.assertNotIn(self.user.password, fields.values())
+        user = CachedJWTAuthentication.load(fields)
+        self.assertEqual((user.pk, user.username, user.is_active), (self.user.pk, 'tester', True))
+
+    def test_inactive_cached_user_is_rejected(self):
+        self.client.get('/api/leads/')
+        fields = cache.get(user_cache_key(self.user.pk))
+        cache.set(user_cache_key(self.user.pk), {**fields, 'is_active': False})
+        self.assertEqual(self.client.get('/api/leads/').status_code, 401)
+
+    def test_deleted_user_loses_access(self):
+        other_client = self.jwt_client(self.other)
+        self.assertEqual(other_client.get('/api/leads/').status_code, 200)
+
+        self.assertEqual(self.client.delete(f'/api/users/{self.other.pk}/').status_code, 204)
+        self.assertEqual(other_client.get('/api/leads/').status_code, 401)
+
+
+@override_settings(API_CACHE_ENABLED=False)
+class ValuesSerializerTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(4):
+            lead = make_lead(property=f'Hotel {i}\u2028', commission_amount='12.5')
+            LeadPIC.objects.create(lead=lead, pic_name=f'PIC {i}', email='pic@example.com')
+            make_deal(lead, details=i % 3, is_paid=bool(i % 2))
+        make_lead(property='Tanpa PIC')
+        # pic_lead NULL: lead_pic_* tidak ikut di response (SkipField)
+        Deal.objects.create(lead=make_lead(property='Deal tanpa PIC'), deal_type='New Deal')
+
+    def compare(self, viewset, url):
+        fast = self.client.get(url)
+        with mock.patch.object(viewset, 'values_list_enabled', False):
+            slow = self.client.get(url)
+        self.assertEqual(fast.status_code, 200)
+        self.assertEqual(fast.content, slow.content)
+        return fast
+
+    def test_list_matches_model_serializer(self):
+        self.compare(LeadViewSet, '/api/leads/')
+        response = self.compare(DealViewSet, '/api/deals/')
+        self.assertNotIn('pic_lead_name', response.data[0])
+        self.assertIn('pic_lead_name', response.data[1])
+
+    def test_file_columns_match_detail(self):
+        deal = Deal.objects.filter(pic_lead__isnull=False).first()
+        Deal.objects.filter(pk=deal.pk).update(nik_npwp='docs/ktp 1.pdf')
+        response = self.compare(DealViewSet, '/api/deals/')
+        row = next(item for item in response.data if item['deal_id'] == deal.deal_id)
+        self.assertEqual(row, self.client.get(f'/api/deals/{deal.deal_id}/').data)
+        self.assertTrue(row['nik_npwp'].startswith('http://testserver/'))
+        self.assertTrue(row['nik_npwp'].endswith('docs/ktp%201.pdf'))
+        self.assertIsNone(row['bukti_payment'])
+
+    def test_paginated_list_matches_model_serializer(self):
+        response = self.compare(LeadViewSet, '/api/leads/?page_size=2&status_kanban=new')
+        while response.data['next']:
+            response = self.compare(LeadViewSet, response.data['next'])
+        self.compare(DealViewSet, '/api/deals/?page_size=3&ordering=paid_date')
+
+    def test_list_query_count(self):
+        # validator ETag + lead + pics, validator + deal (JOIN lead & pic) + details
+        with self.assertNumQueries(3):
+            self.client.get('/api/leads/?page_size=10', HTTP_ACCEPT='application/json')
+        with self.assertNumQueries(3):
+            self.client.get('/api/deals/?page_size=10', HTTP_ACCEPT='application/json')
+
+    def test_benchmark_reports_identical_output(self):
+        with tempfile.NamedTemporaryFile(suffix='.json') as output:
+            call_command('benchmark_serializers', rows=10, repeat=1, output=output.name, stdout=io.StringIO())
+            report = json.load(open(output.name))
+        self.assertEqual([result['endpoint'] for result in report['results']], ['lead', 'deal'])
+        self.assertTrue(all(result['identical'] for result in report['results']))
+
+
+class ORJSONRendererTests(TestCase):
+    def assertSameBytes(self, data):
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_matches_json_renderer(self):
+        self.assertSameBytes({
+            'text': 'Kuta \u00e9 \u2028 \u2029 "quoted"', 'amount': Decimal('12.50'), 'none': None,
+            'created': timezone.now(), 'date': date(2026, 1, 2), 'nested': [{'a': 1, 'b': [True, False]}],
+            'float': 115.2625, 'lazy': gettext_lazy('Hotel'),
+        })
+
+    def test_falls_back_for_stdlib_only_formats(self):
+        self.assertSameBytes({'small': 1e-05, 'big': 1e16, 'text': '2e5 bukan angka'})
+        self.assertSameBytes({1: 'key integer', 'big_int': 2 ** 70})
+        self.assertEqual(ORJSONRenderer().render({'a': 1}, 'application/json; indent=2'), b'{\n  "a": 1\n}')
+
+
+class GeneratedIdTests(APITestCase):
+    def test_ids_are_sortable_and_unique(self):
+        ids = [new_id('D-') for _ in range(2000)] + new_ids('D-', 500) + [new_id('D-')]
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertTrue(all(len(value) == 18 for value in ids))
+        self.assertAlmostEqual(id_timestamp(ids[0]), time.time(), delta=5)
+        self.assertIsNone(id_timestamp('L-02D8983AAA3D'))  # format lama
+
+    def test_models_use_prefixed_ids(self):
+        deal = make_deal(make_lead(), details=1)
+        self.assertRegex(deal.lead_id, r'^L-[0-9A-Z]{16}$')
+        self.assertRegex(deal.deal_id, r'^D-[0-9A-Z]{16}$')
+        self.assertRegex(deal.details.get().deal_detail_id, r'^DD-[0-9A-Z]{16}$')
+
+    def test_insert_retries_on_conflict(self):
+        existing = make_lead(property='Lama')
+        generated = iter([existing.lead_id, 'L-BARU'])
+        with mock.patch.object(Lead, 'id_generator', staticmethod(lambda: next(generated))):
+            lead = make_lead(property='Baru')
+        self.assertEqual(lead.lead_id, 'L-BARU')
+        # Baris lama tidak tertimpa
+        existing.refresh_from_db()
+        self.assertEqual(existing.property, 'Lama')
+
+    def test_explicit_pk_conflict_is_not_retried(self):
+        existing = make_lead(property='Lama')
+        with mock.patch.object(Lead, 'id_generator', side_effect=AssertionError('tidak boleh generate')):
+            with self.assertRaises(IntegrityError):
+                make_lead(lead_id=existing.lead_id, property='Baru')
+        existing.refresh_from_db()
+        self.assertEqual(existing.property, 'Lama')
+
+    def test_default_pk_conflict_is_retried(self):
+        # PK Deal / DealDetail diisi default= field di __init__, tetap dianggap hasil generator
+        deal = make_deal(make_lead(), details=1)
+        detail = deal.details.get()
+        cases = [
+            (Deal, deal.pk, 'D-BARU', lambda: Deal.objects.create(lead=deal.lead, deal_type='New Deal')),
+            (DealDetail, detail.pk, 'DD-BARU', lambda: DealDetail.objects.create(
+                deal=deal, package='Basic', product='PMS', product_amount_by='Month', initiation='-',
+            )),
+        ]
+        for model, taken, fresh, create in cases:
+            with mock.patch.object(model._meta.pk, '_get_default', lambda: taken), \
+                    mock.patch.object(model, 'id_generator', staticmethod(lambda: fresh)):
+                self.assertEqual(create().pk, fresh)
+
+    def test_explicit_deal_pk_conflict_is_not_retried(self):
+        deal = make_deal(make_lead(), details=0)
+        with mock.patch.object(Deal, 'id_generator', side_effect=AssertionError('tidak boleh generate')):
+            with self.assertRaises(IntegrityError):
+                Deal.objects.create(deal_id=deal.deal_id, lead=deal.lead, deal_type='New Deal')
@@ -0,0 +1,99 @@
+import base64
+import heapq
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_date
+
+from .models import FollowUp, Meeting, Quotation, Deal
+
+# Urutan timeline: date DESC, lalu rank tipe DESC, lalu pk DESC.
+# (type, rank, model, pk field, field yang dikirim ke client)
+TIMELINE_SOURCES = [
+    ('followup', 0, FollowUp, 'id', [
+        'date', 'start_time', 'end_time', 'pic_gp', 'pic_lead',
+        'fu_type', 'stage', 'objective', 'notes',
+    ]),
+    ('meeting', 1, Meeting, 'id', [
+        'date', 'start_time', 'end_time', 'pic_gp', 'pic_lead',
+        'meeting_type', 'stage', 'location', 'mom',
+    ]),
+    ('quotation', 2, Quotation, 'quotation_id', [
+        'date', 'pic_gp', 'link_quotation', 'is_send',
+    ]),
+    ('deal', 3, Deal, 'deal_id', [
+        'date', 'deal_type', 'room', 'is_paid', 'invoice_issued', 'paid_date',
+    ]),
+]
+TYPE_RANKS = {source[0]: source[1] for source in TIMELINE_SOURCES}
+TYPE_PK_FIELDS = {source[0]: source[2]._meta.get_field(source[3]) for source in TIMELINE_SOURCES}
+
+
+def encode_cursor(row):
+    payload = {'d': row['date'].isoformat(), 't': row['type'], 'k': row['id']}
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(encoded):
+    """Return (date, type, pk); raise exception kalau cursor rusak."""
+    padded = encoded + '=' * (-len(encoded) % 4)
+    payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    cursor_date = parse_date(payload['d'])
+    if cursor_date is None or payload['t'] not in TYPE_RANKS:
+        raise ValueError('Invalid cursor')
+    cursor_pk = TYPE_PK_FIELDS[payload['t']].to_python(payload['k'])
+    return cursor_date, payload['t'], cursor_pk
+
+
+def _before_cursor(rank, pk_field, cursor):
+    """Filter baris satu tipe yang posisinya setelah cursor (urutan DESC)."""
+    cursor_date, cursor_type, cursor_pk = cursor
+    cursor_rank = TYPE_RANKS[cursor_type]
+    if rank < cursor_rank:
+        return Q(date__lte=cursor_date)
+    if rank > cursor_rank:
+        return Q(date__lt=cursor_date)
+    return Q(date__lt=cursor_date) | Q(date=cursor_date, **{f'{pk_field}__lt': cursor_pk})
+
+
+def _source_rows(lead_id, cursor, limit, type_name, rank, model, pk_field, fields):
+    queryset = model.objects.filter(lead_id=lead_id)
+    if cursor is not None:
+        queryset = queryset.filter(_before_cursor(rank, pk_field, cursor))
+    queryset = (
+        queryset.order_by('-date', f'-{pk_field}')
+        .values(pk_field, *fields)[:limit]
+    )
+    for row in queryset:
+        row['id'] = row.pop(pk_field)
+        row['type'] = type_name
+        yield (row['date'], rank, row['id']), row
+
+
+def get_timeline_page(lead_id, cursor=None, page_size=20):
+    """
+    K-way merge dari 4 queryset yang sudah terurut (index lead, date, pk).
+    Tiap sumber dibatasi page_size + 1 baris, jadi jumlah baris yang dibaca
+    maksimal 4 x (page_size + 1) berapapun panjang histori lead.
+
+    Return (rows, next_cursor).
+    """
+    limit = page_size + 1
+    streams = [
+        _source_rows(lead_id, cursor, limit, *source)
+        for source in TIMELINE_SOURCES
+    ]
+    merged = heapq.merge(*streams, key=lambda item: item[0], reverse=True)
+
+    rows = []
+    for _, row in merged:
+        if len(rows) == limit:
+            break
+        rows.append(row)
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(rows[-1])
+    return rows, next_cursor
@@ -1,29 +1,498 @@
+from collections import OrderedDict
+
+from django.db import transaction
+from django.db.models import Count, Prefetch, Q
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
-from .models import Lead, FollowUp, Meeting, Quotation, Deal, DealDetail
-from .serializers import LeadSerializer, FollowUpSerializer, MeetingSerializer, QuotationSerializer, DealSerializer
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.views import APIView
+from core.async_views import AsyncReadMixin
+from core.cache import CachedResponseMixin, bump_generation
+from core.conditional import ConditionalMixin
+from core.export import ExportMixin
+from core.pagination import KeysetPagination
+from core.values import ValuesListMixin
+from .models import Lead, LeadPIC, FollowUp, Meeting, Quotation, Deal, DealDetail
+from .serializers import (
+    LeadSerializer, FollowUpSerializer, MeetingSerializer, QuotationSerializer, DealSerializer,
+    LeadTransitionSerializer, LeadBulkTransitionSerializer, ACTIVITY_SERIALIZERS,
+)
+from .timeline import get_timeline_page, decode_cursor
+from .importer import import_leads
+from .search import search_lead_ids
+from .analytics import get_pipeline_analytics, schedule_refresh
+from . import geo, geocoding, realtime, revenue
+from .sync import SYNC_PAGE_SIZE, batch_changes, decode_cursor as decode_sync_cursor, get_changes, record_changes
+
+# ==========================================
+# KANBAN BOARD
+# ==========================================
+
+INBOUND = Q(source__in=Lead.INBOUND_SOURCES)
+
+# (key kolom, status_kanban, label, filter) - urutan sama dengan kolom di Leads.vue
+BOARD_COLUMNS = [
+    ('lead_generation_inbound', 'lead_generation', 'Lead Generation (Inbound)',
+     Q(status_kanban='lead_generation') & INBOUND),
+    ('lead_generation_outbound', 'lead_generation', 'Lead Generation (Outbound)',
+     Q(status_kanban='lead_generation') & ~INBOUND),
+] + [
+    (status, status, label, Q(status_kanban=status))
+    for status, label in Lead.STATUS_KANBAN_CHOICES if status != 'lead_generation'
+]
+
+
+class BoardColumnPagination(KeysetPagination):
+    # Kolom board selalu dipaginasi, tidak ikut mode kompatibilitas
+    page_size = 20
+
+    def is_unpaginated(self, request):
+        return False
 
-class LeadViewSet(viewsets.ModelViewSet):
-    queryset = Lead.objects.all().order_by('-created_at')
+
+class LeadViewSet(
+    AsyncReadMixin, CachedResponseMixin, ConditionalMixin, ExportMixin, ValuesListMixin, viewsets.ModelViewSet,
+):
+    # pics di-prefetch: 1 query tambahan untuk semua lead, bukan 1 per lead.
+    # Urutan child eksplisit, dipakai juga oleh ValuesListMixin
+    queryset = (
+        Lead.objects.prefetch_related(Prefetch('pics', queryset=LeadPIC.objects.order_by('id')))
+        .order_by('-created_at', '-lead_id')
+    )
     serializer_class = LeadSerializer
     permission_classes = [IsAuthenticated]
+    cache_models = [Lead, LeadPIC]
+
+    # Hanya kolom ter-index (lihat Lead.Meta.indexes), dicek core.filters
+    filter_fields = {
+        'source': ['exact', 'in'],
+        'type': ['exact', 'in'],
+        'gp_pic': ['exact', 'in'],
+        'status_kanban': ['exact', 'in'],
+        'date_in': ['exact', 'gte', 'lte'],
+        'created_at': ['gte', 'lte'],
+    }
+    ordering_fields = ['created_at', 'date_in']
+
+    # Satu baris per PIC (lead tanpa PIC tetap 1 baris)
+    export_filename = 'leads'
+    export_fields = [
+        ('Lead ID', 'lead_id'), ('Property', 'property'), ('Source', 'source'),
+        ('Type', 'type'), ('Coordinates', 'coordinates'), ('Address', 'address'),
+        ('GP PIC', 'gp_pic'), ('Date In', 'date_in'), ('Status', 'status_kanban'),
+        ('Referral / Affiliate', 'referral_or_affiliate_by'),
+        ('Commission', 'commission_amount'), ('Created At', 'created_at'),
+        ('PIC Name', 'pics__pic_name'), ('PIC Phone', 'pics__phone_number'),
+        ('PIC WhatsApp', 'pics__whatsapp'), ('PIC Email', 'pics__email'),
+    ]
+
+    def perform_destroy(self, instance):
+        # Cascade (PIC, aktivitas, deal) -> tombstone ditulis dengan satu INSERT
+        with batch_changes():
+            instance.delete()
+
+    @action(detail=False, methods=['get'])
+    def board(self, request):
+        """
+        Data awal kanban: jumlah lead per kolom (1 query GROUP BY) + N kartu
+        pertama tiap kolom. Kartu berikutnya diambil lewat board/<column>/.
+        """
+        counts = self.get_board_counts()
+        columns = []
+        for key, status, label, condition in BOARD_COLUMNS:
+            page = self.get_board_page(request, key, condition)
+            columns.append(OrderedDict([
+                ('key', key),
+                ('status', status),
+                ('label', label),
+                ('count', counts[key]),
+                ('next', page.data['next']),
+                ('results', page.data['results']),
+            ]))
+        return Response({'columns': columns})
+
+    @action(detail=False, methods=['get'], url_path=r'board/(?P<column>[a-z_]+)')
+    def board_column(self, request, column=None):
+        for key, status, label, condition in BOARD_COLUMNS:
+            if key == column:
+                return self.get_board_page(request, key, condition)
+        raise NotFound('Unknown board column')
+
+    @action(detail=True, methods=['get'])
+    def timeline(self, request, pk=None):
+        """
+        Histori follow up, meeting, quotation & deal satu lead dalam satu stream
+        (terbaru dulu). Paginasi: ?page_size=20&cursor=<next>.
+        """
+        lead = get_object_or_404(Lead.objects.only('lead_id'), pk=pk)
+        paginator = KeysetPagination()
+        page_size = paginator.get_page_size(request) if 'page_size' in request.query_params else 20
+
+        cursor = None
+        if request.query_params.get('cursor'):
+            try:
+                cursor = decode_cursor(request.query_params['cursor'])
+            except Exception:
+                raise NotFound(paginator.invalid_cursor_message)
+
+        rows, next_cursor = get_timeline_page(lead.lead_id, cursor, page_size)
+        next_link = None
+        if next_cursor:
+            next_link = replace_query_param(request.build_absolute_uri(), 'cursor', next_cursor)
+        return Response(OrderedDict([('next', next_link), ('results', rows)]))
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Cari lead berdasarkan property, alamat, gp_pic, referral dan kontak PIC.
+        ?q=<kata kunci>&limit=20 - hasil terurut relevansi, mendukung prefix.
+        """
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            raise ValidationError({'q': 'Kata kunci wajib diisi'})
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+        except ValueError:
+            raise ValidationError({'limit': 'Harus angka'})
+
+        lead_ids = search_lead_ids(query, limit)
+        leads = {lead.pk: lead for lead in self.get_queryset().filter(pk__in=lead_ids)}
+        ranked = [leads[lead_id] for lead_id in lead_ids if lead_id in leads]
+        return Response({'results': self.get_serializer(ranked, many=True).data})
+
+    @action(detail=False, methods=['get'])
+    def analytics(self, request):
+        """
+        Funnel per status_kanban, conversion rate antar stage, jumlah deal per
+        deal_type dan revenue per bulan / gp_pic. Dibaca dari summary table
+        (leads/analytics.py), bukan dari tabel lead / deal.
+        """
+        return Response(get_pipeline_analytics())
+
+    @action(detail=False, methods=['get'])
+    def revenue(self, request):
+        """
+        MRR / ARR / one-time (dan komisi) per ?group_by=month|product|initiation|deal_type|gp_pic.
+        Filter opsional: from / to (YYYY-MM), deal_type, gp_pic, product. Dibaca dari
+        tabel revenue ternormalisasi (leads/revenue.py).
+        """
+        params = request.query_params
+        filters = {}
+        for param, name in [('from', 'date_from'), ('to', 'date_to')]:
+            if params.get(param):
+                try:
+                    filters[name] = revenue.parse_month(params[param])
+                except ValueError:
+                    raise ValidationError({param: 'Format bulan YYYY-MM'})
+        for name in ['deal_type', 'gp_pic', 'product']:
+            if params.get(name):
+                filters[name] = params[name]
+        try:
+            data = revenue.get_revenue(params.get('group_by', 'month'), **filters)
+        except ValueError as exc:
+            raise ValidationError({'group_by': str(exc)})
+        return Response(data)
+
+    @action(detail=False, methods=['get'])
+    def nearby(self, request):
+        """
+        Lead & meeting di sekitar titik (?lat=&lng=&radius=<km>) atau di dalam
+        area peta (?bbox=west,south,east,north), terurut dari yang terdekat.
+        Opsional: types=leads,meetings & limit (default 100, maks 500).
+        """
+        params = request.query_params
+        try:
+            limit = min(max(int(params.get('limit', 100)), 1), 500)
+            if 'bbox' in params:
+                west, south, east, north = (float(value) for value in params['bbox'].split(','))
+                if not (-90 <= south <= north <= 90 and -180 <= west <= east <= 180):
+                    raise ValueError
+                if north - south > geo.MAX_BBOX_DEGREES or east - west > geo.MAX_BBOX_DEGREES:
+                    raise ValidationError({'bbox': f'Area maksimal {geo.MAX_BBOX_DEGREES} derajat per sisi'})
+                center = ((south + north) / 2, (west + east) / 2)
+                search = lambda queryset: geo.within_bbox(queryset, south, west, north, east, center)
+            else:
+                center = geo.make_point(params.get('lat'), params.get('lng'))
+                radius = float(params.get('radius', 5))
+                if center is None or not 0 < radius <= geo.MAX_RADIUS_KM:
+                    raise ValueError
+                search = lambda queryset: geo.within_radius(queryset, *center, radius)
+        except ValueError:
+            raise ValidationError({'detail': (
+                f'Butuh lat, lng & radius (km, maks {geo.MAX_RADIUS_KM}) atau bbox=west,south,east,north'
+            )})
+
+        types = params.get('types', 'leads,meetings').split(',')
+        data = {'center': {'lat': center[0], 'lng': center[1]}}
+        if 'leads' in types:
+            data['leads'] = list(search(Lead.objects.all()).values(
+                'lead_id', 'property', 'status_kanban', 'gp_pic', 'address', 'lat', 'lng', 'distance',
+            )[:limit])
+        if 'meetings' in types:
+            data['meetings'] = list(search(Meeting.objects.all()).values(
+                'id', 'lead', 'lead__property', 'date', 'start_time', 'meeting_type', 'location',
+                'pic_gp', 'lat', 'lng', 'distance',
+            )[:limit])
+        return Response(data)
+
+    @action(detail=False, methods=['get'])
+    def geocode(self, request):
+        """
+        Alamat -> koordinat (?q=<alamat>) atau koordinat -> alamat (?lat=&lng=)
+        lewat cache geocoding backend (leads/geocoding.py).
+        """
+        params = request.query_params
+        try:
+            if 'lat' in params or 'lng' in params:
+                result = geocoding.reverse_geocode(params.get('lat'), params.get('lng'))
+            else:
+                result = geocoding.geocode(params.get('q', ''))
+        except (TypeError, ValueError) as exc:
+            raise ValidationError({'detail': str(exc) if isinstance(exc, ValueError) else 'lat & lng wajib diisi'})
+        except geocoding.GeocoderError as exc:
+            return Response({'detail': str(exc)}, status=503)
+        return Response(result)
+
+    @action(detail=True, methods=['post'])
+    def transition(self, request, pk=None):
+        """
+        Pindah stage + buat aktivitasnya (follow up / meeting / quotation / deal)
+        dalam satu transaksi. Kalau aktivitas gagal validasi, status lead tidak berubah.
+
+        Body: {"status_kanban": "deals", "activity_type": "deal", "activity": {...}}
+        """
+        params = LeadTransitionSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        with transaction.atomic():
+            lead = get_object_or_404(Lead.objects.select_for_update(), pk=pk)
 
-class FollowUpViewSet(viewsets.ModelViewSet):
-    queryset = FollowUp.objects.all()
+            activity_serializer = None
+            if 'activity_type' in data:
+                serializer_class = ACTIVITY_SERIALIZERS[data['activity_type']]
+                activity_serializer = serializer_class(
+                    data={**data.get('activity', {}), 'lead': lead.pk},
+                    context=self.get_serializer_context(),
+                )
+                if not activity_serializer.is_valid():
+                    raise ValidationError({'activity': activity_serializer.errors})
+                activity_serializer.save()
+
+            lead.status_kanban = data['status_kanban']
+            lead.save(update_fields=['status_kanban', 'edited_at'])
+
+        return Response({
+            'lead': self.get_serializer(self.get_object()).data,
+            'activity_type': data.get('activity_type'),
+            'activity': activity_serializer.data if activity_serializer else None,
+        })
+
+    @action(detail=False, methods=['post'], url_path='transition')
+    def bulk_transition(self, request):
+        """Pindahkan banyak lead ke satu kolom dengan satu UPDATE."""
+        params = LeadBulkTransitionSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        now = timezone.now()
+        with transaction.atomic():
+            # Hanya id yang benar-benar ada (dan terkunci) yang diupdate & dicatat
+            lead_ids = list(
+                Lead.objects.filter(pk__in=data['lead_ids']).order_by('pk')
+                .select_for_update().values_list('pk', flat=True)
+            )
+            updated = Lead.objects.filter(pk__in=lead_ids).update(
+                status_kanban=data['status_kanban'], edited_at=now,
+            )
+            # QuerySet.update tidak memicu signal
+            record_changes(Lead, lead_ids)
+            realtime.leads_moved(lead_ids, data['status_kanban'], now)
+        schedule_refresh(lead_ids=lead_ids)
+        bump_generation(Lead)
+        return Response({'updated': updated, 'status_kanban': data['status_kanban']})
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_file(self, request):
+        """
+        Upload CSV / XLSX (field `file`). Baris yang tidak valid dilaporkan
+        di `errors` tanpa membatalkan baris lain.
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise ValidationError({'file': 'File wajib diupload'})
+
+        defaults = {key: request.data[key] for key in ('gp_pic', 'source') if request.data.get(key)}
+        try:
+            report = import_leads(upload, upload.name, defaults=defaults)
+        except ValueError as exc:
+            raise ValidationError({'file': str(exc)})
+        return Response(report)
+
+    def get_board_counts(self):
+        counts = {key: 0 for key, *_ in BOARD_COLUMNS}
+        rows = (
+            Lead.objects.order_by()
+            .values('status_kanban')
+            .annotate(total=Count('pk'), inbound=Count('pk', filter=INBOUND))
+        )
+        for row in rows:
+            status = row['status_kanban']
+            if status == 'lead_generation':
+                counts['lead_generation_inbound'] = row['inbound']
+                counts['lead_generation_outbound'] = row['total'] - row['inbound']
+            elif status in counts:
+                counts[status] = row['total']
+        return counts
+
+    def get_board_page(self, request, key, condition):
+        queryset = self.get_queryset().filter(condition)
+        paginator = BoardColumnPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+
+        # Link next selalu mengarah ke endpoint kolom, juga saat dipanggil dari board/
+        column_url = self.reverse_action('board-column', kwargs={'column': key})
+        paginator.base_url = replace_query_param(column_url, 'page_size', paginator.page_size)
+
+        serializer = self.get_serializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+# ==========================================
+# ACTIVITY VIEWSETS
+# ==========================================
+
+# Filter list aktivitas di server (core.filters.IndexedFilterBackend):
+# ?lead=<lead_id>&pic_gp=..&date_from=..&date_to=..&ordering=date
+# Didukung index (lead, date), (pic_gp, date) dan (date) di migration 0010.
+ACTIVITY_FILTER_FIELDS = {
+    'lead': ['exact'],
+    'pic_gp': ['exact', 'in'],
+    'date': ['exact', 'gte', 'lte'],
+}
+ACTIVITY_FILTER_ALIASES = {'date_from': 'date__gte', 'date_to': 'date__lte'}
+
+class FollowUpViewSet(CachedResponseMixin, ConditionalMixin, ExportMixin, viewsets.ModelViewSet):
+    queryset = FollowUp.objects.all().order_by('-date', '-id')
     serializer_class = FollowUpSerializer
     permission_classes = [IsAuthenticated]
+    filter_fields = ACTIVITY_FILTER_FIELDS
+    filter_aliases = ACTIVITY_FILTER_ALIASES
+    ordering_fields = ['date']
 
-class MeetingViewSet(viewsets.ModelViewSet):
-    queryset = Meeting.objects.all()
+    export_filename = 'followups'
+    export_fields = [
+        ('ID', 'id'), ('Lead ID', 'lead_id'), ('Property', 'lead__property'),
+        ('PIC GP', 'pic_gp'), ('PIC Lead', 'pic_lead'), ('Date', 'date'),
+        ('Start', 'start_time'), ('End', 'end_time'), ('Objective', 'objective'),
+        ('Stage', 'stage'), ('Type', 'fu_type'), ('Notes', 'notes'),
+    ]
+
+class MeetingViewSet(CachedResponseMixin, ConditionalMixin, ExportMixin, viewsets.ModelViewSet):
+    queryset = Meeting.objects.all().order_by('-date', '-id')
     serializer_class = MeetingSerializer
     permission_classes = [IsAuthenticated]
+    filter_fields = ACTIVITY_FILTER_FIELDS
+    filter_aliases = ACTIVITY_FILTER_ALIASES
+    ordering_fields = ['date']
+
+    export_filename = 'meetings'
+    export_fields = [
+        ('ID', 'id'), ('Lead ID', 'lead_id'), ('Property', 'lead__property'),
+        ('PIC GP', 'pic_gp'), ('PIC Lead', 'pic_lead'), ('Date', 'date'),
+        ('Start', 'start_time'), ('End', 'end_time'), ('Objective', 'objective'),
+        ('Stage', 'stage'), ('Type', 'meeting_type'), ('Location', 'location'),
+        ('Latitude', 'latitude'), ('Longitude', 'longitude'), ('MoM', 'mom'),
+    ]
 
-class QuotationViewSet(viewsets.ModelViewSet):
-    queryset = Quotation.objects.all()
+class QuotationViewSet(CachedResponseMixin, ConditionalMixin, ExportMixin, viewsets.ModelViewSet):
+    queryset = Quotation.objects.all().order_by('-date', '-quotation_id')
     serializer_class = QuotationSerializer
     permission_classes = [IsAuthenticated]
+    filter_fields = ACTIVITY_FILTER_FIELDS
+    filter_aliases = ACTIVITY_FILTER_ALIASES
+    ordering_fields = ['date']
+
+    export_filename = 'quotations'
+    export_fields = [
+        ('Quotation ID', 'quotation_id'), ('Lead ID', 'lead_id'),
+        ('Property', 'lead__property'), ('PIC GP', 'pic_gp'), ('Date', 'date'),
+        ('Link', 'link_quotation'), ('Sent', 'is_send'),
+    ]
 
-class DealViewSet(viewsets.ModelViewSet):
-    queryset = Deal.objects.all()
+class DealViewSet(
+    AsyncReadMixin, CachedResponseMixin, ConditionalMixin, ExportMixin, ValuesListMixin, viewsets.ModelViewSet,
+):
+    # lead & pic_lead dibaca DealSerializer (lead_property, pic_lead_name, ...)
+    queryset = (
+        Deal.objects.select_related('lead', 'pic_lead')
+        .prefetch_related(Prefetch('details', queryset=DealDetail.objects.order_by('created_at', 'deal_detail_id')))
+        .order_by('-created_at', '-deal_id')
+    )
     serializer_class = DealSerializer
-    permission_classes = [IsAuthenticated] 
\ No newline at end of file
+    permission_classes = [IsAuthenticated]
+
+    # Range `date` hanya lewat index (lead, date): wajib bersama ?lead=
+    filter_fields = {
+        'lead': ['exact'],
+        'is_paid': ['exact'],
+        'invoice_issued': ['exact'],
+        'date': ['gte', 'lte'],
+        'paid_date': ['gte', 'lte'],
+        'created_at': ['gte', 'lte'],
+    }
+    ordering_fields = ['created_at', 'paid_date']
+    # lead_property / lead_pic_gp, pic_lead & details ikut di response
+    conditional_fields = ['edited_at', 'lead__edited_at', 'details__edited_at']
+    cache_models = [Deal, DealDetail, Lead, LeadPIC]
+
+    # Satu baris per DealDetail (deal tanpa detail tetap 1 baris)
+    export_filename = 'deals'
+    export_fields = [
+        ('Deal ID', 'deal_id'), ('Lead ID', 'lead_id'), ('Property', 'lead__property'),
+        ('GP PIC', 'lead__gp_pic'), ('Deal Type', 'deal_type'), ('Date', 'date'),
+        ('Room', 'room'), ('Project Manager', 'project_manager'), ('Notes', 'notes'),
+        ('PIC Lead', 'pic_lead__pic_name'), ('PIC Phone', 'pic_lead__phone_number'),
+        ('PIC Email', 'pic_lead__email'), ('Link Invoice', 'link_invoice'),
+        ('Invoice Issued', 'invoice_issued'), ('Invoice Sent', 'is_invoice_send_to_customer'),
+        ('Subscribe Changed', 'subscribe_changed'), ('Paid', 'is_paid'),
+        ('Partial Payment', 'is_partial_payment'), ('Paid Date', 'paid_date'),
+        ('PIC Penerima Bukti Bayar', 'pic_penerima_bukti_bayar'),
+        ('Link Payment Receipt', 'link_payment_receipt'),
+        ('Detail ID', 'details__deal_detail_id'), ('Package', 'details__package'),
+        ('Product', 'details__product'), ('Product Amount', 'details__product_amount'),
+        ('Billing', 'details__product_amount_by'), ('Initiation', 'details__initiation'),
+        ('Initiation Amount', 'details__initiation_amount'),
+    ]
+
+# ==========================================
+# DELTA SYNC
+# ==========================================
+
+class SyncView(APIView):
+    """
+    Perubahan Lead, LeadPIC, aktivitas, Deal & DealDetail sejak cursor terakhir.
+
+    GET /api/sync/                 -> mulai dari awal (replika penuh, per halaman)
+    GET /api/sync/?cursor=<cursor> -> hanya perubahan setelah cursor
+    Ulangi dengan cursor baru selama has_more = true.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        cursor = None
+        if request.query_params.get('cursor'):
+            try:
+                cursor = decode_sync_cursor(request.query_params['cursor'])
+            except Exception:
+                raise NotFound(KeysetPagination.invalid_cursor_message)
+
+        page_size = SYNC_PAGE_SIZE
+        if 'page_size' in request.query_params:
+            page_size = KeysetPagination().get_page_size(request)
+        return Response(get_changes(cursor, page_size, context={'request': request}))
@@ -15,6 +15,20 @@ api.interceptors.request.use((config) => {
   return Promise.reject(error);
 });
 
+// Minta access token baru dengan refresh token (dipakai interceptor & useRealtime.js)
+// Kita pakai axios biasa (bukan instance 'api') biar gak kena interceptor di bawah
+export async function refreshAccessToken() {
+  const refreshToken = localStorage.getItem('refresh_token');
+  if (!refreshToken) {
+    throw new Error("No refresh token");
+  }
+  const response = await axios.post('http://127.0.0.1:8000/api/token/refresh/', {
+    refresh: refreshToken
+  });
+  localStorage.setItem('access_token', response.data.access);
+  return response.data.access;
+}
+
 // 2. RESPONSE INTERCEPTOR: Handle Token Mati (401)
 api.interceptors.response.use(
   (response) => response, // Jika sukses, lewatkan saja
@@ -26,30 +40,15 @@ api.interceptors.response.use(
       originalRequest._retry = true; // Tandai biar gak looping infinite
 
       try {
-        const refreshToken = localStorage.getItem('refresh_token');
-        
-        if (!refreshToken) {
-          throw new Error("No refresh token");
-        }
-
-        // Minta token baru ke Backend
-        // Kita pakai axios biasa (bukan instance 'api') biar gak kena interceptor ini lagi
-        const response = await axios.post('http://127.0.0.1:8000/api/token/refresh/', {
-          refresh: refreshToken
-        });
-
-        if (response.status === 200) {
-          // 1. Simpan Token Baru
-          const newAccessToken = response.data.access;
-          localStorage.setItem('access_token', newAccessToken);
+        // 1. Minta & simpan token baru
+        const newAccessToken = await refreshAccessToken();
 
-          // 2. Update Header default & request yang gagal tadi
-          api.defaults.headers.common['Authorization'] = `Bearer ${newAccessToken}`;
-          originalRequest.headers['Authorization'] = `Bearer ${newAccessToken}`;
+        // 2. Update Header default & request yang gagal tadi
+        api.defaults.headers.common['Authorization'] = `Bearer ${newAccessToken}`;
+        originalRequest.headers['Authorization'] = `Bearer ${newAccessToken}`;
 
-          // 3. Ulangi Request Awal
-          return api(originalRequest);
-        }
+        // 3. Ulangi Request Awal
+        return api(originalRequest);
       } catch (refreshError) {
         // Jika Refresh Token juga mati (atau tidak ada), paksa Logout
         console.error("Session expired. Please login again.");
@@ -0,0 +1,62 @@
+import { onMounted, onUnmounted } from 'vue';
+import { refreshAccessToken } from '../api';
+
+// WebSocket update real-time (backend: core/realtime.py)
+const WS_URL = 'ws://127.0.0.1:8000/ws/updates/';
+// Close code token tidak valid / kedaluwarsa (CLOSE_UNAUTHORIZED di core/realtime.py)
+const CLOSE_UNAUTHORIZED = 4401;
+const RETRY_MIN = 3000;
+const RETRY_MAX = 60000;
+
+export function useRealtime(topics, onEvent) {
+  let socket = null;
+  let retryTimer = null;
+  let retryDelay = RETRY_MIN;
+  let stopped = false;
+
+  const stop = () => {
+    stopped = true;
+    clearTimeout(retryTimer);
+    if (socket) socket.close();
+  };
+
+  const reconnect = () => {
+    if (stopped) return;
+    retryTimer = setTimeout(connect, retryDelay);
+    retryDelay = Math.min(retryDelay * 2, RETRY_MAX);
+  };
+
+  const connect = () => {
+    const token = localStorage.getItem('access_token');
+    if (!token || stopped) return;
+
+    let opened = false;
+    socket = new WebSocket(`${WS_URL}?token=${encodeURIComponent(token)}&topics=${topics.join(',')}`);
+    socket.onopen = () => {
+      opened = true;
+      retryDelay = RETRY_MIN;
+    };
+    socket.onmessage = (message) => {
+      const event = JSON.parse(message.data);
+      if (event.topic) onEvent(event);
+    };
+    socket.onclose = (event) => {
+      if (stopped) return;
+      // Token kedaluwarsa: 4401 setelah terhubung, atau handshake ditolak (browser
+      // tidak memberi close code). Refresh dulu, jangan sambung ulang dengan token lama.
+      if (event.code === CLOSE_UNAUTHORIZED || !opened) {
+        refreshAccessToken().then(reconnect).catch((error) => {
+          // Server tidak terjangkau: coba lagi nanti. Refresh token ditolak / tidak ada:
+          // sesi habis, berhenti (redirect ke login lewat interceptor api.js)
+          if (!error.response && localStorage.getItem('refresh_token')) reconnect();
+          else stop();
+        });
+      } else {
+        reconnect();
+      }
+    };
+  };
+
+  onMounted(connect);
+  onUnmounted(stop);
+}